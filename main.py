@@ -535,6 +535,7 @@ class RouterManagerApp:
         EXIT_MESSAGE = f"¿Deseas cerrar {APP_TITLE}?"
         
         if messagebox.askokcancel(EXIT_TITLE, EXIT_MESSAGE):
+            _close_router_sessions()
             self.root.destroy()
 
     def request_disconnect(self) -> None:
@@ -542,6 +543,8 @@ class RouterManagerApp:
         MESSAGE = "¿Deseas desconectarte y volver a la pantalla inicial?"
         if messagebox.askokcancel(TITLE, MESSAGE):
             self.restart_requested = True
+            # Al volver a la pantalla inicial se cierran las sesiones abiertas
+            _close_router_sessions()
             self.root.destroy()
 
     def on_connection_success(self, parsed_data: Dict[str, Any]):
@@ -580,6 +583,14 @@ class RouterManagerApp:
             if hasattr(routing_frame, 'resync_protocol_states'):
                 routing_frame.resync_protocol_states()
 
+def _close_router_sessions() -> None:
+    """Cierra las sesiones SSH/Telnet/Serial persistentes del analizador."""
+    try:
+        from modules.router_analyzer import close_all_sessions
+        close_all_sessions()
+    except Exception:
+        pass
+
 def main() -> None:
     """Función principal de la aplicación Router Manager.
     
@@ -596,12 +607,72 @@ def main() -> None:
     parser.add_argument("--fast", dest="fast_mode", action="store_true", help="Acelerar análisis (fast_mode)")
     parser.add_argument("--baudrate", type=int, default=9600, help="Baudrate para Serial")
     parser.add_argument("--verbose", action="store_true", help="Mostrar salida parseada y resumen en consola")
+    parser.add_argument("--fingerprint-ttl", dest="fingerprint_ttl", type=float, default=None,
+                        help="Vigencia (s) de la huella de dispositivo en caché; 0 la desactiva")
+    parser.add_argument("--inventory", default="", help="CSV/JSON de equipos para análisis concurrente (modo flota)")
+    parser.add_argument("--workers", type=int, default=8, help="Equipos analizados en paralelo en modo flota")
+    parser.add_argument("--vendor-limit", dest="vendor_limits", action="append", default=[],
+                        help="Límite de concurrencia por fabricante, ej. cisco=4 (repetible)")
+    parser.add_argument("--output", default="", help="Archivo JSON Lines de resultados (modo flota); por defecto stdout")
+    parser.add_argument("--pipeline", dest="pipeline_commands", action="store_true", help="Enviar cada lote de comandos en una sola escritura (SSH/Telnet)")
+    parser.add_argument("--parallel-exec", dest="parallel_exec", action="store_true", help="Ejecutar los comandos de solo lectura en canales exec SSH paralelos")
+    parser.add_argument("--timings", action="store_true", help="Mostrar los tiempos por fase, comando y parser (modo CLI)")
+    parser.add_argument("--trace-file", dest="trace_file", default="",
+                        help="Exportar los tiempos como traza JSON de Chrome (chrome://tracing, Perfetto) (modo CLI)")
+    parser.add_argument("--record-transcripts", dest="record_transcripts", nargs="?", const="transcripts", default="",
+                        help="Grabar lo enviado y recibido en cada sesión en este directorio (por defecto 'transcripts')")
+    parser.add_argument("--replay", action="append", default=[],
+                        help="Reproducir una sesión grabada en lugar del equipo (repetible; modo CLI)")
+    parser.add_argument("--replay-speed", dest="replay_speed", type=float, default=1.0,
+                        help="Velocidad de la reproducción: 1 la grabada, 10 diez veces más rápido, 0 sin esperas")
 
     args = parser.parse_args()
 
+    # Modo flota: analizar un inventario completo sin GUI
+    if args.inventory:
+        from modules.router_analyzer.fleet import load_inventory, parse_vendor_limits, run_fleet
+        devices = load_inventory(args.inventory)
+        defaults = {
+            "protocol": args.protocol,
+            "username": args.username,
+            "password": args.password,
+            "enable_password": args.enable_password,
+            "fast_mode": args.fast_mode,
+            "baudrate": args.baudrate,
+            "verbose": args.verbose,
+            "pipeline_commands": args.pipeline_commands,
+            "parallel_exec": args.parallel_exec,
+            "record_transcripts": args.record_transcripts,
+        }
+        if args.fingerprint_ttl is not None:
+            defaults["fingerprint_ttl"] = args.fingerprint_ttl
+        print(f"[CLI] Inventario: {len(devices)} equipos, {args.workers} workers", file=sys.stderr)
+        out = open(args.output, "w", encoding="utf-8") if args.output else None
+        try:
+            summary = run_fleet(devices, workers=args.workers, vendor_limits=parse_vendor_limits(args.vendor_limits),
+                                defaults=defaults, out=out)
+        finally:
+            if out is not None:
+                out.close()
+            _close_router_sessions()
+        print(f"[CLI] Flota completada: {summary['ok']} OK, {summary['failed']} con error en {summary['elapsed_s']}s",
+              file=sys.stderr)
+        return
+
     # Si se solicita modo CLI, ejecutar análisis desde consola
     if args.cli:
         from modules.router_analyzer import RouterAnalyzer
+        if args.replay:
+            # Protocolo y destino de la grabación (el usuario puede fijar el destino)
+            from modules.router_analyzer.transcripts import load_transcript
+            try:
+                recorded = load_transcript(args.replay[0])
+            except Exception as e:
+                print(f"[CLI] Error: no se pudo leer la grabación: {e}")
+                sys.exit(1)
+            args.protocol = recorded.get("protocol") or args.protocol
+            args.hostname = args.hostname or recorded.get("hostname", "")
+            args.port = args.port or str(recorded.get("port") or "")
         # Construir datos de conexión
         connection_data = {
             "protocol": args.protocol,
@@ -614,9 +685,18 @@ def main() -> None:
             # Sin pista de fabricante: siempre autodetección
             "baudrate": args.baudrate if args.protocol == "Serial" else "",
             "verbose": args.verbose,
+            "pipeline_commands": args.pipeline_commands,
+            "parallel_exec": args.parallel_exec,
             # Prefetch de running-config en CLI para evitar segunda pasada
             "prefetch_running_config": True,
         }
+        if args.fingerprint_ttl is not None:
+            connection_data["fingerprint_ttl"] = args.fingerprint_ttl
+        if args.record_transcripts:
+            connection_data["record_transcripts"] = args.record_transcripts
+        if args.replay:
+            connection_data["replay_transcript"] = args.replay
+            connection_data["replay_speed"] = args.replay_speed
         print(f"[CLI] Conectando via {connection_data['protocol']}…")
         target = connection_data.get("hostname") or connection_data.get("port")
         print(f"[CLI] Destino: {target}")
@@ -625,19 +705,44 @@ def main() -> None:
             print("[CLI] Error: no se pudo conectar.")
             sys.exit(1)
         print("[CLI] Conectado. Detectando y ejecutando comandos…")
-        analysis_data = analyzer.analyze_router()
+
+        def _on_result(label: str, cmd: str, output: str, elapsed: float) -> None:
+            print(f"[CLI] {label}: '{cmd}' completado en {elapsed:.2f}s ({len(output or '')} bytes)", flush=True)
+
+        def _on_parsed(section: str, data: Any) -> None:
+            if section == "interfaces":
+                print(f"[CLI] Interfaces disponibles: {len(data or [])}", flush=True)
+            elif section == "device_info":
+                print(f"[CLI] Equipo: {(data or {}).get('model', 'N/A')}", flush=True)
+
+        analysis_data = analyzer.analyze_router(on_result=_on_result if args.verbose else None,
+                                                on_parsed=_on_parsed if args.verbose else None)
         print(f"[CLI] Fabricante: {analysis_data.get('vendor')}")
         print(f"[CLI] Comandos ejecutados: {', '.join(analysis_data.get('commands_executed', []))}")
         parsed_data = analyzer.parse_analysis_data(analysis_data)
         di = parsed_data.get("device_info", {})
         print(f"[CLI] Modelo: {di.get('model','N/A')} | Firmware: {di.get('firmware','N/A')} | Arquitectura: {di.get('architecture','N/A')}")
         print(f"[CLI] Interfaces detectadas: {len(parsed_data.get('interfaces', []))}")
+        if args.timings or args.trace_file:
+            from modules.router_analyzer.timings import format_timings, write_chrome_trace
+            timings = analysis_data.get("timings", {})
+            if args.timings:
+                for line in format_timings(timings).splitlines():
+                    print(f"[CLI] {line}")
+            if args.trace_file:
+                try:
+                    write_chrome_trace(timings, args.trace_file)
+                    print(f"[CLI] Traza de tiempos guardada en {args.trace_file}")
+                except Exception as e:
+                    print(f"[CLI] No se pudo guardar la traza: {e}")
         if args.verbose:
             try:
                 print("[CLI] Resumen parseado:")
-                print(json.dumps(parsed_data, indent=2, ensure_ascii=False))
+                from modules.router_analyzer.records import json_default
+                print(json.dumps(parsed_data, indent=2, ensure_ascii=False, default=json_default))
             except Exception:
                 pass
+        _close_router_sessions()
         print("[CLI] Análisis completado.")
         return
 
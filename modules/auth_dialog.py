@@ -2,8 +2,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import json
 import os
+import queue
 import sys
-import time
+import threading
 
 # Añadir el directorio modules al path para poder importar router_analyzer
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -21,6 +22,8 @@ class AuthDialog:
         
         # Variables de conexión
         self.connection_data = None
+        # Analizador en curso (lo usa el botón Cancelar de la ventana de análisis)
+        self.analyzer = None
         self.saved_credentials = self.load_saved_credentials()
         
         # Centrar ventana
@@ -529,7 +532,7 @@ class AuthDialog:
         # Crear ventana de análisis
         analysis_window = tk.Toplevel(self.root)
         analysis_window.title("Analizando Router...")
-        analysis_window.geometry("500x300")
+        analysis_window.geometry("500x340")
         analysis_window.resizable(False, False)
         analysis_window.configure(bg='#f8f9fa')
         
@@ -538,8 +541,9 @@ class AuthDialog:
         analysis_window.grab_set()
         
         x = (analysis_window.winfo_screenwidth() // 2) - (500 // 2)
-        y = (analysis_window.winfo_screenheight() // 2) - (300 // 2)
-        analysis_window.geometry(f"500x300+{x}+{y}")
+        y = (analysis_window.winfo_screenheight() // 2) - (340 // 2)
+        analysis_window.geometry(f"500x340+{x}+{y}")
+        analysis_window.protocol("WM_DELETE_WINDOW", self.cancel_analysis)
         
         # Frame principal
         main_frame = tk.Frame(analysis_window, bg='#f8f9fa')
@@ -574,6 +578,14 @@ class AuthDialog:
         progress_bar.pack(fill=tk.X, pady=(10, 0))
         progress_bar.start()
         
+        # Botón Cancelar (empaquetado antes de la lista para que no quede fuera):
+        # corta la lectura en curso y vuelve al formulario
+        self.analysis_cancel_btn = tk.Button(main_frame, text="Cancelar",
+                                             command=self.cancel_analysis,
+                                             bg='#6c757d', fg='white', font=("Arial", 10),
+                                             relief=tk.FLAT, padx=20, pady=4)
+        self.analysis_cancel_btn.pack(side=tk.BOTTOM, anchor=tk.E, pady=(10, 0))
+
         # Lista de comandos
         commands_frame = tk.Frame(main_frame, bg='#f8f9fa')
         commands_frame.pack(fill=tk.BOTH, expand=True)
@@ -597,105 +609,116 @@ class AuthDialog:
         self.start_analysis(analysis_window, commands_listbox, commands, progress_bar)
     
     def start_analysis(self, window, listbox, commands, progress_bar):
-        """Iniciar el análisis del router"""
+        """Iniciar el análisis del router en un hilo de trabajo.
+
+        El hilo solo publica eventos en una cola; la ventana los consume con
+        ``after()``, así Tk sigue respondiendo (y el botón Cancelar también).
+        """
+        self.analyzer = RouterAnalyzer(self.connection_data)
+        events = queue.Queue()
+        listbox.insert(tk.END, "🚀 Iniciando análisis del router...")
+        worker = threading.Thread(target=self._analysis_worker, args=(self.analyzer, events),
+                                  name="router-analysis", daemon=True)
+        worker.start()
+        window.after(50, lambda: self._poll_analysis(window, listbox, progress_bar, events))
+
+    def _analysis_worker(self, analyzer, events):
+        """Conectar, analizar y parsear fuera del hilo de Tk.
+
+        Eventos ``(tipo, datos)``: connect, vendor, command, parsed, error y,
+        siempre al final, done (datos: True si se canceló).
+        """
         try:
-            # Crear analizador
-            analyzer = RouterAnalyzer(self.connection_data)
-            fast = bool(self.connection_data.get('fast_mode', True))
-            def _sleep_short(default_s: float = 0.2):
-                try:
-                    if fast:
-                        time.sleep(0.02)
-                    else:
-                        time.sleep(default_s)
-                except Exception:
-                    pass
-            
-            # Mostrar inicio del análisis
-            listbox.insert(tk.END, "🚀 Iniciando análisis del router...")
-            window.update()
-            _sleep_short()
-            
-            # Simular conexión con tiempos realistas
-            if analyzer.connect():
-                listbox.insert(tk.END, "✅ Conectado al router exitosamente")
-                window.update()
-                _sleep_short()
+            ok = analyzer.connect()
+            if analyzer.cancelled:
+                return
+            events.put(("connect", ok))
+            if not ok:
+                return
+            events.put(("vendor", (analyzer.vendor or analyzer.connection_data.get('vendor_hint') or 'Desconocido').upper()))
 
-                # Detectar fabricante inmediatamente (conect().vendor_hint ya está establecido)
-                listbox.insert(tk.END, "🔎 Detectando fabricante...")
-                window.update()
-                _sleep_short()
-                vendor_label = (analyzer.vendor or self.connection_data.get('vendor_hint') or 'Desconocido').upper()
-                listbox.insert(tk.END, f"📊 Dispositivo detectado: {vendor_label}")
-                window.update()
-                _sleep_short()
+            # Resultados reales por comando (llegan en este mismo hilo de trabajo)
+            def _on_result(label, cmd, output, elapsed):
+                events.put(("command", (cmd, elapsed, bool((output or '').strip()))))
 
-                # Mostrar progreso de comandos específicos del fabricante
-                listbox.insert(tk.END, "📋 Ejecutando comandos de análisis...")
-                window.update()
-                _sleep_short()
+            # Ejecutar análisis real (usará vendor_hint para comandos del vendor)
+            analysis_data = analyzer.analyze_router(on_result=_on_result)
+            if analyzer.cancelled:
+                return
+            parsed_data = analyzer.parse_analysis_data(analysis_data)
+            events.put(("parsed", (analysis_data, parsed_data)))
+        except Exception as e:
+            events.put(("error", str(e)))
+        finally:
+            events.put(("done", analyzer.cancelled))
 
-                # Ejecutar análisis real (usará vendor_hint para comandos del vendor)
-                analysis_data = analyzer.analyze_router()
-                parsed_data = analyzer.parse_analysis_data(analysis_data)
-                
+    def _poll_analysis(self, window, listbox, progress_bar, events):
+        """Mostrar los eventos del hilo de análisis (se reprograma con ``after``)."""
+        try:
+            if not window.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        fast = bool(self.connection_data.get('fast_mode', True))
+        while True:
+            try:
+                kind, data = events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "connect":
+                if data:
+                    listbox.insert(tk.END, "✅ Conectado al router exitosamente")
+                else:
+                    listbox.insert(tk.END, "❌ Error al conectar al router")
+            elif kind == "vendor":
+                listbox.insert(tk.END, f"📊 Dispositivo detectado: {data}")
+                listbox.insert(tk.END, "📋 Ejecutando comandos de análisis...")
+            elif kind == "command":
+                cmd, elapsed, ok = data
+                listbox.insert(tk.END, f"{'✔' if ok else '✖'} {cmd} ({elapsed:.1f}s)")
+            elif kind == "parsed":
+                analysis_data, parsed_data = data
                 listbox.insert(tk.END, f"📈 Comandos ejecutados: {len(analysis_data.get('commands_executed', []))}")
-                window.update()
-                _sleep_short()
-                
                 listbox.insert(tk.END, f"🔍 Interfaces encontradas: {len(parsed_data.get('interfaces', []))}")
-                window.update()
-                _sleep_short()
-                
                 listbox.insert(tk.END, f"🌐 VRFs encontradas: {len(parsed_data.get('vrfs', []))}")
-                window.update()
-                _sleep_short()
-                
-                # Análisis completado
-                listbox.insert(tk.END, "")
-                listbox.insert(tk.END, "✅ Análisis completado exitosamente")
-                window.update()
-                
                 # Guardar datos en connection_data
                 self.connection_data['analysis_data'] = analysis_data
                 self.connection_data['parsed_data'] = parsed_data
-                
-                # Detener la barra de progreso antes de cerrar la ventana
+            elif kind == "error":
+                listbox.insert(tk.END, f"❌ Error: {data}")
+            elif kind == "done":
+                self.analyzer = None
                 try:
                     progress_bar.stop()
                 except Exception:
                     pass
-                
-                # Cerrar ventana de análisis después de 1 segundo
-                window.after(300, lambda: self.close_analysis_window(window))
-                
-            else:
-                listbox.insert(tk.END, "❌ Error al conectar al router")
-                window.update()
-                try:
-                    time.sleep(0.5 if fast else 1.5)
-                except Exception:
-                    pass
-                try:
-                    progress_bar.stop()
-                except Exception:
-                    pass
-                window.after(500 if fast else 1500, lambda: self.close_analysis_window(window))
-                
-        except Exception as e:
-            listbox.insert(tk.END, f"❌ Error: {str(e)}")
-            window.update()
-            try:
-                time.sleep(0.5 if fast else 1.5)
-            except Exception:
-                pass
-            try:
-                progress_bar.stop()
-            except Exception:
-                pass
-            window.after(500 if fast else 1500, lambda: self.close_analysis_window(window))
-    
+                if data:
+                    # Cancelado: volver al formulario sin cerrar el diálogo
+                    self.connection_data.pop('analysis_data', None)
+                    self.connection_data.pop('parsed_data', None)
+                    window.after(300, window.destroy)
+                elif 'parsed_data' in self.connection_data:
+                    listbox.insert(tk.END, "")
+                    listbox.insert(tk.END, "✅ Análisis completado exitosamente")
+                    window.after(300, lambda: self.close_analysis_window(window))
+                else:
+                    window.after(500 if fast else 1500, lambda: self.close_analysis_window(window))
+                listbox.see(tk.END)
+                return
+            listbox.see(tk.END)
+        window.after(100, lambda: self._poll_analysis(window, listbox, progress_bar, events))
+
+    def cancel_analysis(self):
+        """Cancelar el análisis en curso: corta la lectura pendiente del equipo."""
+        analyzer = self.analyzer
+        if analyzer is None or analyzer.cancelled:
+            return
+        try:
+            self.analysis_cancel_btn.config(state=tk.DISABLED, text="Cancelando...")
+        except tk.TclError:
+            pass
+        analyzer.cancel()
+
     def close_analysis_window(self, window):
         """Cerrar ventana de análisis y continuar"""
         window.destroy()
@@ -703,6 +726,8 @@ class AuthDialog:
         
     def cancel_connection(self):
         """Cancelar conexión"""
+        if self.analyzer is not None:
+            self.analyzer.cancel()
         self.connection_data = None
         self.root.quit()
         
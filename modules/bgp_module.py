@@ -35,6 +35,8 @@ class BgpModuleWindow(tk.Toplevel):
         vendor = (self.shared_data.get("parsed_data", {}).get("device_info", {}).get("vendor", "") or
                   self.shared_data.get("connection_data", {}).get("vendor_hint", "") or "").lower()
         vrfs = bgp.get("vrfs", []) or []
+        # Vecinos (configuración + estado) agrupados por VRF; "" = global
+        by_vrf = bgp.get("neighbors_by_vrf", {}) or {}
 
         # Notebook de pestañas: GLOBAL + VRFs
         notebook = ttk.Notebook(container)
@@ -56,7 +58,8 @@ class BgpModuleWindow(tk.Toplevel):
         gbody.pack(fill=tk.X, padx=8, pady=8)
         ttk.Label(gbody, text="Resumen BGP", font=("Arial", 12, "bold"), background="white", anchor="center", justify="center").pack(fill=tk.X, pady=(2, 6))
         ttk.Label(gbody, text=f"Local AS: {asn or 'N/A'}", background="white", anchor="center", justify="center").pack(fill=tk.X)
-        ttk.Label(gbody, text=f"Router-ID: {router_id or 'N/A'}", background="white", anchor="center", justify="center").pack(fill=tk.X, pady=(0, 6))
+        ttk.Label(gbody, text=f"Router-ID: {router_id or 'N/A'}", background="white", anchor="center", justify="center").pack(fill=tk.X)
+        ttk.Label(gbody, text=f"Vecinos: {len(by_vrf.get('', []))}", background="white", anchor="center", justify="center").pack(fill=tk.X, pady=(0, 6))
         # Botón para obtener información bajo demanda (GLOBAL)
         ttk.Button(
             gbody,
@@ -87,7 +90,8 @@ class BgpModuleWindow(tk.Toplevel):
             vbody.pack(fill=tk.X, padx=8, pady=8)
             ttk.Label(vbody, text="Resumen BGP", font=("Arial", 12, "bold"), background="white", anchor="center", justify="center").pack(fill=tk.X, pady=(2, 6))
             ttk.Label(vbody, text=f"Local AS: {asn or 'N/A'}", background="white", anchor="center", justify="center").pack(fill=tk.X)
-            ttk.Label(vbody, text=f"Router-ID: {v.get('router_id','') or router_id or 'N/A'}", background="white", anchor="center", justify="center").pack(fill=tk.X, pady=(0, 6))
+            ttk.Label(vbody, text=f"Router-ID: {v.get('router_id','') or router_id or 'N/A'}", background="white", anchor="center", justify="center").pack(fill=tk.X)
+            ttk.Label(vbody, text=f"Vecinos: {len(by_vrf.get(v.get('name', ''), []))}", background="white", anchor="center", justify="center").pack(fill=tk.X, pady=(0, 6))
             # Botón para obtener información bajo demanda en VRF
             vrfname = v.get("name", "")
             ttk.Button(
@@ -1,3 +1,4 @@
 from .router_analyzer import run_analysis, RouterAnalyzer
+from .connections import close_all_sessions
 
-__all__ = ["run_analysis", "RouterAnalyzer"]
\ No newline at end of file
+__all__ = ["run_analysis", "RouterAnalyzer", "close_all_sessions"]
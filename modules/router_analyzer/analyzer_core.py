@@ -1,4 +1,6 @@
-from typing import Dict, Any
+import queue
+import threading
+from typing import Dict, Any, Callable, Optional
 from .connections import (
     detect_vendor_ssh,
     detect_vendor_telnet,
@@ -9,17 +11,17 @@ from .connections import (
     run_ssh_commands_batch,
     run_telnet_commands_batch,
     run_serial_commands_batch,
+    session_fingerprint,
+    cancel_requested,
 )
+from .config_filters import can_filter_locally, apply_config_filter
+from .fingerprint_cache import apply_fingerprint, save_fingerprint, invalidate_fingerprint
+from .timings import timed_parse, timing_span
 from .vendor_commands import (
     DISABLE_PAGING,
-    VERSION_COMMAND,
-    INTERFACES_BRIEF,
     RUNNING_CONFIG,
-    STATIC_ROUTES,
-    OSPF_NEIGHBORS,
-    BGP_PEERS_SUMMARY,
-    OSPF_CONFIG_SECTION,
-    BGP_CONFIG_SECTION,
+    CommandSpec,
+    command_specs,
 )
 from .parsers import (
     parse_huawei_version,
@@ -81,10 +83,57 @@ def _run_command(connection_data: Dict[str, Any], command: str, vendor: str) ->
     return ""
 
 
-def analyze(connection_data: Dict[str, Any]) -> Dict[str, Any]:
+def _update_fingerprint(connection_data: Dict[str, Any], vendor: str, raw_version: str, raw_ifaces: str) -> None:
+    """Guarda la huella tras una detección real; invalida una huella que ya no encaja."""
+    if connection_data.get("fingerprint_hit"):
+        # No refrescar la marca de tiempo: la huella expira según su TTL original
+        if not (raw_ifaces or "").strip():
+            invalidate_fingerprint(connection_data)
+        return
+    if vendor not in ("huawei", "cisco", "juniper") or not (raw_version or "").strip():
+        return
+    prompt = session_fingerprint(connection_data).get("prompt", "")
+    needs_enable = None
+    if vendor == "cisco" and prompt:
+        needs_enable = prompt.endswith(">")
+    elif vendor != "cisco":
+        needs_enable = False
+    save_fingerprint(
+        connection_data,
+        vendor=vendor,
+        prompt=prompt or None,
+        version_output=raw_version,
+        needs_enable=needs_enable,
+        paging_commands=list(DISABLE_PAGING.get(vendor, [])),
+    )
+
+
+# Parsers de versión e interfaces por fabricante (publicación temprana y parseo final)
+_BASIC_PARSERS = {
+    "huawei": (parse_huawei_version, parse_huawei_ip_interface_brief),
+    "cisco": (parse_cisco_version, parse_cisco_ip_interface_brief),
+    "juniper": (parse_juniper_version, parse_juniper_interfaces_terse),
+}
+
+
+def analyze(connection_data: Dict[str, Any],
+            on_result: Optional[Callable[[str, str, str, float], None]] = None,
+            on_parsed: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+    """Ejecuta el lote de análisis y parsea las salidas.
+
+    - ``on_result(etiqueta, comando, salida, segundos)`` se llama al terminar
+      cada comando del lote.
+    - ``on_parsed(sección, datos)`` publica ``device_info`` e ``interfaces`` en
+      cuanto llegan sus salidas, mientras la running-config sigue descargando.
+
+    Ambos se llaman desde el hilo que ejecuta ``analyze``, igual que el parseo
+    temprano: el bucle del motor de conexiones solo encola las salidas.
+    """
     verbose = bool(connection_data.get("verbose"))
     # Usar modo rápido para reducir comandos pesados (como running-config)
     fast = bool(connection_data.get("fast_mode"))
+    # Huella en caché: fija vendor_hint y la salida de versión si está vigente
+    apply_fingerprint(connection_data)
     # Prefetch de running-config: por defecto habilitado si ya tenemos vendor_hint
     # para evitar una segunda conexión/comando posterior.
     _prefetch_flag = connection_data.get("prefetch_running_config", None)
@@ -103,13 +152,11 @@ def analyze(connection_data: Dict[str, Any]) -> Dict[str, Any]:
             return "juniper"
         return "desconocido"
 
-    vendor = _detect_vendor(connection_data)
+    with timing_span(connection_data, "vendor_detect", "connect") as span:
+        vendor = _detect_vendor(connection_data)
+        span["vendor"] = vendor
     ven_key = vendor.lower()
 
-    # Indicar a las conexiones si necesitan deshabilitar paginación.
-    # Las conexiones batch ejecutarán los comandos de deshabilitar cuando haga falta.
-    connection_data["need_paging_disabled"] = prefetch_running
-
     # Ejecutar comandos en lote para reducir conexiones
     raw_version = ""
     raw_ifaces = ""
@@ -130,89 +177,147 @@ def analyze(connection_data: Dict[str, Any]) -> Dict[str, Any]:
             vendor = infer_vendor_from_text(raw_version)
             ven_key = vendor.lower()
 
-    cmds: list[str] = []
-    labels: list[str] = []
+    # Categorías del lote; los comandos salen del registro de vendor_commands.
+    # IMPORTANTE: el resumen BGP no se envía automáticamente; se obtiene bajo
+    # demanda desde el módulo BGP al pulsar el botón.
+    kinds: list[str] = ["version"] if not raw_version else []
+    kinds.append("interfaces")
+    if prefetch_running:
+        kinds.append("running")
+    plan: list[tuple[str, CommandSpec]] = []
     if ven_key in ("huawei", "cisco", "juniper"):
-        vcmd = VERSION_COMMAND.get(ven_key) or ("display version" if ven_key == "huawei" else "show version")
-        icmd = INTERFACES_BRIEF.get(ven_key) or (
-            "display ip interface brief" if ven_key == "huawei" else (
-                "show interfaces terse" if ven_key == "juniper" else "show ip interface brief"
-            )
-        )
-        if not raw_version:
-            cmds.append(vcmd); labels.append("version")
-        cmds.append(icmd); labels.append("interfaces")
-        if prefetch_running:
-            rcfg = RUNNING_CONFIG.get(ven_key) or (
-                "display current-configuration" if ven_key == "huawei" else (
-                    "show configuration" if ven_key == "juniper" else "show running-config"
-                )
-            )
-            cmds.append(rcfg); labels.append("running")
-        # Añadir consulta de rutas estáticas para el vendor detectado
-        # (Huawei y Cisco según requerimiento; Juniper soportado si mapeado)
-        sroute = STATIC_ROUTES.get(ven_key)
-        if sroute:
-            cmds.append(sroute); labels.append("static_routes")
-        # Vecinos OSPF
-        ospf_cmd = OSPF_NEIGHBORS.get(ven_key)
-        if ospf_cmd:
-            cmds.append(ospf_cmd); labels.append("ospf_peers")
-        # IMPORTANTE: No enviar resumen BGP automáticamente.
-        # Se obtiene bajo demanda desde el módulo BGP al pulsar el botón.
-        # Sección de configuración OSPF (requerimiento Telnet3: Cisco)
-        # Ejecutar siempre que exista el comando para el vendor.
-        ocmd = OSPF_CONFIG_SECTION.get(ven_key)
-        if ocmd:
-            cmds.append(ocmd); labels.append("ospf_cfg")
-        # Sección de configuración BGP por vendor
-        bcmd = BGP_CONFIG_SECTION.get(ven_key)
-        if bcmd:
-            cmds.append(bcmd); labels.append("bgp_cfg")
+        # Rutas estáticas, vecinos OSPF y secciones OSPF/BGP si el vendor las tiene mapeadas
+        kinds.extend(["static_routes", "ospf_peers", "ospf_cfg", "bgp_cfg"])
+        for kind in kinds:
+            specs = command_specs(kind, ven_key)
+            if specs:
+                plan.append((kind, specs[0]))
     else:
-        if not raw_version:
-            cmds.extend(["display version", "show version"]) ; labels.extend(["version","version"])
-        cmds.extend(["display ip interface brief", "show ip interface brief", "show interfaces terse"]) ; labels.extend(["interfaces","interfaces","interfaces"])
-        if prefetch_running:
-            cmds.extend(["display current-configuration", "show running-config", "show configuration"]) ; labels.extend(["running","running","running"])
-        # Intentar sección OSPF con variantes comunes
-        cmds.extend(["display current-configuration | section include ospf", "show running-config | sec ospf"]) ; labels.extend(["ospf_cfg","ospf_cfg"])
+        # Fabricante desconocido: probar las variantes de todos los fabricantes
+        kinds.append("ospf_cfg")
+        seen: set[str] = set()
+        for kind in kinds:
+            for spec in command_specs(kind):
+                if spec.command not in seen:
+                    seen.add(spec.command)
+                    plan.append((kind, spec))
+    # Comandos ligeros primero: sus salidas (y la publicación temprana) no
+    # esperan a la descarga de la configuración
+    plan.sort(key=lambda item: item[1].cost == "heavy")
+    # Con la configuración completa en el lote, las secciones filtradas
+    # ('| sec ospf', '| include ip route-static'...) se extraen localmente de
+    # esa única descarga en lugar de que el equipo la regenere por cada filtro
+    derived: list[tuple[str, CommandSpec]] = []
+    running_cmds = {spec.command for kind, spec in plan if kind == "running"}
+    if running_cmds and ven_key in ("huawei", "cisco", "juniper") and connection_data.get("local_sections", True):
+        derived = [(kind, spec) for kind, spec in plan
+                   if spec.source in running_cmds and can_filter_locally(spec.pipe_filter)]
+        plan = [item for item in plan if item not in derived]
+    cmds: list[str] = [spec.command for _, spec in plan]
+    labels: list[str] = [kind for kind, _ in plan]
 
-    if cmds:
-        proto = connection_data.get("protocol", "SSH2")
-        if proto == "SSH2":
-            outs = run_ssh_commands_batch(connection_data, cmds)
-        elif proto == "Telnet":
-            outs = run_telnet_commands_batch(connection_data, cmds, vendor=ven_key)
-        elif proto == "Serial":
-            outs = run_serial_commands_batch(connection_data, cmds)
-        else:
-            outs = []
+    # Indicar a las conexiones si necesitan deshabilitar paginación.
+    # Las conexiones batch ejecutarán los comandos de deshabilitar cuando haga falta.
+    connection_data["need_paging_disabled"] = any(spec.paging for _, spec in plan)
+
+    early: Dict[str, Any] = {}
+
+    def _publish(section: str, data: Any) -> None:
+        early[section] = data
+        if on_parsed is not None:
+            try:
+                on_parsed(section, data)
+            except Exception as e:
+                print(f"[CLI] Error publicando '{section}': {e}", flush=True)
+
+    def _collect(tag: str, cmd: str, out: str, elapsed: float) -> None:
+        if on_result is not None:
+            try:
+                on_result(tag, cmd, out, elapsed)
+            except Exception as e:
+                print(f"[CLI] Error en callback de '{cmd}': {e}", flush=True)
 
+    def _store(tag: str, out: str) -> None:
         # Tomar la primera salida válida por categoría respetando el orden de preferencia
-        for out, tag in zip(outs, labels):
-            if not out or not out.strip():
-                continue
-            if tag == "version" and not raw_version:
-                raw_version = out
-                connection_data["cached_version_output"] = raw_version
-                if vendor in ("desconocido", "unknown"):
-                    vendor = infer_vendor_from_text(raw_version)
-                    ven_key = vendor.lower()
-            elif tag == "interfaces" and not raw_ifaces:
-                raw_ifaces = out
-            elif tag == "running" and not raw_running:
-                raw_running = out
-            elif tag == "static_routes" and not raw_static_routes:
-                raw_static_routes = out
-            elif tag == "ospf_peers" and not raw_ospf_peers:
-                raw_ospf_peers = out
-            elif tag == "bgp_summary" and not raw_bgp_summary:
-                raw_bgp_summary = out
-            elif tag == "ospf_cfg" and not raw_ospf_cfg:
-                raw_ospf_cfg = out
-            elif tag == "bgp_cfg" and not raw_bgp_cfg:
-                raw_bgp_cfg = out
+        nonlocal raw_version, raw_ifaces, raw_running, raw_static_routes, raw_ospf_peers
+        nonlocal raw_bgp_summary, raw_ospf_cfg, raw_bgp_cfg, vendor, ven_key
+        if not out or not out.strip():
+            return
+        if tag == "version" and not raw_version:
+            raw_version = out
+            connection_data["cached_version_output"] = raw_version
+            if vendor in ("desconocido", "unknown"):
+                vendor = infer_vendor_from_text(raw_version)
+                ven_key = vendor.lower()
+            if ven_key in _BASIC_PARSERS:
+                _publish("device_info", timed_parse(connection_data, _BASIC_PARSERS[ven_key][0], raw_version))
+        elif tag == "interfaces" and not raw_ifaces:
+            raw_ifaces = out
+            if ven_key in _BASIC_PARSERS:
+                _publish("interfaces", timed_parse(connection_data, _BASIC_PARSERS[ven_key][1], raw_ifaces))
+        elif tag == "running" and not raw_running:
+            raw_running = out
+            for kind, spec in derived:
+                with timing_span(connection_data, f"derive {kind}", "local"):
+                    section = apply_config_filter(raw_running, spec.pipe_filter) or ""
+                _store(kind, section)
+        elif tag == "static_routes" and not raw_static_routes:
+            raw_static_routes = out
+        elif tag == "ospf_peers" and not raw_ospf_peers:
+            raw_ospf_peers = out
+        elif tag == "bgp_summary" and not raw_bgp_summary:
+            raw_bgp_summary = out
+        elif tag == "ospf_cfg" and not raw_ospf_cfg:
+            raw_ospf_cfg = out
+        elif tag == "bgp_cfg" and not raw_bgp_cfg:
+            raw_bgp_cfg = out
+
+    if raw_version and ven_key in _BASIC_PARSERS:
+        # Versión en caché: la información del equipo se publica antes del lote
+        _publish("device_info", timed_parse(connection_data, _BASIC_PARSERS[ven_key][0], raw_version))
+
+    def _run_batch(batch_cmds: list[str], batch_labels: list[str]) -> None:
+        proto = connection_data.get("protocol", "SSH2")
+        # El lote corre en un hilo auxiliar y su callback (en el bucle del motor)
+        # solo encola cada salida; filtrar y parsear se hace aquí, en el hilo
+        # que llama a analyze, en cuanto llega cada salida
+        outputs: "queue.Queue[Optional[tuple[str, str, str, float]]]" = queue.Queue()
+        failure: list[BaseException] = []
+
+        def _enqueue(tag: str, cmd: str, out: str, elapsed: float) -> None:
+            outputs.put((tag, cmd, out, elapsed))
+
+        def _worker() -> None:
+            try:
+                if proto == "SSH2":
+                    run_ssh_commands_batch(connection_data, batch_cmds, on_result=_enqueue, labels=batch_labels)
+                elif proto == "Telnet":
+                    run_telnet_commands_batch(connection_data, batch_cmds, vendor=ven_key, on_result=_enqueue, labels=batch_labels)
+                elif proto == "Serial":
+                    run_serial_commands_batch(connection_data, batch_cmds, on_result=_enqueue, labels=batch_labels)
+            except BaseException as e:
+                failure.append(e)
+            finally:
+                outputs.put(None)
+
+        threading.Thread(target=_worker, name="analyze-batch", daemon=True).start()
+        while True:
+            item = outputs.get()
+            if item is None:
+                break
+            tag, cmd, out, elapsed = item
+            _collect(tag, cmd, out, elapsed)
+            _store(tag, out)
+        if failure:
+            raise failure[0]
+
+    if cmds:
+        _run_batch(cmds, labels)
+    if derived and not raw_running and not cancel_requested(connection_data):
+        # Sin configuración completa: volver a los filtros en el equipo
+        if verbose:
+            print("[CLI] Configuración no obtenida; pidiendo las secciones al equipo.", flush=True)
+        _run_batch([spec.command for _, spec in derived], [kind for kind, _ in derived])
 
     # No capturar resúmenes BGP de VRFs automáticamente.
     # El módulo BGP solicitará estos comandos bajo demanda.
@@ -220,15 +325,11 @@ def analyze(connection_data: Dict[str, Any]) -> Dict[str, Any]:
     # Parsear según vendor (si sigue desconocido, intentar heurística básica Huawei/Cisco/Juniper)
     parsed: Dict[str, Any] = {"device_info": {}, "interfaces": []}
     v_for_parse = vendor.lower()
-    if v_for_parse == "huawei":
-        parsed["device_info"] = parse_huawei_version(raw_version)
-        parsed["interfaces"] = parse_huawei_ip_interface_brief(raw_ifaces)
-    elif v_for_parse == "cisco":
-        parsed["device_info"] = parse_cisco_version(raw_version)
-        parsed["interfaces"] = parse_cisco_ip_interface_brief(raw_ifaces)
-    elif v_for_parse == "juniper":
-        parsed["device_info"] = parse_juniper_version(raw_version)
-        parsed["interfaces"] = parse_juniper_interfaces_terse(raw_ifaces)
+    if v_for_parse in _BASIC_PARSERS:
+        # Reutilizar lo ya parseado durante el lote
+        parse_version, parse_ifaces = _BASIC_PARSERS[v_for_parse]
+        parsed["device_info"] = early["device_info"] if "device_info" in early else timed_parse(connection_data, parse_version, raw_version)
+        parsed["interfaces"] = early["interfaces"] if "interfaces" in early else timed_parse(connection_data, parse_ifaces, raw_ifaces)
     else:
         # Heurística: intentar Huawei y Cisco si hay pistas en raw_version
         guess = infer_vendor_from_text(raw_version)
@@ -245,6 +346,10 @@ def analyze(connection_data: Dict[str, Any]) -> Dict[str, Any]:
             parsed["interfaces"] = parse_juniper_interfaces_terse(raw_ifaces)
             vendor = "juniper"
 
+    if not cancel_requested(connection_data):
+        # Salidas cortadas por una cancelación no confirman ni invalidan la huella
+        _update_fingerprint(connection_data, vendor.lower(), raw_version, raw_ifaces)
+
     parsed["device_info"]["vendor"] = vendor.title() if vendor != "unknown" else "Unknown"
     parsed["analysis_profile"] = "fast" if fast else "full"
     parsed["raw"] = {
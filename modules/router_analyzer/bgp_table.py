@@ -0,0 +1,88 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Campos operativos que se copian de 'show ip bgp summary' / 'display bgp peer'
+_PEER_FIELDS = ("v", "msg_rcvd", "msg_sent", "tblver", "inq", "outq", "updown", "state", "pref_rcv")
+
+
+class BgpNeighborTable:
+    """Vecinos BGP indexados por (vrf, ip); la VRF global es "".
+
+    Cada vecino es un dict ``{vrf, ip, remote_as, configured, ...}`` al que se
+    van fusionando la configuración (``add_config``) y el estado operativo de
+    los resúmenes (``add_peers``). Las altas y fusiones son consultas a un
+    diccionario, y los índices por VRF y por AS remoto se mantienen al vuelo,
+    así que agregar miles de vecinos en cientos de VRFs es lineal.
+    """
+
+    def __init__(self) -> None:
+        self._rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._by_vrf: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # AS remoto -> claves (vrf, ip) en orden de alta (dict como conjunto ordenado)
+        self._by_as: Dict[str, Dict[Tuple[str, str], None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._rows.values())
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._rows
+
+    def get(self, ip: str, vrf: str = "") -> Optional[Dict[str, Any]]:
+        return self._rows.get((vrf or "", ip))
+
+    def merge(self, ip: str, vrf: str = "", **fields: Any) -> Dict[str, Any]:
+        """Crea o actualiza el vecino (vrf, ip); los valores vacíos no pisan los existentes."""
+        vrf = vrf or ""
+        key = (vrf, ip)
+        row = self._rows.get(key)
+        if row is None:
+            row = {"vrf": vrf, "ip": ip, "remote_as": "", "configured": False}
+            self._rows[key] = row
+            self._by_vrf.setdefault(vrf, {})[ip] = row
+        old_as = row["remote_as"]
+        for name, value in fields.items():
+            if value or name not in row:
+                row[name] = value
+        if row["remote_as"] != old_as:
+            if old_as:
+                self._by_as.get(old_as, {}).pop(key, None)
+            self._by_as.setdefault(row["remote_as"], {})[key] = None
+        return row
+
+    def add_config(self, neighbors: Iterable[Dict[str, Any]], vrf: str = "") -> None:
+        """Vecinos de la configuración: dicts ``{ip, remote_as}``."""
+        for item in neighbors:
+            ip = item.get("ip")
+            if ip:
+                self.merge(ip, item.get("vrf", vrf), remote_as=item.get("remote_as", ""), configured=True)
+
+    def add_peers(self, peers: Iterable[Dict[str, Any]], vrf: str = "") -> None:
+        """Filas de 'show ip bgp summary' / 'display bgp peer' (ver parsers)."""
+        for peer in peers:
+            ip = peer.get("ip")
+            if ip:
+                fields = {name: peer.get(name, "") for name in _PEER_FIELDS}
+                self.merge(ip, vrf, remote_as=peer.get("as", ""), **fields)
+
+    def vrfs(self) -> List[str]:
+        return list(self._by_vrf)
+
+    def by_vrf(self, vrf: str = "") -> List[Dict[str, Any]]:
+        return list(self._by_vrf.get(vrf or "", {}).values())
+
+    def by_as(self, remote_as: str) -> List[Dict[str, Any]]:
+        return [self._rows[key] for key in self._by_as.get(str(remote_as), {})]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self._rows.values())
+
+    def vrf_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        """{vrf: [vecinos]} como datos simples (para la GUI / JSON)."""
+        return {vrf: list(rows.values()) for vrf, rows in self._by_vrf.items()}
+
+    def as_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        """{AS remoto: [vecinos]} como datos simples (para la GUI / JSON)."""
+        return {asn: [self._rows[key] for key in keys] for asn, keys in self._by_as.items() if keys}
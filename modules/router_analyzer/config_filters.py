@@ -0,0 +1,85 @@
+import re
+from typing import List, Optional
+
+
+# Filtros de salida ('| sec', '| include'...) que pueden aplicarse localmente
+# sobre la configuración completa ya descargada, con la misma semántica que
+# el equipo (Cisco IOS / Huawei VRP): se evita que regenere la configuración.
+_LINE_OPS = {"include": "include", "inc": "include", "i": "include",
+             "exclude": "exclude", "exc": "exclude", "e": "exclude",
+             "begin": "begin", "beg": "begin", "b": "begin"}
+_SECTION_OPS = ("section", "sec", "s")
+
+
+def _parse_filter(pipe_filter: str) -> Optional[tuple]:
+    """'sec ospf' -> ('section', 'ospf'); None si el filtro no se soporta localmente."""
+    parts = (pipe_filter or "").strip().split(None, 1)
+    if len(parts) < 2 or "|" in pipe_filter:
+        return None
+    op, arg = parts[0].lower(), parts[1].strip()
+    if op in _SECTION_OPS:
+        # Huawei: 'section include ospf' equivale a 'section ospf'
+        low = arg.lower()
+        for prefix in ("include ", "inc "):
+            if low.startswith(prefix):
+                arg = arg[len(prefix):].strip()
+                break
+        mode = "section"
+    elif op in _LINE_OPS:
+        mode = _LINE_OPS[op]
+    else:
+        return None
+    arg = arg.strip("'\"")
+    return (mode, arg) if arg else None
+
+
+def _matcher(pattern: str):
+    try:
+        return re.compile(pattern).search
+    except re.error:
+        return lambda line: pattern in line
+
+
+def can_filter_locally(pipe_filter: str) -> bool:
+    """True si ``pipe_filter`` puede derivarse de la configuración completa."""
+    return _parse_filter(pipe_filter) is not None
+
+
+def apply_config_filter(config: str, pipe_filter: str) -> Optional[str]:
+    """Aplica ``pipe_filter`` a la configuración completa como lo haría el equipo.
+
+    - include/exclude: líneas que (no) coinciden con la expresión regular
+    - begin: desde la primera línea que coincide
+    - section: bloques de primer nivel (línea sin sangría y sus hijas) con
+      alguna línea coincidente
+    Devuelve None si el filtro no se soporta localmente.
+    """
+    parsed = _parse_filter(pipe_filter)
+    if parsed is None:
+        return None
+    mode, pattern = parsed
+    match = _matcher(pattern)
+    lines = (config or "").replace("\r", "").split("\n")
+    if mode == "include":
+        return "\n".join(ln for ln in lines if match(ln))
+    if mode == "exclude":
+        return "\n".join(ln for ln in lines if not match(ln))
+    if mode == "begin":
+        for i, ln in enumerate(lines):
+            if match(ln):
+                return "\n".join(lines[i:])
+        return ""
+    out: List[str] = []
+    block: List[str] = []
+    hit = False
+    for ln in lines:
+        if ln and not ln[0].isspace():
+            if hit:
+                out.extend(block)
+            block, hit = [ln], bool(match(ln))
+        elif ln.strip():
+            block.append(ln)
+            hit = hit or bool(match(ln))
+    if hit:
+        out.extend(block)
+    return "\n".join(out)
@@ -0,0 +1,189 @@
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+# Líneas separadoras de bloques: '!' (Cisco) y '#' (Huawei); también comentarios
+_SEPARATORS = ("!", "#")
+# Cierres explícitos de bloque ('exit-address-family', 'quit'...): no forman nodo
+_EXIT_WORDS = ("exit", "quit")
+# Índices recientes reutilizados (los parsers OSPF/BGP reciben el mismo texto)
+_CACHE_SIZE = 4
+
+
+class Stanza:
+    """Vista de un bloque del índice: una línea y sus líneas hijas (con más sangría)."""
+
+    __slots__ = ("index", "line")
+
+    def __init__(self, index: "ConfigIndex", line: int) -> None:
+        self.index = index
+        self.line = line
+
+    @property
+    def text(self) -> str:
+        """Cabecera sin sangría."""
+        return self.index.lines[self.line].strip() if self.line >= 0 else ""
+
+    @property
+    def words(self) -> List[str]:
+        return self.text.split()
+
+    @property
+    def indent(self) -> int:
+        if self.line < 0:
+            return -1
+        raw = self.index.lines[self.line]
+        return len(raw) - len(raw.lstrip())
+
+    @property
+    def end(self) -> int:
+        """Fin (exclusivo) de las líneas del bloque: cabecera y descendientes."""
+        return self.index.ends[self.line] if self.line >= 0 else len(self.index.lines)
+
+    @property
+    def parent(self) -> Optional["Stanza"]:
+        if self.line < 0:
+            return None
+        return Stanza(self.index, self.index.parents[self.line])
+
+    @property
+    def children(self) -> List["Stanza"]:
+        parents = self.index.parents
+        return [Stanza(self.index, j) for j in range(self.line + 1, self.end) if parents[j] == self.line]
+
+    def body(self) -> str:
+        """Texto de las líneas hijas (sin la cabecera), tal como aparece en la configuración."""
+        return "\n".join(self.index.lines[self.line + 1:self.end])
+
+    def find(self, keyword: str) -> List["Stanza"]:
+        """Descendientes cuya cabecera empieza por ``keyword`` (en orden del texto)."""
+        found = self.index._lines_for(keyword)
+        lo = bisect_left(found, self.line + 1)
+        hi = bisect_left(found, self.end, lo)
+        return [Stanza(self.index, line) for line in found[lo:hi]]
+
+    def __repr__(self) -> str:
+        return f"Stanza({self.text!r}, line={self.line})"
+
+
+class ConfigIndex:
+    """Árbol de bloques de una configuración construido en una sola pasada.
+
+    La jerarquía se deduce de la sangría; las líneas '!'/'#' y los
+    'exit-*'/'quit' cierran los bloques de su nivel. El árbol se guarda en
+    listas por línea (padre y fin del bloque) y cada cabecera se indexa en la
+    misma pasada por su primera palabra y por sus dos primeras palabras, así
+    que 'interface GigabitEthernet0/1' o 'router bgp' son una consulta a un
+    diccionario. Solo las claves más largas filtran las cabeceras de su par
+    de palabras, una vez por clave.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.lines: List[str] = (text or "").replace("\r", "").split("\n")
+        count = len(self.lines)
+        # parents[i]: línea del bloque padre (-1 en primer nivel; -2 si no es bloque)
+        self.parents: List[int] = [-2] * count
+        self.ends: List[int] = [0] * count
+        self._by_first: Dict[str, List[int]] = {}
+        self._by_pair: Dict[str, List[int]] = {}
+        self._by_key: Dict[str, List[int]] = {}
+        self.root = Stanza(self, -1)
+        parents, ends = self.parents, self.ends
+        by_first, by_pair = self._by_first, self._by_pair
+        stack_lines: List[int] = []
+        stack_indents: List[int] = []
+        last = -1
+        for i, raw in enumerate(self.lines):
+            stripped = raw.lstrip()
+            if not stripped:
+                continue
+            indent = len(raw) - len(stripped)
+            while stack_indents and stack_indents[-1] >= indent:
+                stack_indents.pop()
+                ends[stack_lines.pop()] = last + 1
+            first_char = stripped[0]
+            if first_char in _SEPARATORS:
+                continue
+            cut = stripped.find(" ")
+            first = (stripped[:cut] if cut > 0 else stripped.rstrip()).lower()
+            if first_char in "eEqQ" and first.split("-", 1)[0] in _EXIT_WORDS:
+                continue
+            parents[i] = stack_lines[-1] if stack_lines else -1
+            stack_lines.append(i)
+            stack_indents.append(indent)
+            last = i
+            bucket = by_first.get(first)
+            if bucket is None:
+                by_first[first] = [i]
+            else:
+                bucket.append(i)
+            if cut > 0:
+                rest = stripped[cut + 1:].lstrip()
+                if rest:
+                    cut = rest.find(" ")
+                    pair = first + " " + (rest[:cut] if cut > 0 else rest.rstrip()).lower()
+                    bucket = by_pair.get(pair)
+                    if bucket is None:
+                        by_pair[pair] = [i]
+                    else:
+                        bucket.append(i)
+        for line in stack_lines:
+            ends[line] = last + 1
+
+    def find(self, keyword: str) -> List[Stanza]:
+        """Bloques (a cualquier nivel) cuya cabecera empieza por ``keyword``."""
+        return [Stanza(self, line) for line in self._lines_for(keyword)]
+
+    def _lines_for(self, keyword: str) -> List[int]:
+        # Líneas (ordenadas) de las cabeceras que empiezan por ``keyword``
+        words = keyword.lower().split()
+        if not words:
+            return []
+        if len(words) == 1:
+            return self._by_first.get(words[0], [])
+        pair = words[0] + " " + words[1]
+        if len(words) == 2:
+            return self._by_pair.get(pair, [])
+        key = " ".join(words)
+        found = self._by_key.get(key)
+        if found is None:
+            found = []
+            width = len(words)
+            for line in self._by_pair.get(pair, []):
+                if [w.lower() for w in self.lines[line].split()[:width]] == words:
+                    found.append(line)
+            self._by_key[key] = found
+        return found
+
+    def first(self, keyword: str) -> Optional[Stanza]:
+        found = self.find(keyword)
+        return found[0] if found else None
+
+    def top_level(self) -> List[Stanza]:
+        return self.root.children
+
+
+_cache: "OrderedDict[str, ConfigIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def build_index(text: str) -> ConfigIndex:
+    """Índice de ``text``; reutiliza el de los últimos textos indexados."""
+    with _cache_lock:
+        idx = _cache.get(text)
+        if idx is not None:
+            _cache.move_to_end(text)
+            return idx
+    idx = ConfigIndex(text)
+    with _cache_lock:
+        _cache[text] = idx
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return idx
+
+
+def clear_index_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
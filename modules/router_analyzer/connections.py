@@ -3,7 +3,10 @@ import subprocess
 import time
 import socket
 import asyncio
-from typing import Dict, Any, List
+import atexit
+import threading
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
 import re
 
 try:
@@ -21,15 +24,24 @@ try:
 except Exception:
     telnet3 = None  # type: ignore
 
+from .engine import get_engine, run_sync
+from .session_pool import SessionPool, session_key
+from .stream_sanitizer import StreamSanitizer, sanitize_text
+from .latency_store import adaptive_timeouts, record_latency, flush_latencies
+from .timings import add_timing_total, record_span, timing_span
+from .transcripts import record_serial_port, record_ssh_client, record_telnet_streams, replay_for, replaying
+from .vendor_commands import command_spec
+
 # Comandos por vendor para deshabilitar paginación
 try:
-    from .vendor_commands import DISABLE_PAGING  # type: ignore
+    from .vendor_commands import DISABLE_PAGING, COMMENT_MARKER  # type: ignore
 except Exception:
     DISABLE_PAGING = {
         "huawei": ["screen-length 0 temporary"],
         "cisco": ["terminal length 0"],
         "juniper": ["set cli screen-length 0"],
     }
+    COMMENT_MARKER = {"huawei": "#", "cisco": "!", "juniper": "#"}
 
 def _sanitize_output(text: str) -> str:
     """Limpia artefactos comunes de CLI: ANSI, paginación y backspaces.
@@ -37,24 +49,11 @@ def _sanitize_output(text: str) -> str:
     - Elimina secuencias ANSI (\x1b[...)
     - Resuelve backspaces (\b) aplicando borrado sobre un buffer
     - Quita textos de paginación como '--More--' y '---- More ----'
+
+    Las lecturas de sesión limpian en streaming con ``StreamSanitizer``; esta
+    función es para textos ya completos.
     """
-    if not text:
-        return ""
-    # Quitar ANSI escape sequences
-    text = re.sub(r"\x1b\[[0-9;]*[A-Za-z]", "", text)
-    # Resolver backspaces aplicando borrado
-    buf: List[str] = []
-    for ch in text:
-        if ch == "\b":
-            if buf:
-                buf.pop()
-        else:
-            buf.append(ch)
-    text = "".join(buf)
-    # Quitar indicadores de paginación
-    text = text.replace("--More--", "").replace("--more--", "")
-    text = text.replace("---- More ----", "")
-    return text
+    return sanitize_text(text)
 
 
 def _vendor_from_prompt(prompt: str) -> str:
@@ -94,9 +93,259 @@ def _vendor_from_prompt(prompt: str) -> str:
     return "desconocido"
 
 
+def _vendor_from_ssh_banner(banner: str) -> str:
+    """Fabricante a partir de la cadena de versión del servidor SSH.
+
+    Ej.: 'SSH-2.0-Cisco-1.25' -> cisco, 'SSH-2.0-HUAWEI-1.5' -> huawei.
+    Banners genéricos (OpenSSH, dropbear, 'SSH-2.0--') son ambiguos y
+    devuelven 'desconocido'.
+    """
+    t = (banner or "").strip()
+    if not t.upper().startswith("SSH-"):
+        return "desconocido"
+    # Campo de software: lo que sigue a 'SSH-<protover>-'
+    parts = t.split("-", 2)
+    software = parts[2].lower() if len(parts) > 2 else ""
+    if software.startswith("cisco"):
+        return "cisco"
+    if software.startswith("huawei") or software.startswith("vrp"):
+        return "huawei"
+    if "junos" in software or "juniper" in software:
+        return "juniper"
+    return "desconocido"
+
+
+def _looks_like_prompt(line: str) -> bool:
+    """Heurística de prompt CLI (Cisco '#'/'>', Huawei '<..>'/'[..]', Juniper 'user@host>')."""
+    t = (line or "").strip()
+    if not t:
+        return False
+    if re.search(r"[<\[][^^\]>]+[>\]]\s*$", t):
+        return True
+    if ("@" in t) and (t.endswith("#") or t.endswith(">") or t.endswith("%")):
+        return True
+    if (t.endswith("#") or t.endswith(">")) and ("@" not in t):
+        return True
+    return False
+
+
+def _prompt_pattern(prompt_line: str) -> Optional["re.Pattern[str]"]:
+    """Construye la regex del prompt aprendido tras el login.
+
+    Admite los cambios de modo habituales sin reaprender el prompt:
+    - Cisco: ``R1>``, ``R1#``, ``R1(config-if)#``
+    - Huawei: ``<HUAWEI>``, ``[HUAWEI]``, ``[~HUAWEI-GigabitEthernet0/0/1]``
+    - Juniper: ``lab@mx>``, ``lab@mx#``
+    """
+    t = _sanitize_output(prompt_line or "").replace("\r", "").strip()
+    if not _looks_like_prompt(t):
+        return None
+    if t[0] in "<[":
+        m = re.match(r"^[<\[][~*]?([^\]>\s-]+)", t)
+        if not m:
+            return None
+        name = re.escape(m.group(1))
+        return re.compile(rf"[<\[][~*]?{name}(?:-[^\]>\r\n]*)?[>\]]")
+    if "@" in t:
+        base = re.escape(t.rstrip(">#% ").strip())
+        return re.compile(rf"{base}[>#%]")
+    base = re.escape(re.split(r"[(>#]", t, 1)[0])
+    return re.compile(rf"{base}(?:\([^)\r\n]*\))?[>#]")
+
+
+def _ends_with_prompt(buf: str, prompt_re: Any = None, expected: int = 1) -> bool:
+    """True si ``buf`` termina en un prompt y ya contiene ``expected`` prompts.
+
+    Con ``prompt_re=None`` se usa la heurística genérica ``_looks_like_prompt``
+    (solo sirve para esperar el primer prompt, ``expected=1``). Los prompts se
+    cuentan al inicio de línea, incluyendo los que llevan el eco del comando.
+    """
+    if not buf:
+        return False
+    tail = _sanitize_output(buf[buf.rfind("\n") + 1:]).replace("\r", "").strip()
+    if not tail:
+        return False
+    if prompt_re is None:
+        return expected <= 1 and _looks_like_prompt(tail)
+    if not prompt_re.fullmatch(tail):
+        return False
+    if expected <= 1:
+        return True
+    count = 0
+    for ln in _sanitize_output(buf).replace("\r", "").splitlines():
+        if prompt_re.match(ln.strip()):
+            count += 1
+            if count >= expected:
+                return True
+    return False
+
+
+def _login_step_done(buf: str) -> bool:
+    """Fin de una lectura de login: pide usuario/contraseña o ya hay prompt."""
+    tail = _sanitize_output(buf[buf.rfind("\n") + 1:]).replace("\r", "").strip().lower()
+    if tail.endswith(("username:", "user name:", "login:", "password:", "pass word:")):
+        return True
+    return _ends_with_prompt(buf)
+
+
+def _strip_echo_and_prompt(text: str, cmd: str) -> str:
+    t = text.replace("\r", "")
+    lines = t.splitlines()
+    # quitar eco del comando
+    c = (cmd or "").strip().lower()
+    out_lines: List[str] = []
+    skipped_echo = False
+    for ln in lines:
+        if not skipped_echo and c and ln.strip().lower().startswith(c):
+            skipped_echo = True
+            continue
+        out_lines.append(ln)
+    # quitar prompt final si lo hay
+    while out_lines and not out_lines[-1].strip():
+        out_lines.pop()
+    if out_lines and _looks_like_prompt(out_lines[-1]):
+        out_lines.pop()
+    return "\n".join(out_lines)
+
+
+# ---- Ejecución en tubería (pipeline_commands) ----
+# Se escribe todo el lote de una vez intercalando comentarios únicos; el eco
+# de cada comentario delimita la salida del comando siguiente.
+def _pipeline_markers(vendor: str, count: int) -> List[str]:
+    prefix = COMMENT_MARKER.get(vendor, "!")
+    token = "rmk" + uuid.uuid4().hex[:10]
+    return [f"{prefix} {token}-{i}" for i in range(count + 1)]
+
+
+def _pipeline_payload(commands: List[str], markers: List[str], eol: str) -> str:
+    parts: List[str] = []
+    for marker, cmd in zip(markers, commands):
+        parts.append(marker + eol)
+        parts.append(cmd + eol)
+    parts.append(markers[-1] + eol)
+    return "".join(parts)
+
+
+def _pipeline_done(buf: str, markers: List[str], prompt_re: Any) -> bool:
+    """True cuando llegó el eco del último marcador y el prompt posterior."""
+    last = markers[-1].split(" ", 1)[-1]
+    pos = buf.rfind(last)
+    if pos < 0:
+        return False
+    nl = buf.find("\n", pos)
+    if nl < 0:
+        return False
+    return _ends_with_prompt(buf[nl + 1:], prompt_re)
+
+
+def _split_pipelined(text: str, commands: List[str], markers: List[str]) -> List[str]:
+    """Divide la salida en tubería en una salida por comando usando los marcadores."""
+    prefix, token = markers[0].split(" ", 1)
+    token = token.rsplit("-", 1)[0]
+    mark_re = re.compile(re.escape(token) + r"-(\d+)\b")
+    segments: List[List[str]] = [[] for _ in commands]
+    current = -1
+    for ln in _sanitize_output(text).replace("\r", "").splitlines():
+        m = mark_re.search(ln)
+        if m:
+            # El prompt previo al eco del marcador cierra la salida anterior
+            prompt = ln[:m.start()].rstrip()
+            if prompt.endswith(prefix):
+                prompt = prompt[:-len(prefix)]
+            if 0 <= current < len(commands) and prompt.strip():
+                segments[current].append(prompt)
+            current = int(m.group(1))
+            continue
+        if 0 <= current < len(commands):
+            segments[current].append(ln)
+    outputs: List[str] = []
+    for cmd, seg in zip(commands, segments):
+        # Descartar lo previo al eco del comando (p.ej. error por el marcador)
+        c = (cmd or "").strip().lower()
+        for i, ln in enumerate(seg):
+            if c and c in ln.lower():
+                seg = seg[i:]
+                break
+        outputs.append(_strip_echo_and_prompt("\n" + "\n".join(seg), cmd))
+    return outputs
+
+
+def _emit_result(on_result: Any, index: int, cmd: str, output: str, started: float) -> None:
+    """Notifica ``on_result(index, cmd, salida, segundos)`` sin interrumpir el lote si falla."""
+    if on_result is None:
+        return
+    try:
+        on_result(index, cmd, output, time.time() - started)
+    except Exception as e:
+        print(f"[CLI] Error en callback de resultado para '{cmd}': {e}")
+
+
+def _command_timeouts(connection_data: Dict[str, Any], cmd: str, fast: bool) -> Tuple[float, float, bool]:
+    """``(idle, hard, aprendido)`` para leer la salida de ``cmd``.
+
+    Parte de los tiempos de la clase de coste del comando (``command_spec``)
+    y los sustituye por los aprendidos del dispositivo (``latency_store``)
+    cuando hay historial.
+    """
+    idle, hard = command_spec(cmd).timeouts(fast)
+    return adaptive_timeouts(connection_data, cmd, idle, hard)
+
+
+def _joined_reads(first: Tuple[float, float, float, bool], second: Tuple[float, float, float, bool]) -> Tuple[float, float, float, bool]:
+    """Una sola muestra de ``latency_store`` para una lectura y su continuación."""
+    ttfb1, total1, gap1, _complete = first
+    ttfb2, total2, gap2, complete = second
+    ttfb = ttfb1 if ttfb1 < total1 else total1 + ttfb2
+    # El silencio que cortó la primera lectura sigue en la segunda (cota inferior)
+    return ttfb, total1 + total2, max(gap1, gap2, ttfb2), complete
+
+
+def cancel_requested(connection_data: Dict[str, Any]) -> bool:
+    """True si se pidió cancelar el análisis en curso (``cancel_event``, ver ``abort_session``)."""
+    event = connection_data.get("cancel_event")
+    return event is not None and event.is_set()
+
+
+def _needs_paging_disabled(commands: List[str]) -> bool:
+    return any(command_spec(c).paging for c in commands)
+
+
+def _remap_result(on_result: Any, indices: List[int]) -> Any:
+    # Reintentos de un sublote: devolver el índice del lote original
+    if on_result is None:
+        return None
+    return lambda i, cmd, out, elapsed: on_result(indices[i], cmd, out, elapsed)
+
+
+def _emit_all(on_result: Any, commands: List[str], outputs: List[str], started: float) -> None:
+    # Modo tubería: todas las salidas llegan juntas al final del lote
+    for i, (cmd, out) in enumerate(zip(commands, outputs)):
+        _emit_result(on_result, i, cmd, out, started)
+
+
+def _last_nonempty_line(text: str) -> str:
+    for pl in reversed((text or "").splitlines()):
+        pl = pl.strip()
+        if pl:
+            return pl
+    return ""
+
+
 # -------- Clases de conexión con manejo de paginación ---------
+# Todas aceptan ``persistent=True`` para usarse desde el pool de sesiones:
+# en ese modo no cierran el transporte al terminar cada llamada y recuerdan
+# el estado de paginación/enable de la sesión abierta.
 class SSHConnection:
-    def __init__(self, connection_data: Dict[str, Any]):
+    """Sesión SSH (paramiko) cuyo shell interactivo se atiende desde el motor.
+
+    El handshake y la apertura del canal se ejecutan en el executor del bucle
+    (son bloqueantes en paramiko); las lecturas del shell esperan eventos
+    sobre ``Channel.fileno()`` en lugar de sondear con ``time.sleep``.
+    Los métodos ``*_async`` son la API nativa; ``run_batch``/``read_prompt``
+    son envoltorios síncronos para los llamadores existentes.
+    """
+
+    def __init__(self, connection_data: Dict[str, Any], persistent: bool = False):
         self.connection_data = connection_data
         self.host = connection_data.get("hostname", "")
         self.port = int(connection_data.get("port", 22) or 22)
@@ -106,192 +355,564 @@ class SSHConnection:
         self.paging_disabled = bool(connection_data.get("paging_disabled"))
         self.verbose = bool(connection_data.get("verbose"))
         self.vendor = (connection_data.get("vendor_hint") or "").lower()
-
-    def _disable_paging_once(self, client: Any) -> None:
-        if self.paging_disabled:
-            return
+        self.persistent = persistent
+        self.lock = threading.RLock()
+        self.last_used = time.time()
+        self._client: Any = None
+        self._chan: Any = None
+        self._alock: Any = None
+        self._exec_paging_done = False
+        # None: sin probar; False: el equipo rechazó los canales exec
+        self._exec_supported: Optional[bool] = None
+        # (primer byte, total, mayor silencio, completa) de la última lectura
+        self.last_read: Tuple[float, float, float, bool] = (0.0, 0.0, 0.0, True)
+        # Bytes recibidos en la última lectura (registro de tiempos)
+        self.last_read_bytes = 0
+        # Prompt aprendido tras el login; marca el fin de cada salida
+        self.prompt = ""
+        self.prompt_re: Any = None
+        # Grabación a reproducir en lugar del equipo (``replay_transcript``)
+        self._replay = replay_for(connection_data)
+
+    def _available(self) -> bool:
+        return bool(self.host) and (paramiko is not None or self._replay is not None)
+
+    def bind(self, connection_data: Dict[str, Any], vendor: str = "") -> None:
+        """Asocia la sesión a los datos de conexión del llamador actual.
+
+        Actualiza opciones por llamada (fast_mode, verbose, vendor) sin reabrir
+        el transporte y refleja el estado de paginación de la sesión.
+        """
+        self.connection_data = connection_data
+        self.fast = bool(connection_data.get("fast_mode"))
+        self.verbose = bool(connection_data.get("verbose"))
+        ven = (vendor or connection_data.get("vendor_hint") or "").lower()
+        if ven in ("huawei", "cisco", "juniper"):
+            self.vendor = ven
+        if self.persistent and self.paging_disabled:
+            connection_data["paging_disabled"] = True
+        self.last_used = time.time()
+
+    def is_reusable(self) -> bool:
+        if self._client is None:
+            return True
         try:
-            vendor = (self.vendor or self.connection_data.get("vendor_hint") or "").lower()
-            cmds = DISABLE_PAGING.get(vendor, []) if vendor else []
-            for p_cmd in cmds:
+            transport = self._client.get_transport()
+            return bool(transport is not None and transport.is_active())
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        with self.lock:
+            for obj in (self._chan, self._client):
+                if obj is None:
+                    continue
                 try:
-                    _in, _out, _err = client.exec_command(p_cmd, timeout=3 if self.fast else 5)
-                    _ = _out.read().decode(errors="ignore")
-                    _ = _err.read().decode(errors="ignore")
+                    obj.close()
                 except Exception:
                     pass
-        except Exception:
-            pass
-        self.paging_disabled = True
+            self._chan = None
+            self._client = None
+            self.prompt = ""
+            self.prompt_re = None
+
+    def abort(self) -> None:
+        """Corta el transporte sin tomar ``lock`` (lo retiene el lote en curso).
+
+        Los canales abiertos se marcan cerrados y despiertan su ``fileno``: la
+        lectura pendiente termina con lo recibido y la sesión deja de ser
+        reutilizable (el pool la sustituye en el siguiente ``acquire``).
+        """
+        client = self._client
+        if client is not None:
+            _close_quietly(client)
+
+    def _async_lock(self) -> Any:
+        # Serializa el uso del shell entre corrutinas (todas en el bucle del motor)
+        if self._alock is None:
+            self._alock = asyncio.Lock()
+        return self._alock
+
+    def _connect_client(self, timeout: float) -> Any:
+        with self.lock:
+            if self._client is not None and self.is_reusable():
+                return self._client
+            self.close()
+            if self._replay is not None:
+                client = self._replay.ssh_client()
+            else:
+                client = paramiko.SSHClient()
+                client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+                with timing_span(self.connection_data, "login", "session", protocol="ssh"):
+                    client.connect(self.host, port=self.port, username=self.username or None, password=self.password or None,
+                                   look_for_keys=False, allow_agent=False, timeout=timeout)
+                client = record_ssh_client(self.connection_data, client)
+            self._client = client
+            self._exec_paging_done = False
+            return client
+
+    async def _open_shell(self, timeout: float) -> Any:
+        chan = self._chan
+        if chan is not None and not chan.closed and self.is_reusable():
+            return chan
+        loop = asyncio.get_running_loop()
+        with timing_span(self.connection_data, "open_shell", "session"):
+            client = await loop.run_in_executor(None, self._connect_client, timeout)
+            chan = await loop.run_in_executor(None, client.invoke_shell)
+            self._chan = chan
+            # Shell nuevo: la paginación vuelve a estar activa en el equipo
+            if self.persistent:
+                self.paging_disabled = False
+            # Drenar banner hasta el prompt inicial y aprenderlo
+            self.prompt, self.prompt_re = "", None
+            banner = await self._read_until_idle(chan, idle_window=0.5 if self.fast else 0.8, hard_timeout=3.0, expected_prompts=1)
+            self._learn_prompt(banner)
+        return chan
+
+    def _learn_prompt(self, text: str) -> None:
+        line = _last_nonempty_line(_sanitize_output(text).replace("\r", ""))
+        pattern = _prompt_pattern(line)
+        if pattern is not None:
+            self.prompt, self.prompt_re = line, pattern
+
+    def _disable_paging_once(self, client: Any) -> None:
+        if self._exec_paging_done or (self.paging_disabled and not self.persistent):
+            return
+        with timing_span(self.connection_data, "disable_paging", "session"):
+            try:
+                vendor = (self.vendor or self.connection_data.get("vendor_hint") or "").lower()
+                cmds = DISABLE_PAGING.get(vendor, []) if vendor else []
+                for p_cmd in cmds:
+                    try:
+                        _in, _out, _err = client.exec_command(p_cmd, timeout=3 if self.fast else 5)
+                        _ = _out.read().decode(errors="ignore")
+                        _ = _err.read().decode(errors="ignore")
+                    except Exception:
+                        pass
+            except Exception:
+                pass
+        self._exec_paging_done = True
+        if not self.persistent:
+            self.paging_disabled = True
         self.connection_data["paging_disabled"] = True
 
     def run(self, cmd: str) -> str:
-        if not self.host or paramiko is None:
+        """Canal exec (sin shell): síncrono, paramiko multiplexa canales sobre el transporte."""
+        if not self._available():
             return ""
+        with self.lock:
+            try:
+                cmd_timeout = 1.8 if self.fast else 3
+                client = self._connect_client(cmd_timeout)
+                # Deshabilitar paginación solo si es necesario (comandos largos)
+                if bool(self.connection_data.get("need_paging_disabled")):
+                    self._disable_paging_once(client)
+                # Ejecutar comando
+                stdin, stdout, stderr = client.exec_command(cmd, timeout=cmd_timeout)
+                out = stdout.read().decode(errors="ignore") + stderr.read().decode(errors="ignore")
+                return _sanitize_output(out)
+            except Exception as e:
+                print(f"[SSH] Error ejecutando '{cmd}': {e}")
+                # Descartar transporte roto para que la siguiente llamada reconecte
+                self.close()
+                return ""
+            finally:
+                self.last_used = time.time()
+                if not self.persistent:
+                    self.close()
+
+    async def _wait_readable(self, chan: Any, timeout: float) -> None:
+        """Espera (sin sondear) a que el canal tenga datos, o ``timeout``."""
+        if timeout <= 0 or chan.recv_ready() or chan.closed:
+            return
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+
+        def _ready() -> None:
+            if not fut.done():
+                fut.set_result(None)
+
         try:
-            cmd_timeout = 1.8 if self.fast else 3
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(self.host, port=self.port, username=self.username or None, password=self.password or None,
-                           look_for_keys=False, allow_agent=False, timeout=cmd_timeout)
-            # Deshabilitar paginación solo si es necesario (comandos largos)
-            if bool(self.connection_data.get("need_paging_disabled")):
-                self._disable_paging_once(client)
-            # Ejecutar comando
-            stdin, stdout, stderr = client.exec_command(cmd, timeout=cmd_timeout)
-            out = stdout.read().decode(errors="ignore") + stderr.read().decode(errors="ignore")
-            client.close()
-            return _sanitize_output(out)
-        except Exception as e:
-            print(f"[SSH] Error ejecutando '{cmd}': {e}")
-            return ""
+            fd = chan.fileno()
+            loop.add_reader(fd, _ready)
+        except Exception:
+            # Bucle sin soporte de add_reader: respaldo por sondeo corto
+            await asyncio.sleep(min(timeout, 0.01))
+            return
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(fd)
+
+    async def _read_until_idle(self, chan: Any, idle_window: float, hard_timeout: float, expected_prompts: int = 0, until: Any = None) -> str:
+        """Lee hasta ver el prompt (``expected_prompts`` > 0) o, como respaldo, hasta silencio.
 
-    def run_batch(self, commands: List[str]) -> List[str]:
+        Con prompt aprendido la ventana de silencio se amplía: solo debe
+        cortar si el prompt no llega (equipo lento o prompt cambiado).
+        ``until(buf)`` permite un criterio de fin propio (modo tubería).
+        Deja en ``last_read`` los tiempos observados (ver ``latency_store``).
+        """
+        if until is None and expected_prompts > 0 and (self.prompt_re is not None or expected_prompts == 1):
+            until = lambda b: _ends_with_prompt(b, self.prompt_re, expected_prompts)
+        until_prompt = until is not None
+        if until_prompt and self.prompt_re is not None:
+            idle_window = max(idle_window, 2.5 if self.fast else 4.0)
+        start = time.time()
+        last = start
+        first: Optional[float] = None
+        gap = 0.0
+        complete = not until_prompt
+        san = StreamSanitizer()
+        carry = ""
+        while True:
+            now = time.time()
+            if (now - start) > hard_timeout or cancel_requested(self.connection_data):
+                complete = False
+                break
+            if (now - last) > idle_window:
+                if until_prompt and self.prompt_re is not None:
+                    # El prompt pudo cambiar (p.ej. 'hostname'): reaprender
+                    self._learn_prompt(san.getvalue())
+                break
+            await self._wait_readable(chan, min(hard_timeout - (now - start), idle_window - (now - last)))
+            try:
+                data = chan.recv(4096) if chan.recv_ready() else b""
+            except Exception:
+                data = b""
+            if data:
+                now = time.time()
+                if first is None:
+                    first = now - start
+                else:
+                    gap = max(gap, now - last)
+                last = now
+                part = san.feed(data)
+                if san.more_seen:
+                    try:
+                        chan.send(" ")
+                    except Exception:
+                        pass
+                if self.verbose:
+                    carry += part
+                    while "\n" in carry:
+                        line, carry = carry.split("\n", 1)
+                        print(f"[SSH] {line}")
+                if until_prompt and san.maybe_at_stop() and until(san.getvalue()):
+                    complete = True
+                    break
+            elif chan.closed or chan.exit_status_ready():
+                break
+        if carry and self.verbose:
+            print(f"[SSH] {carry}")
+        text = san.flush()
+        total = time.time() - start
+        self.last_read = (total if first is None else first, total, gap, complete)
+        self.last_read_bytes = san.bytes_in
+        add_timing_total(self.connection_data, "sanitize", san.busy, san.chunks)
+        return text
+
+    async def _disable_paging_shell(self, chan: Any) -> None:
+        if self.paging_disabled:
+            return
+        with timing_span(self.connection_data, "disable_paging", "session"):
+            try:
+                vendor = (self.vendor or self.connection_data.get("vendor_hint") or "").lower()
+                cmds = DISABLE_PAGING.get(vendor, []) if vendor else []
+                for p_cmd in cmds:
+                    try:
+                        chan.send(p_cmd + "\n")
+                        if self.prompt_re is None:
+                            await asyncio.sleep(0.18 if self.fast else 0.28)
+                        _ = await self._read_until_idle(chan, idle_window=0.6 if self.fast else 0.8, hard_timeout=1.2 if self.fast else 1.6, expected_prompts=1)
+                    except Exception:
+                        pass
+                # Drenar restos (innecesario si cada lectura terminó en el prompt)
+                if self.prompt_re is None:
+                    _ = await self._read_until_idle(chan, idle_window=0.5 if self.fast else 0.7, hard_timeout=1.0 if self.fast else 1.2)
+            except Exception:
+                pass
+        self.paging_disabled = True
+        self.connection_data["paging_disabled"] = True
+
+    async def run_batch_async(self, commands: List[str], on_result: Any = None) -> List[str]:
         """Ejecuta múltiples comandos reutilizando una sola sesión SSH.
 
-        Minimiza handshakes y reduce la latencia total.
+        Minimiza handshakes y reduce la latencia total. En modo persistente el
+        shell queda abierto para el siguiente llamador. ``on_result(i, cmd,
+        salida, segundos)`` se invoca (en el hilo del motor) al terminar cada
+        comando; debe ser breve.
         """
+        if not self._available() or cancel_requested(self.connection_data):
+            return []
+        async with self._async_lock():
+            try:
+                if self._parallel_exec_enabled(commands):
+                    outputs = await self._run_parallel_exec(commands, on_result)
+                    missing = [i for i, out in enumerate(outputs) if not out.strip()]
+                    if missing and not cancel_requested(self.connection_data):
+                        # Exec rechazado (o sin salida): repetir esos comandos en el shell
+                        retry = await self._run_shell_batch([commands[i] for i in missing], _remap_result(on_result, missing))
+                        for i, out in zip(missing, retry):
+                            outputs[i] = out
+                    return outputs
+                return await self._run_shell_batch(commands, on_result)
+            except Exception as e:
+                print(f"[SSH] Error en run_batch: {e}")
+                self.close()
+                return []
+            finally:
+                self.last_used = time.time()
+                if not self.persistent:
+                    self.close()
+
+    async def _run_shell_batch(self, commands: List[str], on_result: Any = None) -> List[str]:
+        """Ejecuta el lote en el shell interactivo (uno tras otro o en tubería)."""
         outputs: List[str] = []
-        if not self.host or paramiko is None:
+        # Establecer cliente y abrir shell interactivo para batch
+        cmd_timeout = 4 if self.fast else 6
+        chan = await self._open_shell(cmd_timeout)
+
+        # Deshabilitar paginación si hay comandos largos o está solicitado
+        if bool(self.connection_data.get("need_paging_disabled")) or _needs_paging_disabled(commands):
+            await self._disable_paging_shell(chan)
+
+        if self._pipeline_enabled(commands):
+            await self._disable_paging_shell(chan)
+            started = time.time()
+            outputs = await self._run_pipelined(chan, commands)
+            record_span(self.connection_data, "pipeline", started, time.time(), "command",
+                        commands=len(commands), bytes=self.last_read_bytes)
+            _emit_all(on_result, commands, outputs, started)
+            if chan.closed:
+                self.close()
             return outputs
-        try:
-            # Establecer cliente y abrir shell interactivo para batch
-            cmd_timeout = 4 if self.fast else 6
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(self.host, port=self.port, username=self.username or None, password=self.password or None,
-                           look_for_keys=False, allow_agent=False, timeout=cmd_timeout)
-
-            chan = client.invoke_shell()
-            # Pequeña espera para recibir prompt inicial
-            time.sleep(0.20 if self.fast else 0.30)
-
-            def _looks_like_prompt(line: str) -> bool:
-                t = (line or "").strip()
-                if not t:
-                    return False
-                if re.search(r"[<\[][^^\]>]+[>\]]\s*$", t):
-                    return True
-                if ("@" in t) and (t.endswith("#") or t.endswith(">") or t.endswith("%")):
-                    return True
-                if (t.endswith("#") or t.endswith(">")) and ("@" not in t):
-                    return True
-                return False
 
-            def _read_until_idle(idle_window: float, hard_timeout: float) -> str:
-                start = time.time()
-                last = start
-                buf = ""
-                carry = ""
-                while True:
-                    now = time.time()
-                    if (now - start) > hard_timeout:
-                        break
-                    if (now - last) > idle_window:
-                        break
-                    try:
-                        if chan.recv_ready():
-                            part = chan.recv(512).decode(errors="ignore")
-                        else:
-                            part = ""
-                    except Exception:
-                        part = ""
-                    if part:
-                        last = now
-                        low = part.lower()
-                        if "--more--" in low or " ---- more ---- " in low or "---- more ----" in low:
-                            try:
-                                chan.send(" ")
-                            except Exception:
-                                pass
-                            time.sleep(0.08 if self.fast else 0.12)
-                            part = part.replace("--More--", "").replace("--more--", "").replace("---- More ----", "")
-                        buf += part
-                        carry += part
-                        while "\n" in carry:
-                            line, carry = carry.split("\n", 1)
-                            if self.verbose:
-                                print(f"[SSH] {line}")
-                    else:
-                        time.sleep(0.06 if self.fast else 0.1)
-                if carry and self.verbose:
-                    print(f"[SSH] {carry}")
-                return buf
-
-            def _strip_echo_and_prompt(text: str, cmd: str) -> str:
-                t = text.replace("\r", "")
-                lines = t.splitlines()
-                c = (cmd or "").strip().lower()
-                out_lines: List[str] = []
-                skipped_echo = False
-                for ln in lines:
-                    if not skipped_echo and c and ln.strip().lower().startswith(c):
-                        skipped_echo = True
-                        continue
-                    out_lines.append(ln)
-                while out_lines and not out_lines[-1].strip():
-                    out_lines.pop()
-                if out_lines and _looks_like_prompt(out_lines[-1]):
-                    out_lines.pop()
-                return "\n".join(out_lines)
-
-            def _disable_paging_shell() -> None:
-                if self.paging_disabled:
-                    return
-                try:
-                    vendor = (self.vendor or self.connection_data.get("vendor_hint") or "").lower()
-                    cmds = DISABLE_PAGING.get(vendor, []) if vendor else []
-                    for p_cmd in cmds:
-                        try:
-                            chan.send(p_cmd + "\n")
-                            time.sleep(0.18 if self.fast else 0.28)
-                            _ = _read_until_idle(idle_window=0.6 if self.fast else 0.8, hard_timeout=1.2 if self.fast else 1.6)
-                        except Exception:
-                            pass
-                    # Drenar restos
-                    _ = _read_until_idle(idle_window=0.5 if self.fast else 0.7, hard_timeout=1.0 if self.fast else 1.2)
-                except Exception:
-                    pass
-                self.paging_disabled = True
-                self.connection_data["paging_disabled"] = True
+        # Ejecutar comandos en el shell
+        for i, cmd in enumerate(commands):
+            if cancel_requested(self.connection_data):
+                # Cancelado: no enviar el resto del lote
+                outputs.extend("" for _ in commands[i:])
+                break
+            started = time.time()
+            try:
+                if self.prompt_re is not None:
+                    # Prompt conocido: la lectura termina en el segundo prompt
+                    # (el del salto de línea con el eco y el final)
+                    chan.send("\n" + cmd + "\n")
+                else:
+                    chan.send("\n")
+                    await asyncio.sleep(0.10 if self.fast else 0.15)
+                    chan.send(cmd + "\n")
+                    await asyncio.sleep(0.12 if self.fast else 0.2)
+                raw = await self._read_command(chan, cmd)
+                record_span(self.connection_data, cmd, started, time.time(), "command", bytes=self.last_read_bytes)
+                outputs.append(_strip_echo_and_prompt(raw, cmd))
+            except Exception as e:
+                print(f"[SSH] Error ejecutando '{cmd}' en batch: {e}")
+                outputs.append("")
+            _emit_result(on_result, i, cmd, outputs[-1], started)
+        if chan.closed:
+            self.close()
+        return outputs
 
-            # Deshabilitar paginación si hay comandos largos o está solicitado
-            long_in_batch = any(any(t in (c or "").lower() for t in ("running-config", "current-configuration", "show configuration")) for c in commands)
-            if bool(self.connection_data.get("need_paging_disabled")) or long_in_batch:
-                _disable_paging_shell()
+    async def _read_command(self, chan: Any, cmd: str) -> str:
+        """Lee la salida de ``cmd`` (ya enviado) hasta el segundo prompt.
 
-            # Ejecutar comandos en el shell
-            for cmd in commands:
+        Si con los tiempos aprendidos el prompt no llega (respuesta más lenta
+        de lo habitual), sigue leyendo con los fijos de su clase de coste: la
+        salida cortada desalinearía la del comando siguiente.
+        """
+        idle, hard, learned = _command_timeouts(self.connection_data, cmd, self.fast)
+        raw = await self._read_until_idle(chan, idle_window=idle, hard_timeout=hard, expected_prompts=2)
+        timing, read_bytes = self.last_read, self.last_read_bytes
+        if learned and not timing[3] and self.prompt_re is not None and not cancel_requested(self.connection_data):
+            head = raw
+            idle, hard = command_spec(cmd).timeouts(self.fast)
+            raw += await self._read_until_idle(chan, idle_window=idle, hard_timeout=hard,
+                                               until=lambda b: _ends_with_prompt(head + b, self.prompt_re, 2))
+            timing = _joined_reads(timing, self.last_read)
+            self.last_read, self.last_read_bytes = timing, read_bytes + self.last_read_bytes
+        record_latency(self.connection_data, cmd, *timing)
+        return raw
+
+    def _parallel_exec_enabled(self, commands: List[str]) -> bool:
+        # Solo lotes íntegramente de consulta: el orden entre comandos deja de importar
+        return (bool(self.connection_data.get("parallel_exec")) and self._exec_supported is not False
+                and len(commands) > 1 and all(command_spec(c).read_only for c in commands))
+
+    async def _run_parallel_exec(self, commands: List[str], on_result: Any = None) -> List[str]:
+        """Ejecuta cada comando en su propio canal exec sobre el mismo transporte.
+
+        Como mucho ``parallel_exec_channels`` canales a la vez (3 por defecto:
+        muchos equipos limitan las líneas vty). Devuelve '' en los comandos que
+        fallaron para que el llamador los repita en el shell.
+        """
+        loop = asyncio.get_running_loop()
+        client = await loop.run_in_executor(None, self._connect_client, 4 if self.fast else 6)
+        transport = client.get_transport()
+        try:
+            width = max(1, int(self.connection_data.get("parallel_exec_channels", 3) or 3))
+        except Exception:
+            width = 3
+        limit = asyncio.Semaphore(width)
+        outputs = [""] * len(commands)
+        failures = 0
+
+        async def _one(i: int, cmd: str) -> None:
+            nonlocal failures
+            async with limit:
+                started = time.time()
                 try:
-                    chan.send("\n")
-                    time.sleep(0.10 if self.fast else 0.15)
-                    chan.send(cmd + "\n")
-                    time.sleep(0.12 if self.fast else 0.2)
-                    idle = 0.8 if self.fast else 1.1
-                    is_long = any(s in (cmd or "").lower() for s in ("running-config", "current-configuration", "show configuration"))
-                    hard = ((16.0 if self.fast else 20.0) if is_long else (8.0 if self.fast else 10.0))
-                    raw = _read_until_idle(idle_window=idle, hard_timeout=hard)
-                    outputs.append(_strip_echo_and_prompt(_sanitize_output(raw), cmd))
+                    outputs[i] = await self._exec_channel(transport, cmd)
                 except Exception as e:
-                    print(f"[SSH] Error ejecutando '{cmd}' en batch: {e}")
-                    outputs.append("")
+                    failures += 1
+                    if self.verbose:
+                        print(f"[SSH] Canal exec rechazado para '{cmd}': {e}")
+                    return
+                if outputs[i].strip():
+                    _emit_result(on_result, i, cmd, outputs[i], started)
 
+        await asyncio.gather(*(_one(i, cmd) for i, cmd in enumerate(commands)))
+        if cancel_requested(self.connection_data):
+            # Canales cortados por la cancelación: no dice nada del soporte de exec
+            return outputs
+        if failures == len(commands):
+            # El equipo no admite exec: en adelante ir directo al shell
+            self._exec_supported = False
+        elif failures == 0:
+            self._exec_supported = True
+        return outputs
+
+    async def _exec_channel(self, transport: Any, cmd: str) -> str:
+        loop = asyncio.get_running_loop()
+        _idle, hard, learned = _command_timeouts(self.connection_data, cmd, self.fast)
+        fallback = command_spec(cmd).timeouts(self.fast)[1] if learned else hard
+        opened = time.time()
+        chan = await loop.run_in_executor(None, lambda: transport.open_session(timeout=hard))
+        try:
+            await loop.run_in_executor(None, chan.exec_command, cmd)
+            san = StreamSanitizer()
+            start = time.time()
+            last = start
+            first: Optional[float] = None
+            gap = 0.0
+            complete = False
+            while not cancel_requested(self.connection_data):
+                if (time.time() - start) >= hard:
+                    if hard >= fallback:
+                        break
+                    # Más lenta que lo aprendido: esperar hasta el tope fijo en vez de cortar
+                    hard = fallback
+                data = b""
+                if chan.recv_ready():
+                    data = chan.recv(32768)
+                elif chan.recv_stderr_ready():
+                    data = chan.recv_stderr(32768)
+                if data:
+                    now = time.time()
+                    if first is None:
+                        first = now - start
+                    else:
+                        gap = max(gap, now - last)
+                    last = now
+                    san.feed(data)
+                    continue
+                if chan.eof_received or chan.closed:
+                    complete = True
+                    break
+                # stderr no despierta el descriptor del canal: espera acotada
+                await self._wait_readable(chan, min(0.1, hard - (time.time() - start)))
+            text = san.flush()
+            total = time.time() - start
+            record_latency(self.connection_data, cmd, total if first is None else first, total, gap, complete)
+            add_timing_total(self.connection_data, "sanitize", san.busy, san.chunks)
+            record_span(self.connection_data, cmd, opened, time.time(), "command", bytes=san.bytes_in, channel="exec")
+        finally:
             try:
                 chan.close()
             except Exception:
                 pass
+        lines = text.replace("\r", "").split("\n")
+        while lines and not lines[-1].strip():
+            lines.pop()
+        while lines and not lines[0].strip():
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def run_batch(self, commands: List[str], on_result: Any = None) -> List[str]:
+        return run_sync(self.run_batch_async(commands, on_result))
+
+    def _pipeline_enabled(self, commands: List[str]) -> bool:
+        # Requiere fabricante conocido: sin paginación deshabilitada un
+        # '--More--' consumiría los comandos enviados por adelantado
+        return bool(self.connection_data.get("pipeline_commands")) and len(commands) > 1 and self.vendor in DISABLE_PAGING
+
+    async def _run_pipelined(self, chan: Any, commands: List[str]) -> List[str]:
+        """Envía el lote en una sola escritura y separa las salidas por marcadores."""
+        markers = _pipeline_markers(self.vendor, len(commands))
+        chan.send(_pipeline_payload(commands, markers, "\n"))
+        timeouts = [_command_timeouts(self.connection_data, c, self.fast) for c in commands]
+        idle = 0.8 if self.fast else 1.1
+        raw = await self._read_until_idle(chan, idle_window=idle, hard_timeout=sum(t[1] for t in timeouts),
+                                          until=lambda b: _pipeline_done(b, markers, self.prompt_re))
+        if any(t[2] for t in timeouts) and not self.last_read[3] and not cancel_requested(self.connection_data):
+            # Más lento que lo aprendido: completar con los topes fijos (ver _read_command)
+            head, read_bytes = raw, self.last_read_bytes
+            hard = sum(command_spec(c).timeouts(self.fast)[1] for c in commands)
+            raw += await self._read_until_idle(chan, idle_window=idle, hard_timeout=hard,
+                                               until=lambda b: _pipeline_done(head + b, markers, self.prompt_re))
+            self.last_read_bytes += read_bytes
+        return _split_pipelined(raw, commands, markers)
+
+    def remote_banner(self) -> str:
+        """Cadena de versión del servidor SSH de la sesión abierta ('' si no hay)."""
+        try:
+            transport = self._client.get_transport() if self._client is not None else None
+            return str(getattr(transport, "remote_version", "") or "")
+        except Exception:
+            return ""
+
+    async def read_prompt_async(self) -> str:
+        """Abre (o reutiliza) el shell y devuelve la línea de prompt actual.
+
+        Si el shell se abre aquí, se devuelve el prompt aprendido al abrirlo
+        sin otra ida y vuelta: es el mismo shell que usará el primer lote.
+        """
+        if not self._available():
+            return ""
+        async with self._async_lock():
             try:
-                client.close()
-            except Exception:
-                pass
-            return outputs
-        except Exception as e:
-            print(f"[SSH] Error en run_batch: {e}")
-            return outputs
+                fresh = self._chan is None or self._chan.closed
+                chan = await self._open_shell(3 if self.fast else 5)
+                if fresh and self.prompt:
+                    return self.prompt
+                try:
+                    chan.send("\n")
+                except Exception:
+                    pass
+                buf = await self._read_until_idle(chan, idle_window=0.5 if self.fast else 0.7, hard_timeout=0.9 if self.fast else 1.2, expected_prompts=1)
+                if self.verbose:
+                    print("[SSH] Salida inicial/prompt:")
+                    for line in buf.splitlines()[:20]:
+                        print(f"[SSH] {line}")
+                return _last_nonempty_line(_sanitize_output(buf))
+            except Exception as e:
+                print(f"[SSH] Error leyendo prompt: {e}")
+                self.close()
+                return ""
+            finally:
+                self.last_used = time.time()
+                if not self.persistent:
+                    self.close()
+
+    def read_prompt(self) -> str:
+        return run_sync(self.read_prompt_async())
 
 
 class TelnetConnection:
-    def __init__(self, connection_data: Dict[str, Any], vendor: str = ""):
+    def __init__(self, connection_data: Dict[str, Any], vendor: str = "", persistent: bool = False):
         self.connection_data = connection_data
         self.host = connection_data.get("hostname", "")
         self.port = int(connection_data.get("port", 23) or 23)
@@ -301,453 +922,838 @@ class TelnetConnection:
         self.paging_disabled = bool(connection_data.get("paging_disabled"))
         self.vendor = vendor.lower() if vendor else ""
         self.verbose = bool(connection_data.get("verbose"))
-
-    async def _read_for(self, reader: Any, seconds: float = 1.0) -> str:
+        self.persistent = persistent
+        self.lock = threading.RLock()
+        self.last_used = time.time()
+        self.enabled = False
+        self.banner = ""
+        self.prompt = ""
+        self.prompt_re: Any = None
+        self.last_read: Tuple[float, float, float, bool] = (0.0, 0.0, 0.0, True)
+        # Bytes recibidos en la última lectura (registro de tiempos)
+        self.last_read_bytes = 0
+        self._alock: Any = None
+        self._reader: Any = None
+        self._writer: Any = None
+        self._replay = replay_for(connection_data)
+
+    def bind(self, connection_data: Dict[str, Any], vendor: str = "") -> None:
+        """Asocia la sesión a los datos de conexión del llamador actual."""
+        self.connection_data = connection_data
+        self.fast = bool(connection_data.get("fast_mode"))
+        self.verbose = bool(connection_data.get("verbose"))
+        if vendor:
+            self.vendor = vendor.lower()
+        if self.persistent and self.paging_disabled:
+            connection_data["paging_disabled"] = True
+        self.last_used = time.time()
+
+    # ---- Ciclo de vida ----
+    def _async_lock(self) -> Any:
+        # El reader/writer de telnetlib3 viven en el bucle del motor compartido;
+        # este lock serializa las corrutinas que usan la misma sesión
+        if self._alock is None:
+            self._alock = asyncio.Lock()
+        return self._alock
+
+    def _is_open(self) -> bool:
+        if self._writer is None or self._reader is None:
+            return False
+        try:
+            transport = getattr(self._writer, "transport", None)
+            if transport is not None and transport.is_closing():
+                return False
+            if self._reader.at_eof():
+                return False
+        except Exception:
+            return False
+        return True
+
+    def is_reusable(self) -> bool:
+        return self._writer is None or self._is_open()
+
+    def close(self) -> None:
+        with self.lock:
+            writer = self._writer
+            self._reader = None
+            self._writer = None
+            self.enabled = False
+            self.prompt = ""
+            self.prompt_re = None
+            if writer is not None:
+                # El transporte pertenece al bucle del motor: cerrarlo desde su hilo
+                get_engine().call_soon(_close_quietly, writer)
+
+    def abort(self) -> None:
+        """Cierra el transporte sin tomar ``lock``; el lector queda en EOF."""
+        writer = self._writer
+        if writer is not None:
+            get_engine().call_soon(_close_quietly, writer)
+
+    async def _read_for(self, reader: Any, seconds: float = 1.0, until: Any = None) -> str:
+        """Lee durante ``seconds``; si ``until(buf)`` se cumple, retorna antes."""
         end = time.monotonic() + seconds
         buf = ""
-        while time.monotonic() < end:
+        while time.monotonic() < end and not cancel_requested(self.connection_data):
             try:
                 part = await asyncio.wait_for(reader.read(256), timeout=0.20 if self.fast else 0.25)
             except Exception:
                 part = ""
             if part:
                 buf += part
+                if until is not None and until(buf):
+                    break
             else:
                 await asyncio.sleep(0.06 if self.fast else 0.1)
         return buf
 
-    async def _disable_paging_once(self, reader: Any, writer: Any) -> None:
-        if self.paging_disabled:
-            return
-        try:
-            ven = self.vendor or (self.connection_data.get("vendor_hint") or "").lower()
-            cmds = DISABLE_PAGING.get(ven, []) if ven else []
-            for p_cmd in cmds:
-                try:
-                    writer.write(p_cmd + "\r\n")
-                    await asyncio.sleep(0.18 if self.fast else 0.28)
-                    _ = await self._read_for(reader, 0.9 if self.fast else 1.2)
-                except Exception:
-                    pass
-            # Drenar posibles restos para que no contaminen el siguiente comando
-            _ = await self._read_for(reader, 0.5 if self.fast else 0.7)
-        except Exception:
-            pass
-        self.paging_disabled = True
-        self.connection_data["paging_disabled"] = True
-
-    def _looks_like_prompt(self, line: str) -> bool:
-        t = (line or "").strip()
-        if not t:
-            return False
-        if re.search(r"[<\[][^^\]>]+[>\]]\s*$", t):
-            return True
-        if ("@" in t) and (t.endswith("#") or t.endswith(">") or t.endswith("%")):
-            return True
-        if (t.endswith("#") or t.endswith(">")) and ("@" not in t):
+    def _learn_prompt(self, text: str) -> None:
+        line = _last_nonempty_line(_sanitize_output(text).replace("\r", ""))
+        pattern = _prompt_pattern(line)
+        if pattern is not None:
+            self.prompt, self.prompt_re = line, pattern
+
+    def _at_prompt(self, buf: str) -> bool:
+        return _ends_with_prompt(buf, self.prompt_re)
+
+    async def _clear_more(self, reader: Any, writer: Any, text: str) -> str:
+        tries = 12
+        accum = text
+        while tries > 0 and "---- More ----" in accum:
+            writer.write(" ")
+            await asyncio.sleep(0.15)
+            accum += await self._read_for(reader, 0.6)
+            tries -= 1
+        return accum
+
+    async def _open_async(self) -> bool:
+        """Abre la sesión y autentica si aún no hay una sesión viva."""
+        if self._is_open():
             return True
-        return False
+        if not self.host or (telnet3 is None and self._replay is None):
+            return False
+        started = time.time()
+        if self._replay is not None:
+            reader, writer = self._replay.telnet_streams()
+        else:
+            reader, writer = await telnet3.open_connection(host=self.host, port=self.port, encoding="utf8", shell=None)
+            reader, writer = record_telnet_streams(self.connection_data, reader, writer)
+        self.enabled = False
+        if self.persistent:
+            self.paging_disabled = False
 
-    async def _read_until_idle(self, reader: Any, writer: Any, idle_window: float, hard_timeout: float) -> str:
-        start = time.monotonic()
-        last = start
-        buf = ""
-        carry = ""
-        while True:
-            if (time.monotonic() - start) > hard_timeout:
-                break
-            if (time.monotonic() - last) > idle_window:
-                break
+        def _abort() -> bool:
             try:
-                part = await asyncio.wait_for(reader.read(512), timeout=0.25)
+                writer.close()
             except Exception:
-                part = ""
-            if part:
-                last = time.monotonic()
-                low = part.lower()
-                if "--more--" in low or " ---- more ---- " in low or "---- more ----" in low:
-                    try:
-                        writer.write(" ")
-                    except Exception:
-                        pass
-                    await asyncio.sleep(0.08 if self.fast else 0.12)
-                    part = part.replace("--More--", "").replace("--more--", "").replace("---- More ----", "")
-                buf += part
-                carry += part
-                while "\n" in carry:
-                    line, carry = carry.split("\n", 1)
-                    if self.verbose:
-                        print(f"[Telnet3] {line}")
-            else:
-                await asyncio.sleep(0.06 if self.fast else 0.1)
-        if carry and self.verbose:
-            print(f"[Telnet3] {carry}")
-        return buf
-
-    def _strip_echo_and_prompt(self, text: str, cmd: str) -> str:
-        t = text.replace("\r", "")
-        lines = t.splitlines()
-        # quitar eco del comando
-        c = (cmd or "").strip().lower()
-        out_lines: List[str] = []
-        skipped_echo = False
-        for ln in lines:
-            if not skipped_echo and c and ln.strip().lower().startswith(c):
-                skipped_echo = True
-                continue
-            out_lines.append(ln)
-        # quitar prompt final si lo hay
-        while out_lines and not out_lines[-1].strip():
-            out_lines.pop()
-        if out_lines and self._looks_like_prompt(out_lines[-1]):
-            out_lines.pop()
-        return "\n".join(out_lines)
-
-    async def _run_async(self, cmd: str) -> str:
-        if not self.host or telnet3 is None:
-            return ""
-        reader, writer = await telnet3.open_connection(host=self.host, port=self.port, encoding="utf8", shell=None)
+                pass
+            return False
 
-        # Autenticación si el servidor lo solicita
-        banner = await self._read_for(reader, 0.6 if self.fast else 0.7)
+        # Autenticación si el servidor lo solicita. Cada lectura termina en
+        # cuanto aparece la petición de usuario/contraseña o un prompt.
+        banner = await self._read_for(reader, 0.6 if self.fast else 0.8, until=_login_step_done)
+        banner = await self._clear_more(reader, writer, banner)
         low = banner.lower()
         if any(x in low for x in ("username:", "user name:", "login:")):
             if not self.username:
                 if self.verbose:
                     print("[Telnet3] Autenticación requerida, falta 'username'.")
-                try:
-                    writer.close()
-                except Exception:
-                    pass
-                return ""
+                return _abort()
             writer.write(self.username + "\r\n")
-            await asyncio.sleep(0.25 if self.fast else 0.35)
-            after_user = await self._read_for(reader, 0.6 if self.fast else 0.7)
-            low2 = (banner + after_user).lower()
+            after_user = await self._read_for(reader, 0.85 if self.fast else 1.15, until=_login_step_done)
+            banner += after_user
+            low2 = banner.lower()
             if ("password:" in low2 or "pass word:" in low2):
                 if not self.password:
                     if self.verbose:
                         print("[Telnet3] Se solicitó password, pero no fue provisto.")
-                    try:
-                        writer.close()
-                    except Exception:
-                        pass
-                    return ""
+                    return _abort()
                 writer.write(self.password + "\r\n")
-                await asyncio.sleep(0.4 if self.fast else 0.5)
-                _ = await self._read_for(reader, 0.8 if self.fast else 0.9)
-
-        # Asegurar prompt y modo enable para Cisco
-        writer.write("\r\n")
-        await asyncio.sleep(0.10 if self.fast else 0.18)
-        prompt_text = await self._read_for(reader, 0.5 if self.fast else 0.6)
-        if self.vendor == "cisco":
-            snapshot = (banner + prompt_text).lower()
-            if "#" not in snapshot:
-                writer.write("\r\n")
-                await asyncio.sleep(0.1)
-                writer.write("enable\r\n")
-                await asyncio.sleep(0.3)
-                resp = await self._read_for(reader, 0.8)
-                if "password" in resp.lower():
-                    en_pw = self.connection_data.get("enable_password") or self.password
-                    if en_pw:
-                        writer.write(en_pw + "\r\n")
-                        await asyncio.sleep(0.6)
-                        _ = await self._read_for(reader, 1.0)
-
-        # Evaluar si el comando es largo y si necesitamos deshabilitar paginación
-        long_cmd = any(s in cmd.lower() for s in (
-            "running-config", "current-configuration", "show configuration"
-        ))
-        need_paging_disabled = bool(self.connection_data.get("need_paging_disabled"))
-        if need_paging_disabled or long_cmd:
-            await self._disable_paging_once(reader, writer)
-            _ = await self._read_for(reader, 0.3 if self.fast else 0.5)
+                banner += await self._read_for(reader, 1.2 if self.fast else 1.4, until=_ends_with_prompt)
 
-        # Enviar comando y leer salida con manejo de '--More--'
+        # Asegurar prompt y aprenderlo
         writer.write("\r\n")
-        await asyncio.sleep(0.1 if self.fast else 0.15)
-        writer.write(cmd + "\r\n")
-        await asyncio.sleep(0.12 if self.fast else 0.2)
-        idle = 0.8 if self.fast else 1.1
-        hard = (8.0 if self.fast else 10.0) if not long_cmd else (16.0 if self.fast else 20.0)
-        raw = await self._read_until_idle(reader, writer, idle_window=idle, hard_timeout=hard)
-        try:
-            writer.close()
-        except Exception:
-            pass
-        cleaned = _sanitize_output(raw)
-        return self._strip_echo_and_prompt(cleaned, cmd)
-
-    def run(self, cmd: str) -> str:
-        try:
-            return asyncio.run(self._run_async(cmd))
-        except Exception as e:
-            print(f"[Telnet3] Error ejecutando '{cmd}': {e}")
-            return ""
+        prompt_text = await self._read_for(reader, 0.6 if self.fast else 0.8, until=_ends_with_prompt)
+        banner = await self._clear_more(reader, writer, banner + prompt_text)
+        self.banner = banner
+        self.prompt, self.prompt_re = "", None
+        self._learn_prompt(banner)
+        self.enabled = _last_nonempty_line(_sanitize_output(banner)).endswith("#")
+        self._reader, self._writer = reader, writer
+        record_span(self.connection_data, "login", started, time.time(), "session", protocol="telnet")
+        return True
+
+    async def _ensure_enable_async(self) -> None:
+        """Entra en modo enable (Cisco) una sola vez por sesión."""
+        if self.vendor != "cisco" or self.enabled:
+            return
+        if self.connection_data.get("needs_enable") is False:
+            # Huella en caché: el usuario entra directamente en modo privilegiado
+            self.enabled = True
+            return
+        reader, writer = self._reader, self._writer
+        if "#" in self.banner.lower():
+            self.enabled = True
+            return
+        if self.prompt_re is None:
+            writer.write("\r\n")
+            await asyncio.sleep(0.1)
+        writer.write("enable\r\n")
+        if self.prompt_re is None:
+            await asyncio.sleep(0.3)
+        resp = await self._read_for(reader, 1.1 if self.prompt_re is not None else 0.8, until=_login_step_done)
+        if "password" in resp.lower():
+            en_pw = self.connection_data.get("enable_password") or self.password
+            if en_pw:
+                writer.write(en_pw + "\r\n")
+                if self.prompt_re is None:
+                    await asyncio.sleep(0.6)
+                resp += await self._read_for(reader, 1.6 if self.prompt_re is not None else 1.0, until=self._at_prompt)
+        self.enabled = True
 
-    async def _run_batch_async(self, commands: List[str]) -> List[str]:
-        outputs: List[str] = []
-        if not self.host or telnet3 is None:
-            return outputs
-        reader, writer = await telnet3.open_connection(host=self.host, port=self.port, encoding="utf8", shell=None)
+    async def _disable_paging_once(self, reader: Any, writer: Any) -> None:
+        if self.paging_disabled:
+            return
+        with timing_span(self.connection_data, "disable_paging", "session"):
+            try:
+                ven = self.vendor or (self.connection_data.get("vendor_hint") or "").lower()
+                cmds = DISABLE_PAGING.get(ven, []) if ven else []
+                for p_cmd in cmds:
+                    try:
+                        writer.write(p_cmd + "\r\n")
+                        if self.prompt_re is None:
+                            await asyncio.sleep(0.18 if self.fast else 0.28)
+                            _ = await self._read_for(reader, 0.9 if self.fast else 1.2)
+                        else:
+                            _ = await self._read_for(reader, 1.1 if self.fast else 1.5, until=self._at_prompt)
+                    except Exception:
+                        pass
+                # Drenar posibles restos para que no contaminen el siguiente comando
+                if self.prompt_re is None:
+                    _ = await self._read_for(reader, 0.5 if self.fast else 0.7)
+            except Exception:
+                pass
+        self.paging_disabled = True
+        self.connection_data["paging_disabled"] = True
 
-        # Autenticación si el servidor lo solicita
-        banner = await self._read_for(reader, 0.8)
-        low = banner.lower()
-        if any(x in low for x in ("username:", "user name:", "login:")):
-            if not self.username:
-                if self.verbose:
-                    print("[Telnet3] Autenticación requerida, falta 'username'.")
-                try:
-                    writer.close()
-                except Exception:
-                    pass
-                return outputs
-            writer.write(self.username + "\r\n")
-            await asyncio.sleep(0.4)
-            after_user = await self._read_for(reader, 0.8)
-            low2 = (banner + after_user).lower()
-            if ("password:" in low2 or "pass word:" in low2):
-                if not self.password:
-                    if self.verbose:
-                        print("[Telnet3] Se solicitó password, pero no fue provisto.")
+    def _looks_like_prompt(self, line: str) -> bool:
+        return _looks_like_prompt(line)
+
+    async def _read_until_idle(self, reader: Any, writer: Any, idle_window: float, hard_timeout: float, expected_prompts: int = 0,
+                               until: Any = None) -> str:
+        """Lee hasta ver ``expected_prompts`` prompts (o ``until(buf)``) o, como respaldo, hasta silencio."""
+        if until is None and expected_prompts > 0 and self.prompt_re is not None:
+            until = lambda b: _ends_with_prompt(b, self.prompt_re, expected_prompts)
+        until_prompt = until is not None
+        if until_prompt:
+            idle_window = max(idle_window, 2.5 if self.fast else 4.0)
+        start = time.monotonic()
+        last = start
+        first: Optional[float] = None
+        gap = 0.0
+        complete = not until_prompt
+        san = StreamSanitizer()
+        carry = ""
+        while True:
+            if (time.monotonic() - start) > hard_timeout or cancel_requested(self.connection_data):
+                complete = False
+                break
+            if (time.monotonic() - last) > idle_window:
+                if until_prompt:
+                    # El prompt pudo cambiar (p.ej. 'hostname'): reaprender
+                    self._learn_prompt(san.getvalue())
+                break
+            try:
+                # telnetlib3 ya decodifica (UTF-8 incremental) y entrega str
+                data = await asyncio.wait_for(reader.read(512), timeout=0.25)
+            except Exception:
+                data = ""
+            if data:
+                now = time.monotonic()
+                if first is None:
+                    first = now - start
+                else:
+                    gap = max(gap, now - last)
+                last = now
+                part = san.feed(data)
+                if san.more_seen:
                     try:
-                        writer.close()
+                        writer.write(" ")
                     except Exception:
                         pass
-                    return outputs
-                writer.write(self.password + "\r\n")
-                await asyncio.sleep(0.45 if self.fast else 0.55)
-                _ = await self._read_for(reader, 0.8 if self.fast else 0.9)
+                    await asyncio.sleep(0.08 if self.fast else 0.12)
+                if self.verbose:
+                    carry += part
+                    while "\n" in carry:
+                        line, carry = carry.split("\n", 1)
+                        print(f"[Telnet3] {line}")
+                if until_prompt and san.maybe_at_stop() and until(san.getvalue()):
+                    complete = True
+                    break
+            else:
+                await asyncio.sleep(0.01 if until_prompt else (0.06 if self.fast else 0.1))
+        if carry and self.verbose:
+            print(f"[Telnet3] {carry}")
+        text = san.flush()
+        total = time.monotonic() - start
+        self.last_read = (total if first is None else first, total, gap, complete)
+        self.last_read_bytes = san.bytes_in
+        add_timing_total(self.connection_data, "sanitize", san.busy, san.chunks)
+        return text
 
-        # Asegurar prompt y modo enable para Cisco
-        writer.write("\r\n")
-        await asyncio.sleep(0.10 if self.fast else 0.18)
-        prompt_text = await self._read_for(reader, 0.5 if self.fast else 0.6)
-        if self.vendor == "cisco":
-            snapshot = (banner + prompt_text).lower()
-            if "#" not in snapshot:
-                writer.write("\r\n")
-                await asyncio.sleep(0.1)
-                writer.write("enable\r\n")
-                await asyncio.sleep(0.3)
-                resp = await self._read_for(reader, 0.8)
-                if "password" in resp.lower():
-                    en_pw = self.connection_data.get("enable_password") or self.password
-                    if en_pw:
-                        writer.write(en_pw + "\r\n")
-                        await asyncio.sleep(0.6)
-                        _ = await self._read_for(reader, 1.0)
-
-        # Evaluar si hay comandos largos
-        long_in_batch = any(any(s in (c or "").lower() for s in ("running-config", "current-configuration", "show configuration")) for c in commands)
+    def _strip_echo_and_prompt(self, text: str, cmd: str) -> str:
+        return _strip_echo_and_prompt(text, cmd)
+
+    async def _prepare_async(self, commands: List[str]) -> bool:
+        """Abre/reutiliza la sesión, asegura enable y paginación para ``commands``."""
+        if cancel_requested(self.connection_data) or not await self._open_async():
+            return False
+        await self._ensure_enable_async()
+        # Evaluar si hay comandos largos y si necesitamos deshabilitar paginación
         need_paging_disabled = bool(self.connection_data.get("need_paging_disabled"))
-        if need_paging_disabled or long_in_batch:
+        if (need_paging_disabled or _needs_paging_disabled(commands)) and not self.paging_disabled:
+            await self._disable_paging_once(self._reader, self._writer)
+            if self.prompt_re is None:
+                _ = await self._read_for(self._reader, 0.3 if self.fast else 0.5)
+        return True
+
+    async def _run_batch_async(self, commands: List[str], on_result: Any = None) -> List[str]:
+        outputs: List[str] = []
+        if not await self._prepare_async(commands):
+            return outputs
+        reader, writer = self._reader, self._writer
+
+        if bool(self.connection_data.get("pipeline_commands")) and len(commands) > 1 and self.vendor in DISABLE_PAGING:
+            # Tubería: paginación deshabilitada y un único write con marcadores
             await self._disable_paging_once(reader, writer)
-            _ = await self._read_for(reader, 0.3 if self.fast else 0.5)
+            markers = _pipeline_markers(self.vendor, len(commands))
+            writer.write(_pipeline_payload(commands, markers, "\r\n"))
+            timeouts = [_command_timeouts(self.connection_data, c, self.fast) for c in commands]
+            idle = 0.8 if self.fast else 1.1
+            started = time.time()
+            raw = await self._read_until_idle(reader, writer, idle_window=idle, hard_timeout=sum(t[1] for t in timeouts),
+                                              until=lambda b: _pipeline_done(b, markers, self.prompt_re))
+            if any(t[2] for t in timeouts) and not self.last_read[3] and not cancel_requested(self.connection_data):
+                # Más lento que lo aprendido: completar con los topes fijos (ver _read_command)
+                head, read_bytes = raw, self.last_read_bytes
+                hard = sum(command_spec(c).timeouts(self.fast)[1] for c in commands)
+                raw += await self._read_until_idle(reader, writer, idle_window=idle, hard_timeout=hard,
+                                                   until=lambda b: _pipeline_done(head + b, markers, self.prompt_re))
+                self.last_read_bytes += read_bytes
+            record_span(self.connection_data, "pipeline", started, time.time(), "command",
+                        commands=len(commands), bytes=self.last_read_bytes)
+            outputs = _split_pipelined(raw, commands, markers)
+            _emit_all(on_result, commands, outputs, started)
+            return outputs
 
         # Ejecutar cada comando con manejo de '--More--'
-        for cmd in commands:
+        for i, cmd in enumerate(commands):
+            if cancel_requested(self.connection_data):
+                outputs.extend("" for _ in commands[i:])
+                break
+            started = time.time()
             try:
-                writer.write("\r\n")
-                await asyncio.sleep(0.1 if self.fast else 0.15)
-                writer.write(cmd + "\r\n")
-                await asyncio.sleep(0.12 if self.fast else 0.2)
-                idle = 0.8 if self.fast else 1.1
-                # Extender timeout duro para comandos largos (running-config / current-configuration / show configuration)
-                is_long = any(s in (cmd or "").lower() for s in ("running-config", "current-configuration", "show configuration"))
-                hard = ((16.0 if self.fast else 20.0) if is_long else (8.0 if self.fast else 10.0))
-                raw = await self._read_until_idle(reader, writer, idle_window=idle, hard_timeout=hard)
-                cleaned = _sanitize_output(raw)
-                outputs.append(self._strip_echo_and_prompt(cleaned, cmd))
+                if self.prompt_re is not None:
+                    # Prompt conocido: la lectura termina en el segundo prompt
+                    writer.write("\r\n" + cmd + "\r\n")
+                else:
+                    writer.write("\r\n")
+                    await asyncio.sleep(0.1 if self.fast else 0.15)
+                    writer.write(cmd + "\r\n")
+                    await asyncio.sleep(0.12 if self.fast else 0.2)
+                raw = await self._read_command(reader, writer, cmd)
+                record_span(self.connection_data, cmd, started, time.time(), "command", bytes=self.last_read_bytes)
+                outputs.append(self._strip_echo_and_prompt(raw, cmd))
             except Exception as e:
                 print(f"[Telnet3] Error ejecutando '{cmd}' en batch: {e}")
                 outputs.append("")
-
-        try:
-            writer.close()
-        except Exception:
-            pass
+            _emit_result(on_result, i, cmd, outputs[-1], started)
         return outputs
 
-    def run_batch(self, commands: List[str]) -> List[str]:
-        try:
-            return asyncio.run(self._run_batch_async(commands))
-        except Exception as e:
-            print(f"[Telnet3] Error en run_batch: {e}")
-            return []
+    async def _read_command(self, reader: Any, writer: Any, cmd: str) -> str:
+        """Lee la salida de ``cmd`` hasta el segundo prompt (ver ``SSHConnection._read_command``)."""
+        # Tiempos aprendidos del equipo o, sin historial, los fijos (más largos para running-config)
+        idle, hard, learned = _command_timeouts(self.connection_data, cmd, self.fast)
+        raw = await self._read_until_idle(reader, writer, idle_window=idle, hard_timeout=hard, expected_prompts=2)
+        timing, read_bytes = self.last_read, self.last_read_bytes
+        if learned and not timing[3] and self.prompt_re is not None and not cancel_requested(self.connection_data):
+            head = raw
+            idle, hard = command_spec(cmd).timeouts(self.fast)
+            raw += await self._read_until_idle(reader, writer, idle_window=idle, hard_timeout=hard,
+                                               until=lambda b: _ends_with_prompt(head + b, self.prompt_re, 2))
+            timing = _joined_reads(timing, self.last_read)
+            self.last_read, self.last_read_bytes = timing, read_bytes + self.last_read_bytes
+        record_latency(self.connection_data, cmd, *timing)
+        return raw
 
     async def _run_script_async(self, commands: List[str]) -> List[str]:
         outputs: List[str] = []
-        if not self.host or telnet3 is None:
+        if not await self._prepare_async([]):
             return outputs
-        reader, writer = await telnet3.open_connection(host=self.host, port=self.port, encoding="utf8", shell=None)
-
-        # Autenticación si el servidor lo solicita
-        banner = await self._read_for(reader, 0.8 if self.fast else 1.0)
-        low = banner.lower()
-        if any(x in low for x in ("username:", "user name:", "login:")):
-            if not self.username:
-                if self.verbose:
-                    print("[Telnet3] Autenticación requerida, falta 'username'.")
-                try:
-                    writer.close()
-                except Exception:
-                    pass
-                return outputs
-            writer.write(self.username + "\r\n")
-            await asyncio.sleep(0.4 if self.fast else 0.6)
-            after_user = await self._read_for(reader, 0.8 if self.fast else 0.9)
-            low2 = (banner + after_user).lower()
-            if ("password:" in low2 or "pass word:" in low2):
-                if not self.password:
-                    if self.verbose:
-                        print("[Telnet3] Se solicitó password, pero no fue provisto.")
-                    try:
-                        writer.close()
-                    except Exception:
-                        pass
-                    return outputs
-                writer.write(self.password + "\r\n")
-                await asyncio.sleep(0.45 if self.fast else 0.55)
-                _ = await self._read_for(reader, 0.8 if self.fast else 0.9)
-
-        # Asegurar prompt y modo enable para Cisco
-        writer.write("\r\n")
-        await asyncio.sleep(0.10 if self.fast else 0.18)
-        prompt_text = await self._read_for(reader, 0.5 if self.fast else 0.6)
-        if self.vendor == "cisco":
-            snapshot = (banner + prompt_text).lower()
-            if "#" not in snapshot:
-                writer.write("\r\n")
-                await asyncio.sleep(0.1)
-                writer.write("enable\r\n")
-                await asyncio.sleep(0.3)
-                resp = await self._read_for(reader, 0.8)
-                if "password" in resp.lower():
-                    en_pw = self.connection_data.get("enable_password") or self.password
-                    if en_pw:
-                        writer.write(en_pw + "\r\n")
-                        await asyncio.sleep(0.6)
-                        _ = await self._read_for(reader, 1.0)
+        reader, writer = self._reader, self._writer
 
         # Enviar todos los comandos como un script en un único write
         try:
             writer.write("\r\n")
-            await asyncio.sleep(0.1 if self.fast else 0.15)
+            if self.prompt_re is None:
+                await asyncio.sleep(0.1 if self.fast else 0.15)
             script = "\r\n".join(commands) + "\r\n"
             writer.write(script)
-            await asyncio.sleep(0.18 if self.fast else 0.25)
+            if self.prompt_re is None:
+                await asyncio.sleep(0.18 if self.fast else 0.25)
             idle = 0.9 if self.fast else 1.2
             hard = 14.0 if self.fast else 18.0
-            raw = await self._read_until_idle(reader, writer, idle_window=idle, hard_timeout=hard)
-            cleaned = _sanitize_output(raw)
-            outputs.append(cleaned)
+            # Un prompt por el salto de línea inicial y uno tras cada comando
+            raw = await self._read_until_idle(reader, writer, idle_window=idle, hard_timeout=hard, expected_prompts=len(commands) + 1)
+            outputs.append(raw)
         except Exception as e:
             print(f"[Telnet3] Error ejecutando script: {e}")
             outputs.append("")
-
-        try:
-            writer.close()
-        except Exception:
-            pass
         return outputs
 
+    async def _guarded(self, coro_factory: Any, label: str, default: Any) -> Any:
+        async with self._async_lock():
+            try:
+                return await coro_factory()
+            except Exception as e:
+                print(f"[Telnet3] Error {label}: {e}")
+                self.close()
+                return default
+            finally:
+                self.last_used = time.time()
+                if not self.persistent:
+                    self.close()
+
+    async def run_async(self, cmd: str) -> str:
+        outs = await self._guarded(lambda: self._run_batch_async([cmd]), f"ejecutando '{cmd}'", [])
+        return outs[0] if outs else ""
+
+    async def run_batch_async(self, commands: List[str], on_result: Any = None) -> List[str]:
+        return await self._guarded(lambda: self._run_batch_async(commands, on_result), "en run_batch", [])
+
+    async def run_script_async(self, commands: List[str]) -> List[str]:
+        return await self._guarded(lambda: self._run_script_async(commands), "en run_script", [])
+
+    async def read_prompt_async(self) -> str:
+        """Abre (o reutiliza) la sesión y devuelve la línea de prompt actual."""
+        async def _prompt() -> str:
+            if not await self._open_async():
+                return ""
+            reader, writer = self._reader, self._writer
+            writer.write("\r\n")
+            out = await self._read_for(reader, 0.75 if self.fast else 1.0, until=self._at_prompt)
+            out = await self._clear_more(reader, writer, out)
+            if self.verbose:
+                print("[Telnet3] Bienvenida/prompt:")
+                for line in (self.banner + out).splitlines()[-20:]:
+                    print(f"[Telnet3] {line}")
+            return _last_nonempty_line(_sanitize_output(out)) or _last_nonempty_line(_sanitize_output(self.banner))
+        return await self._guarded(_prompt, "leyendo prompt", "")
+
+    # Envoltorios síncronos para los llamadores existentes (GUI, CLI, fleet)
+    def run(self, cmd: str) -> str:
+        return run_sync(self.run_async(cmd))
+
+    def run_batch(self, commands: List[str], on_result: Any = None) -> List[str]:
+        return run_sync(self.run_batch_async(commands, on_result))
+
     def run_script(self, commands: List[str]) -> List[str]:
-        try:
-            return asyncio.run(self._run_script_async(commands))
-        except Exception as e:
-            print(f"[Telnet3] Error en run_script: {e}")
-            return []
+        return run_sync(self.run_script_async(commands))
+
+    def read_prompt(self) -> str:
+        return run_sync(self.read_prompt_async())
+
+
+def _close_quietly(obj: Any) -> None:
+    try:
+        obj.close()
+    except Exception:
+        pass
 
 
 class SerialConnection:
-    def __init__(self, connection_data: Dict[str, Any]):
+    """Sesión de consola serie: abre el puerto, autentica y deshabilita la
+    paginación una sola vez, y ejecuta los comandos terminando cada lectura
+    en el prompt aprendido.
+    """
+
+    def __init__(self, connection_data: Dict[str, Any], persistent: bool = False):
         self.connection_data = connection_data
         self.port = connection_data.get("port", "")
         self.username = connection_data.get("username", "")
         self.password = connection_data.get("password", "")
         self.baudrate = int(connection_data.get("baudrate", 9600) or 9600)
         self.fast = bool(connection_data.get("fast_mode"))
+        self.verbose = bool(connection_data.get("verbose"))
+        self.vendor = (connection_data.get("vendor_hint") or "").lower()
+        self.persistent = persistent
+        self.lock = threading.RLock()
+        self.last_used = time.time()
+        self.logged_in = False
+        self.paging_disabled = False
+        self.last_read: Tuple[float, float, float, bool] = (0.0, 0.0, 0.0, True)
+        # Bytes recibidos en la última lectura (registro de tiempos)
+        self.last_read_bytes = 0
+        self.prompt = ""
+        self.prompt_re: Any = None
+        self._ser: Any = None
+        self._replay = replay_for(connection_data)
+
+    def _available(self) -> bool:
+        return bool(self.port) and (serial is not None or self._replay is not None)
+
+    def bind(self, connection_data: Dict[str, Any], vendor: str = "") -> None:
+        """Asocia la sesión a los datos de conexión del llamador actual."""
+        self.connection_data = connection_data
+        self.fast = bool(connection_data.get("fast_mode"))
+        self.verbose = bool(connection_data.get("verbose"))
+        ven = (vendor or connection_data.get("vendor_hint") or "").lower()
+        if ven in DISABLE_PAGING:
+            self.vendor = ven
+        self.last_used = time.time()
 
-    def _read_chunk(self, ser: Any, duration: float = 0.8) -> str:
-        end = time.time() + duration
-        buf = ""
-        while time.time() < end:
+    def is_open(self) -> bool:
+        try:
+            return bool(self._ser is not None and self._ser.is_open)
+        except Exception:
+            return False
+
+    def is_reusable(self) -> bool:
+        return self._ser is None or self.is_open()
+
+    def close(self) -> None:
+        with self.lock:
+            if self._ser is not None:
+                try:
+                    self._ser.close()
+                except Exception:
+                    pass
+            self._ser = None
+            self.logged_in = False
+            self.paging_disabled = False
+            self.prompt = ""
+            self.prompt_re = None
+
+    def abort(self) -> None:
+        """Desbloquea la lectura en curso sin tomar ``lock`` (el puerto sigue abierto)."""
+        cancel_read = getattr(self._ser, "cancel_read", None)
+        if cancel_read is not None:
+            try:
+                cancel_read()
+            except Exception:
+                pass
+
+    def open(self) -> bool:
+        """Abre el puerto (sin autenticar). Devuelve True si quedó abierto."""
+        if not self._available():
+            return False
+        with self.lock:
+            try:
+                self._open_port()
+                return True
+            except Exception as e:
+                if self.verbose:
+                    print(f"[Serial] No se pudo abrir {self.port} @ {self.baudrate}: {e}")
+                self.close()
+                return False
+            finally:
+                self.last_used = time.time()
+                if not self.persistent:
+                    self.close()
+
+    def _open_port(self) -> Any:
+        if self.is_open():
+            return self._ser
+        self.close()
+        if self._replay is not None:
+            ser = self._replay.serial_port()
+        else:
+            # Timeout de lectura corto: las lecturas terminan por prompt, no por bloqueo
+            ser = record_serial_port(self.connection_data, serial.Serial(port=self.port, baudrate=self.baudrate, timeout=0.05))
+        try:
+            ser.reset_input_buffer()
+            ser.reset_output_buffer()
+        except Exception:
+            pass
+        self._ser = ser
+        self.logged_in = False
+        return ser
+
+    def _read_until(self, ser: Any, until: Any, idle_window: float, hard_timeout: float) -> str:
+        """Lee hasta ``until(buf)``; respaldo por silencio (``idle_window``) o ``hard_timeout``."""
+        start = time.time()
+        last = start
+        first: Optional[float] = None
+        gap = 0.0
+        complete = until is None
+        san = StreamSanitizer()
+        carry = ""
+        while True:
+            now = time.time()
+            if (now - start) > hard_timeout or (now - last) > idle_window or cancel_requested(self.connection_data):
+                break
             try:
-                data = ser.read(512)
+                data = ser.read(ser.in_waiting or 1)
             except Exception:
                 data = b""
-            if data:
-                buf += data.decode(errors="ignore")
+            if not data:
+                continue
+            now = time.time()
+            if first is None:
+                first = now - start
             else:
-                time.sleep(0.06 if self.fast else 0.1)
-        return buf
+                gap = max(gap, now - last)
+            last = now
+            part = san.feed(data)
+            if san.more_seen:
+                try:
+                    ser.write(b" ")
+                except Exception:
+                    pass
+            if self.verbose:
+                carry += part
+                while "\n" in carry:
+                    line, carry = carry.split("\n", 1)
+                    print(f"[Serial] {line}")
+            if until is not None and san.maybe_at_stop() and until(san.getvalue()):
+                complete = True
+                break
+        if carry and self.verbose:
+            print(f"[Serial] {carry}")
+        text = san.flush()
+        total = time.time() - start
+        self.last_read = (total if first is None else first, total, gap, complete)
+        self.last_read_bytes = san.bytes_in
+        add_timing_total(self.connection_data, "sanitize", san.busy, san.chunks)
+        return text
+
+    def _learn_prompt(self, text: str) -> None:
+        line = _last_nonempty_line(_sanitize_output(text).replace("\r", ""))
+        pattern = _prompt_pattern(line)
+        if pattern is not None:
+            self.prompt, self.prompt_re = line, pattern
+            if not self.vendor:
+                ven = _vendor_from_prompt(line)
+                if ven in DISABLE_PAGING:
+                    self.vendor = ven
+
+    def _login(self, ser: Any) -> str:
+        """Despierta la consola y autentica si el equipo lo solicita (una vez por sesión)."""
+        started = time.time()
+        step = 1.2 if self.fast else 1.6
+        ser.write(b"\r")
+        welcome = self._read_until(ser, _login_step_done, idle_window=step, hard_timeout=step * 2)
+        last = welcome
+        for _ in range(3):
+            tail = _last_nonempty_line(_sanitize_output(last).replace("\r", "")).lower()
+            if tail.endswith(("username:", "user name:", "login:")) and self.username:
+                ser.write((self.username + "\r").encode())
+            elif tail.endswith(("password:", "pass word:")) and self.password:
+                ser.write((self.password + "\r").encode())
+            else:
+                break
+            last = self._read_until(ser, _login_step_done, idle_window=step, hard_timeout=step * 2)
+            welcome += last
+        if not _ends_with_prompt(welcome):
+            # Consola ya abierta o banner largo: pedir el prompt explícitamente
+            ser.write(b"\r")
+            welcome += self._read_until(ser, _ends_with_prompt, idle_window=step, hard_timeout=step * 2)
+        self._learn_prompt(welcome)
+        self.logged_in = True
+        record_span(self.connection_data, "login", started, time.time(), "session", protocol="serial")
+        return welcome
 
-    def run(self, cmd: str) -> str:
-        if not self.port or serial is None:
-            return ""
-        try:
-            with serial.Serial(port=self.port, baudrate=self.baudrate, timeout=1.0 if self.fast else 1.5) as ser:
+    def _disable_paging_once(self, ser: Any) -> None:
+        if self.paging_disabled:
+            return
+        with timing_span(self.connection_data, "disable_paging", "session"):
+            for p_cmd in DISABLE_PAGING.get(self.vendor, []):
                 try:
-                    ser.reset_input_buffer()
-                    ser.reset_output_buffer()
+                    ser.write((p_cmd + "\r").encode())
+                    self._read_until(ser, lambda b: _ends_with_prompt(b, self.prompt_re),
+                                     idle_window=0.8 if self.fast else 1.0, hard_timeout=3.0)
                 except Exception:
                     pass
-                time.sleep(0.15 if self.fast else 0.2)
-                ser.write(b"\r")
-                time.sleep(0.4 if self.fast else 0.6)
-
-                # Autenticación si el equipo la solicita
-                welcome = self._read_chunk(ser, 0.7 if self.fast else 1.0).lower()
-                if any(x in welcome for x in ("username:", "user name:", "login:", "login authentication")):
-                    if self.username:
-                        ser.write((self.username + "\r").encode())
-                        time.sleep(0.4 if self.fast else 0.6)
-                        _ = self._read_chunk(ser, 0.8 if self.fast else 1.0)
-                    if self.password:
-                        ser.write((self.password + "\r").encode())
-                        time.sleep(0.8 if self.fast else 1.0)
-                        _ = self._read_chunk(ser, 0.9 if self.fast else 1.2)
-
-                # Enviar comando
-                ser.write((cmd + "\r").encode())
-                long_cmd = any(s in cmd.lower() for s in (
-                    "running-config", "current-configuration", "show configuration"
-                ))
-                time.sleep((0.8 if self.fast else 1.2) if long_cmd else (1.0 if self.fast else 1.5))
-
-                out = ""
-                idle_loops = 0
-                # Leer continuamente; si aparece '--More--', enviar espacio
-                # y continuar acumulando hasta que no haya más datos.
-                while True:
-                    part = self._read_chunk(ser, 0.8 if self.fast else 1.0)
-                    if part:
-                        low = part.lower()
-                        if "--more--" in low or "---- more ----" in low or " more " in low:
-                            try:
-                                ser.write(b" ")
-                            except Exception:
-                                pass
-                            time.sleep(0.08 if self.fast else 0.12)
-                            # Limpiar artefactos
-                            part = part.replace("--More--", "").replace("--more--", "").replace("---- More ----", "")
-                            idle_loops = 0
-                        out += part
-                        idle_loops = 0
-                    else:
-                        idle_loops += 1
-                        if idle_loops >= (6 if self.fast else 8):
+        self.paging_disabled = bool(self.vendor)
+
+    def _prepare(self) -> Any:
+        ser = self._open_port()
+        if not self.logged_in:
+            self._login(ser)
+        self._disable_paging_once(ser)
+        return ser
+
+    def _exec(self, ser: Any, cmd: str) -> str:
+        started = time.time()
+        # A 9600 baudios una configuración grande tarda; el tope se escala
+        idle, hard, prompt_idle = command_spec(cmd).serial_timeouts(self.fast, self.baudrate)
+        if self.prompt_re is not None:
+            fixed_hard = hard
+            # Eco del comando (tras el prompt del CR inicial) y prompt final;
+            # 'Building configuration...' puede tardar varios segundos
+            idle = max(idle, prompt_idle)
+            idle, hard, learned = adaptive_timeouts(self.connection_data, cmd, idle, hard)
+            ser.write(("\r" + cmd + "\r").encode())
+            raw = self._read_until(ser, lambda b: _ends_with_prompt(b, self.prompt_re, 2), idle_window=idle, hard_timeout=hard)
+            timing, read_bytes = self.last_read, self.last_read_bytes
+            if learned and not timing[3] and not cancel_requested(self.connection_data):
+                # Más lento que lo aprendido: completar con el tope fijo (ver SSHConnection._read_command)
+                head = raw
+                raw += self._read_until(ser, lambda b: _ends_with_prompt(head + b, self.prompt_re, 2),
+                                        idle_window=idle, hard_timeout=fixed_hard)
+                timing = _joined_reads(timing, self.last_read)
+                self.last_read, self.last_read_bytes = timing, read_bytes + self.last_read_bytes
+            record_latency(self.connection_data, cmd, *timing)
+        else:
+            ser.write((cmd + "\r").encode())
+            raw = self._read_until(ser, None, idle_window=idle, hard_timeout=hard)
+            self._learn_prompt(raw)
+        record_span(self.connection_data, cmd, started, time.time(), "command", bytes=self.last_read_bytes)
+        return _strip_echo_and_prompt(raw, cmd)
+
+    def run_batch(self, commands: List[str], on_result: Any = None) -> List[str]:
+        """Ejecuta todos los comandos sobre una única apertura/login del puerto.
+
+        ``on_result(i, cmd, salida, segundos)`` se invoca al terminar cada comando.
+        """
+        outputs: List[str] = []
+        if not self._available() or cancel_requested(self.connection_data):
+            return outputs
+        with self.lock:
+            try:
+                ser = self._prepare()
+                for i, cmd in enumerate(commands):
+                    if cancel_requested(self.connection_data):
+                        break
+                    started = time.time()
+                    try:
+                        outputs.append(self._exec(ser, cmd))
+                    except Exception as e:
+                        print(f"[Serial] Error ejecutando '{cmd}': {e}")
+                        outputs.append("")
+                        if not self.is_open():
                             break
-                        time.sleep(0.06 if self.fast else 0.1)
+                    _emit_result(on_result, i, cmd, outputs[-1], started)
+                if cancel_requested(self.connection_data):
+                    # La salida cortada seguiría llegando: no reutilizar el puerto
+                    self.close()
+                outputs.extend("" for _ in range(len(commands) - len(outputs)))
+                return outputs
+            except Exception as e:
+                print(f"[Serial] Error en run_batch: {e}")
+                self.close()
+                return outputs + ["" for _ in range(len(commands) - len(outputs))]
+            finally:
+                self.last_used = time.time()
+                if not self.persistent:
+                    self.close()
 
-                return _sanitize_output(out)
-        except Exception as e:
-            print(f"[Serial] Error ejecutando '{cmd}': {e}")
+    def run(self, cmd: str) -> str:
+        outs = self.run_batch([cmd])
+        return outs[0] if outs else ""
+
+    def read_prompt(self) -> str:
+        """Abre (o reutiliza) el puerto, autentica y devuelve la línea de prompt."""
+        if not self._available():
             return ""
+        with self.lock:
+            try:
+                ser = self._open_port()
+                if not self.logged_in:
+                    welcome = self._login(ser)
+                    if self.verbose:
+                        print("[Serial] Salida inicial/prompt:")
+                        for line in welcome.splitlines()[-20:]:
+                            print(f"[Serial] {line}")
+                    return self.prompt or _last_nonempty_line(_sanitize_output(welcome))
+                # Sesión ya autenticada: leer prompt tras un retorno de carro
+                ser.write(b"\r")
+                out = self._read_until(ser, lambda b: _ends_with_prompt(b, self.prompt_re),
+                                       idle_window=0.8 if self.fast else 1.0, hard_timeout=3.0)
+                return _last_nonempty_line(_sanitize_output(out)) or self.prompt
+            except Exception as e:
+                if self.verbose:
+                    print(f"[Serial] Error leyendo prompt: {e}")
+                self.close()
+                return ""
+            finally:
+                self.last_used = time.time()
+                if not self.persistent:
+                    self.close()
+
+
+# -------- Pool de sesiones ---------
+_SESSION_POOL = SessionPool()
+
+
+def _pooling_enabled(connection_data: Dict[str, Any]) -> bool:
+    return bool(connection_data.get("reuse_sessions", True))
+
+
+def get_session(connection_data: Dict[str, Any], protocol: str = "", vendor: str = "") -> Any:
+    """Devuelve la sesión (persistente si el pool está activo) para ``connection_data``.
+
+    - ``protocol`` por defecto toma ``connection_data['protocol']``.
+    - ``reuse_sessions=False`` en los datos de conexión desactiva el pool y
+      devuelve una conexión de un solo uso (comportamiento clásico).
+    """
+    proto = protocol or connection_data.get("protocol", "SSH2")
+
+    def _factory(persistent: bool) -> Any:
+        if proto == "Telnet":
+            return TelnetConnection(connection_data, vendor, persistent=persistent)
+        if proto == "Serial":
+            return SerialConnection(connection_data, persistent=persistent)
+        return SSHConnection(connection_data, persistent=persistent)
+
+    if not _pooling_enabled(connection_data):
+        return _factory(False)
+    key = session_key(proto, connection_data)
+    return _SESSION_POOL.acquire(key, connection_data, lambda: _factory(True), vendor)
+
+
+def session_fingerprint(connection_data: Dict[str, Any], protocol: str = "") -> Dict[str, Any]:
+    """Datos aprendidos por la sesión agrupada (prompt de login) para la caché de huellas."""
+    proto = protocol or connection_data.get("protocol", "SSH2")
+    sess = _SESSION_POOL.peek(session_key(proto, connection_data))
+    if sess is None:
+        return {}
+    return {"prompt": getattr(sess, "prompt", "") or ""}
+
+
+def close_session(connection_data: Dict[str, Any], protocol: str = "") -> None:
+    """Cierra y descarta la sesión agrupada de un dispositivo."""
+    proto = protocol or connection_data.get("protocol", "SSH2")
+    _SESSION_POOL.discard(session_key(proto, connection_data))
+    flush_latencies()
+
+
+def abort_session(connection_data: Dict[str, Any], protocol: str = "") -> None:
+    """Cancela el análisis en curso desde otro hilo (p.ej. el botón Cancelar de la GUI).
+
+    Marca ``connection_data['cancel_event']`` (las lecturas y los lotes lo
+    consultan) y corta la sesión agrupada para despertar la lectura bloqueada.
+    No espera al comando en vuelo: el llamador recibe su resultado parcial.
+    """
+    event = connection_data.get("cancel_event")
+    if event is not None:
+        event.set()
+    proto = protocol or connection_data.get("protocol", "SSH2")
+    sess = _SESSION_POOL.peek(session_key(proto, connection_data))
+    if sess is not None:
+        sess.abort()
+
+
+def close_all_sessions() -> None:
+    """Cierra todas las sesiones agrupadas (salida de la app o desconexión)."""
+    _SESSION_POOL.close_all()
+    flush_latencies()
+    # El bucle se vuelve a crear bajo demanda si se abre otra sesión
+    get_engine().shutdown()
+
+
+atexit.register(close_all_sessions)
+
 
 def ping_host(hostname: str, count: int = 2, timeout_ms: int = 1000) -> bool:
     if not hostname:
@@ -780,10 +1786,44 @@ def quick_tcp_check(host: str, port: int, timeout_s: float = 0.7) -> bool:
         return False
 
 
-def check_serial_port(port: str, baudrate: int = 9600, timeout: float = 1.0, *, verbose: bool = False, fast: bool = False) -> bool:
+def probe_ssh_banner(host: str, port: int, timeout_s: float = 0.7) -> Optional[str]:
+    """Chequeo TCP que además captura la cadena de versión del servidor SSH.
+
+    El servidor envía su identificación ('SSH-2.0-...') nada más aceptar la
+    conexión, así que se obtiene sin autenticar ni negociar claves.
+    Devuelve None si el puerto no es alcanzable, '' si no llegó banner.
+    """
+    if not host or not port:
+        return None
+    try:
+        with socket.create_connection((host, port), timeout=timeout_s) as sock:
+            sock.settimeout(timeout_s)
+            data = b""
+            deadline = time.time() + timeout_s
+            while b"\n" not in data and len(data) < 512 and time.time() < deadline:
+                try:
+                    chunk = sock.recv(256)
+                except Exception:
+                    break
+                if not chunk:
+                    break
+                data += chunk
+            # Pueden preceder líneas informativas; la de versión empieza por 'SSH-'
+            for line in data.decode(errors="ignore").splitlines():
+                if line.startswith("SSH-"):
+                    return line.strip()
+            return ""
+    except Exception:
+        return None
+
+
+def check_serial_port(port: str, baudrate: int = 9600, timeout: float = 1.0, *, verbose: bool = False, fast: bool = False,
+                      connection_data: Optional[Dict[str, Any]] = None) -> bool:
     """Intenta abrir un puerto serial y reporta diagnóstico opcional.
 
     - Devuelve True si pudo abrir y cerrar el puerto correctamente.
+    - Con ``connection_data`` (y pool activo) el puerto se abre en la sesión
+      compartida y queda abierto para la detección y el análisis.
     - Con ``verbose=True`` imprime el motivo del fallo y sugiere puertos disponibles.
     """
     if not port:
@@ -794,6 +1834,17 @@ def check_serial_port(port: str, baudrate: int = 9600, timeout: float = 1.0, *,
         if verbose:
             print("[Serial] pyserial no está instalado. Instala con: pip install pyserial")
         return False
+    # Si el pool ya mantiene el puerto abierto, no se puede (ni hace falta) reabrirlo
+    pooled = _SESSION_POOL.find("Serial", port)
+    if pooled is not None and pooled.is_open():
+        if verbose:
+            print(f"[Serial] Puerto {port} ya abierto en una sesión activa.")
+        return True
+    if connection_data is not None and _pooling_enabled(connection_data):
+        if get_session(connection_data, "Serial").open():
+            if verbose:
+                print(f"[Serial] Puerto {port} abierto correctamente a {baudrate} baudios.")
+            return True
     try:
         ser = serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
         # Pequeña espera para estabilizar
@@ -825,92 +1876,104 @@ def check_serial_port(port: str, baudrate: int = 9600, timeout: float = 1.0, *,
 
 # -------- SSH ---------
 def run_ssh_command(connection_data: Dict[str, Any], cmd: str) -> str:
-    return SSHConnection(connection_data).run(cmd)
+    return get_session(connection_data, "SSH2").run(cmd)
 
 
 # -------- Telnet (telnetlib3) ---------
 def run_telnet_command(connection_data: Dict[str, Any], cmd: str, vendor: str = "") -> str:
-    return TelnetConnection(connection_data, vendor).run(cmd)
+    return get_session(connection_data, "Telnet", vendor).run(cmd)
 
 
 # -------- Serial ---------
 def run_serial_command(connection_data: Dict[str, Any], cmd: str) -> str:
-    return SerialConnection(connection_data).run(cmd)
+    return get_session(connection_data, "Serial").run(cmd)
 
 
 # ---- Ejecutores en lote ----
-def run_ssh_commands_batch(connection_data: Dict[str, Any], cmds: List[str]) -> List[str]:
-    return SSHConnection(connection_data).run_batch(cmds)
+# ``on_result(etiqueta, comando, salida, segundos)`` recibe cada salida en cuanto
+# termina su comando (la etiqueta es ``labels[i]`` o el propio comando).
+def _labeled(on_result: Any, labels: Optional[List[str]]) -> Any:
+    if on_result is None:
+        return None
+
+    def _cb(index: int, cmd: str, output: str, elapsed: float) -> None:
+        label = labels[index] if labels and index < len(labels) else cmd
+        on_result(label, cmd, output, elapsed)
+    return _cb
+
+
+def run_ssh_commands_batch(connection_data: Dict[str, Any], cmds: List[str], on_result: Any = None,
+                           labels: Optional[List[str]] = None) -> List[str]:
+    return get_session(connection_data, "SSH2").run_batch(cmds, _labeled(on_result, labels))
 
 
-def run_telnet_commands_batch(connection_data: Dict[str, Any], cmds: List[str], vendor: str = "") -> List[str]:
-    return TelnetConnection(connection_data, vendor).run_batch(cmds)
+def run_telnet_commands_batch(connection_data: Dict[str, Any], cmds: List[str], vendor: str = "", on_result: Any = None,
+                              labels: Optional[List[str]] = None) -> List[str]:
+    return get_session(connection_data, "Telnet", vendor).run_batch(cmds, _labeled(on_result, labels))
 
 def run_telnet_commands_script(connection_data: Dict[str, Any], cmds: List[str], vendor: str = "") -> List[str]:
-    return TelnetConnection(connection_data, vendor).run_script(cmds)
+    return get_session(connection_data, "Telnet", vendor).run_script(cmds)
 
-def run_serial_commands_batch(connection_data: Dict[str, Any], cmds: List[str]) -> List[str]:
-    outputs: List[str] = []
-    sc = SerialConnection(connection_data)
-    for c in cmds:
-        outputs.append(sc.run(c))
-    return outputs
+def run_serial_commands_batch(connection_data: Dict[str, Any], cmds: List[str], on_result: Any = None,
+                              labels: Optional[List[str]] = None) -> List[str]:
+    return get_session(connection_data, "Serial").run_batch(cmds, _labeled(on_result, labels))
+
+
+# ---- API asíncrona (motor compartido) ----
+# Deben ejecutarse en el bucle del motor (``get_engine().submit``); permiten
+# multiplexar muchos equipos con ``asyncio.gather`` sin un hilo por sesión.
+async def run_commands_batch_async(connection_data: Dict[str, Any], cmds: List[str], vendor: str = "", on_result: Any = None,
+                                   labels: Optional[List[str]] = None) -> List[str]:
+    proto = connection_data.get("protocol", "SSH2")
+    if proto == "Serial":
+        # pyserial es bloqueante: se atiende en el executor del bucle
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, run_serial_commands_batch, connection_data, cmds, on_result, labels)
+    return await get_session(connection_data, proto, vendor).run_batch_async(cmds, _labeled(on_result, labels))
+
+
+async def read_prompt_async(connection_data: Dict[str, Any], vendor: str = "") -> str:
+    proto = connection_data.get("protocol", "SSH2")
+    if proto == "Serial":
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: get_session(connection_data, "Serial").read_prompt())
+    return await get_session(connection_data, proto, vendor).read_prompt_async()
 
 
 # -------- Vendor detection ---------
-def detect_vendor_ssh(connection_data: Dict[str, Any]) -> str:
+# La detección lee el prompt sobre la sesión agrupada, de modo que el análisis
+# posterior reutiliza el mismo shell autenticado en lugar de abrir otro.
+def detect_vendor_ssh(connection_data: Dict[str, Any], open_session: bool = True) -> str:
+    """Detecta el fabricante por SSH evitando un login dedicado.
+
+    1. Banner del servidor SSH (capturado en el chequeo TCP como
+       ``connection_data['ssh_banner']`` o sondeado aquí).
+    2. Si es ambiguo y ``open_session``: prompt inicial de la sesión
+       agrupada, que es la misma que ejecutará el primer lote.
+    """
     host = connection_data.get("hostname", "")
     port = int(connection_data.get("port", 22) or 22)
-    username = connection_data.get("username", "")
-    password = connection_data.get("password", "")
-    fast = bool(connection_data.get("fast_mode"))
     verbose = bool(connection_data.get("verbose"))
-    if not host or paramiko is None:
+    if not host or (paramiko is None and not replaying(connection_data)):
         return "desconocido"
     try:
+        banner = connection_data.get("ssh_banner")
+        if banner is None:
+            banner = probe_ssh_banner(host, port, timeout_s=0.7 if connection_data.get("fast_mode") else 1.0) or ""
+            connection_data["ssh_banner"] = banner
+        ven = _vendor_from_ssh_banner(banner)
         if verbose:
-            print(f"[SSH] Conectando a {host}:{port} para leer prompt...")
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        client.connect(host, port=port, username=username or None, password=password or None,
-                       look_for_keys=False, allow_agent=False, timeout=3 if fast else 5)
-        chan = client.invoke_shell()
-        time.sleep(0.2 if fast else 0.3)
-        try:
-            chan.send("\n")
-        except Exception:
-            pass
-        time.sleep(0.4 if fast else 0.6)
-        buf = ""
-        end = time.time() + (0.9 if fast else 1.2)
-        while time.time() < end:
-            try:
-                if chan.recv_ready():
-                    part = chan.recv(512).decode(errors="ignore")
-                else:
-                    part = ""
-            except Exception:
-                part = ""
-            if part:
-                buf += part
-            else:
-                time.sleep(0.08 if fast else 0.12)
+            print(f"[SSH] Banner del servidor: {banner or '(sin banner)'} -> {ven}")
+        if ven != "desconocido" or not open_session:
+            return ven
         if verbose:
-            print("[SSH] Salida inicial/prompt:")
-            for line in buf.splitlines()[:20]:
-                print(f"[SSH] {line}")
-        prompt_line = ""
-        for pl in reversed(buf.splitlines()):
-            pl = pl.strip()
-            if pl:
-                prompt_line = pl
-                break
-        vendor = _vendor_from_prompt(prompt_line)
-        try:
-            client.close()
-        except Exception:
-            pass
-        return vendor
+            print(f"[SSH] Conectando a {host}:{port} para leer prompt...")
+        sess = get_session(connection_data, "SSH2")
+        prompt_line = sess.read_prompt()
+        ven = _vendor_from_prompt(prompt_line)
+        if ven == "desconocido" and isinstance(sess, SSHConnection):
+            ven = _vendor_from_ssh_banner(sess.remote_banner())
+        return ven
     except Exception as e:
         print(f"[SSH] Error en detección de vendor: {e}")
         return "desconocido"
@@ -919,96 +1982,14 @@ def detect_vendor_ssh(connection_data: Dict[str, Any]) -> str:
 def detect_vendor_telnet(connection_data: Dict[str, Any]) -> str:
     host = connection_data.get("hostname", "")
     port = int(connection_data.get("port", 23) or 23)
-    username = connection_data.get("username", "")
-    password = connection_data.get("password", "")
-    fast = bool(connection_data.get("fast_mode"))
     verbose = bool(connection_data.get("verbose"))
-    if not host or telnet3 is None:
+    if not host or (telnet3 is None and not replaying(connection_data)):
         return "desconocido"
     try:
-        async def _detect() -> str:
-            if verbose:
-                print(f"[Telnet3] Conectando a {host}:{port}...")
-            reader, writer = await telnet3.open_connection(host=host, port=port, encoding="utf8", shell=None)
-
-            async def _read_for(seconds: float = 1.0) -> str:
-                end = time.monotonic() + seconds
-                buf = ""
-                while time.monotonic() < end:
-                    try:
-                        part = await asyncio.wait_for(reader.read(1024), timeout=0.20 if fast else 0.25)
-                    except Exception:
-                        part = ""
-                    if part:
-                        buf += part
-                    else:
-                        await asyncio.sleep(0.06 if fast else 0.1)
-                return buf
-
-            out_all = await _read_for(0.9 if fast else 1.2)
-            if verbose:
-                print("[Telnet3] Bienvenida/prompt:")
-                for line in out_all.splitlines()[:20]:
-                    print(f"[Telnet3] {line}")
-
-            async def _clear_more(text: str) -> str:
-                tries = 12
-                accum = text
-                while tries > 0 and "---- More ----" in accum:
-                    writer.write(" ")
-                    await asyncio.sleep(0.15)
-                    accum += await _read_for(0.6)
-                    tries -= 1
-                return accum
-
-            out_all = await _clear_more(out_all)
-            low = out_all.lower()
-            if any(p in low for p in ("username:", "user name:", "login:")):
-                if not username:
-                    if verbose:
-                        print("[Telnet3] Autenticación requerida, pero falta 'username'.")
-                    try:
-                        writer.close()
-                    except Exception:
-                        pass
-                    return "desconocido"
-                writer.write(username + "\r\n")
-                await asyncio.sleep(0.2 if fast else 0.3)
-                out_all += await _read_for(0.6 if fast else 0.8)
-                low = out_all.lower()
-                if ("password:" in low or "pass word:" in low):
-                    if not password:
-                        if verbose:
-                            print("[Telnet3] Se solicitó password, pero no fue provisto.")
-                        try:
-                            writer.close()
-                        except Exception:
-                            pass
-                        return "desconocido"
-                writer.write(password + "\r\n")
-                await asyncio.sleep(0.4 if fast else 0.6)
-                out_all += await _read_for(0.8 if fast else 1.0)
-
-            writer.write("\r\n")
-            await asyncio.sleep(0.15 if fast else 0.2)
-            out_all += await _read_for(0.6 if fast else 0.8)
-            out_all = await _clear_more(out_all)
-
-            prompt_text = ""
-            for pl in reversed(out_all.splitlines()):
-                pl = pl.strip()
-                if pl:
-                    prompt_text = pl
-                    break
-            vendor_found = _vendor_from_prompt(prompt_text)
-
-            try:
-                writer.close()
-            except Exception:
-                pass
-            return vendor_found
-
-        return asyncio.run(_detect())
+        if verbose:
+            print(f"[Telnet3] Conectando a {host}:{port}...")
+        prompt_text = get_session(connection_data, "Telnet").read_prompt()
+        return _vendor_from_prompt(prompt_text)
     except Exception as e:
         if verbose:
             print(f"[Telnet3] Error en detección de vendor: {e}")
@@ -1017,85 +1998,15 @@ def detect_vendor_telnet(connection_data: Dict[str, Any]) -> str:
 
 def detect_vendor_serial(connection_data: Dict[str, Any]) -> str:
     port = connection_data.get("port", "")
-    username = connection_data.get("username", "")
-    password = connection_data.get("password", "")
-    baudrate = int(connection_data.get("baudrate", 9600) or 9600)
-    fast = bool(connection_data.get("fast_mode"))
     verbose = bool(connection_data.get("verbose"))
-    if not port or serial is None:
+    if not port or (serial is None and not replaying(connection_data)):
         return "desconocido"
     try:
         if verbose:
             print(f"[Serial] Leyendo prompt en {port}...")
-        with serial.Serial(port=port, baudrate=baudrate, timeout=1.0 if fast else 1.5) as ser:
-            try:
-                ser.reset_input_buffer()
-                ser.reset_output_buffer()
-            except Exception:
-                pass
-            time.sleep(0.15 if fast else 0.2)
-            ser.write(b"\r")
-            time.sleep(0.4 if fast else 0.6)
-
-            def _read_chunk(duration: float = 0.8) -> str:
-                end = time.time() + duration
-                buf = ""
-                while time.time() < end:
-                    try:
-                        data = ser.read(512)
-                    except Exception:
-                        data = b""
-                    if data:
-                        buf += data.decode(errors="ignore")
-                    else:
-                        time.sleep(0.1)
-                return buf
-
-            # Intentar autenticación si el equipo la solicita
-            welcome = _read_chunk(0.7 if fast else 1.0)
-            wl = welcome.lower()
-            for _ in range(3):
-                if any(x in wl for x in ("username:", "user name:", "login:", "login authentication")):
-                    if username:
-                        print(f"[Serial] Respondiendo usuario")
-                        ser.write((username + "\r").encode())
-                        time.sleep(0.4 if fast else 0.6)
-                        resp = _read_chunk(0.9 if fast else 1.2)
-                        wl = resp.lower()
-                    else:
-                        break
-                if "password:" in wl:
-                    if password:
-                        print(f"[Serial] Respondiendo contraseña")
-                        ser.write((password + "\r").encode())
-                        time.sleep(0.9 if fast else 1.2)
-                        resp = _read_chunk(1.1 if fast else 1.5)
-                        wl = resp.lower()
-                    else:
-                        break
-                # Si ya no vemos prompts de login, salir
-                if not any(x in wl for x in ("username:", "user name:", "login:", "password:")):
-                    break
-
-            # Leer prompt final tras un retorno de carro
-            ser.write(b"\r")
-            time.sleep(0.5 if fast else 0.7)
-            out = _read_chunk(1.0 if fast else 1.3)
-            if verbose:
-                print("[Serial] Salida inicial/prompt:")
-                for line in out.splitlines()[:20]:
-                    print(f"[Serial] {line}")
-            prompt_text = ""
-            for pl in reversed(out.splitlines()):
-                pl = pl.strip()
-                if pl:
-                    prompt_text = pl
-                    break
-            return _vendor_from_prompt(prompt_text)
+        prompt_text = get_session(connection_data, "Serial").read_prompt()
+        return _vendor_from_prompt(prompt_text)
     except Exception as e:
         if verbose:
             print(f"[Serial] Error en detección de vendor: {e}")
         return "desconocido"
-    except Exception as e:
-        print(f"[Serial] Error en detección de vendor: {e}")
-        return "desconocido"
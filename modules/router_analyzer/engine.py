@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Optional
+
+
+class ConnectionEngine:
+    """Bucle de eventos único y de larga vida para todas las sesiones SSH/Telnet.
+
+    El bucle corre en un hilo de fondo (daemon), de modo que la GUI de Tk y
+    los llamadores síncronos siguen funcionando igual: ``run()`` envía una
+    corrutina al bucle y espera su resultado. Muchas sesiones pueden así
+    multiplexarse en el mismo bucle sin un hilo por dispositivo.
+
+    Se usa ``SelectorEventLoop`` también en Windows: la lectura orientada a
+    eventos de los canales SSH (``add_reader`` sobre ``Channel.fileno()``)
+    no está disponible en el bucle Proactor.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self._ensure_started()
+        assert self._loop is not None
+        return self._loop
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._loop is not None and not self._loop.is_closed() and self._thread is not None and self._thread.is_alive():
+                return
+            loop = asyncio.SelectorEventLoop()
+            ready = threading.Event()
+
+            def _serve() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=_serve, name="router-engine", daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop, self._thread = loop, thread
+
+    def in_engine_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable[Any]) -> "Future[Any]":
+        """Programa ``coro`` en el bucle y devuelve un ``concurrent.futures.Future``."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)  # type: ignore[arg-type]
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Envoltorio síncrono: ejecuta ``coro`` en el bucle y espera el resultado."""
+        if self.in_engine_thread():
+            # Bloquear el propio bucle esperando una corrutina suya es un interbloqueo
+            close = getattr(coro, "close", None)
+            if close is not None:
+                close()
+            raise RuntimeError("ConnectionEngine.run() no puede llamarse desde el bucle del motor")
+        return self.submit(coro).result(timeout)
+
+    def call_soon(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Ejecuta ``fn`` en el hilo del bucle (p.ej. cerrar un transporte)."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        if self.in_engine_thread():
+            fn(*args)
+        else:
+            self._loop.call_soon_threadsafe(fn, *args)
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """Detiene el bucle (salida de la aplicación)."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is None or loop.is_closed():
+            return
+
+        async def _cancel_all() -> None:
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:
+                t.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            if thread is not None and thread.is_alive() and threading.current_thread() is not thread:
+                asyncio.run_coroutine_threadsafe(_cancel_all(), loop).result(timeout)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and threading.current_thread() is not thread:
+            thread.join(timeout)
+        if not loop.is_running():
+            try:
+                loop.close()
+            except Exception:
+                pass
+
+
+_ENGINE = ConnectionEngine()
+
+
+def get_engine() -> ConnectionEngine:
+    """Motor de conexiones compartido por todo el proceso."""
+    return _ENGINE
+
+
+def run_sync(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Atajo: ejecuta una corrutina en el motor compartido y devuelve su resultado."""
+    return _ENGINE.run(coro, timeout)
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+# Archivo por defecto (relativo al directorio de trabajo, como saved_credentials.json)
+DEFAULT_CACHE_PATH = "device_fingerprints.json"
+# Vigencia por defecto de una huella: 24 horas
+DEFAULT_TTL_S = 24 * 3600.0
+
+KNOWN_VENDORS = ("huawei", "cisco", "juniper")
+
+_lock = threading.Lock()
+
+
+def fingerprint_key(connection_data: Dict[str, Any]) -> str:
+    """Clave de la huella: 'host:puerto' o 'serial:<puerto>' para consola."""
+    proto = connection_data.get("protocol", "SSH2")
+    port = str(connection_data.get("port", "") or "").strip()
+    if proto == "Serial":
+        return f"serial:{port}"
+    host = str(connection_data.get("hostname", "") or "").strip()
+    if not port:
+        port = "22" if proto == "SSH2" else ("23" if proto == "Telnet" else "")
+    return f"{host}:{port}"
+
+
+def _cache_path(connection_data: Dict[str, Any]) -> str:
+    path = connection_data.get("fingerprint_cache", DEFAULT_CACHE_PATH)
+    return path if isinstance(path, str) and path else ""
+
+
+def _ttl(connection_data: Dict[str, Any]) -> float:
+    try:
+        return float(connection_data.get("fingerprint_ttl", DEFAULT_TTL_S))
+    except Exception:
+        return DEFAULT_TTL_S
+
+
+def _enabled(connection_data: Dict[str, Any]) -> bool:
+    # fingerprint_cache=False/'' o fingerprint_ttl<=0 desactivan la caché
+    return bool(_cache_path(connection_data)) and _ttl(connection_data) > 0
+
+
+def _read_all(path: str) -> Dict[str, Any]:
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except Exception:
+        pass
+    return {}
+
+
+def _write_all(path: str, data: Dict[str, Any]) -> None:
+    # Escritura atómica: varios análisis (o procesos) pueden guardar a la vez
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_fingerprint(connection_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Devuelve la huella vigente del dispositivo o None si no existe o expiró."""
+    if not _enabled(connection_data):
+        return None
+    with _lock:
+        entry = _read_all(_cache_path(connection_data)).get(fingerprint_key(connection_data))
+    if not isinstance(entry, dict):
+        return None
+    if (time.time() - float(entry.get("saved_at", 0) or 0)) > _ttl(connection_data):
+        return None
+    if entry.get("vendor") not in KNOWN_VENDORS:
+        return None
+    return entry
+
+
+def save_fingerprint(connection_data: Dict[str, Any], **fields: Any) -> None:
+    """Guarda/actualiza la huella: vendor, prompt, version_output, needs_enable, paging_commands."""
+    if not _enabled(connection_data):
+        return
+    path = _cache_path(connection_data)
+    try:
+        with _lock:
+            data = _read_all(path)
+            entry = data.get(fingerprint_key(connection_data))
+            entry = dict(entry) if isinstance(entry, dict) else {}
+            entry.update({k: v for k, v in fields.items() if v is not None})
+            entry["saved_at"] = time.time()
+            data[fingerprint_key(connection_data)] = entry
+            _write_all(path, data)
+    except Exception as e:
+        if connection_data.get("verbose"):
+            print(f"[CLI] No se pudo guardar la huella del dispositivo: {e}", flush=True)
+
+
+def invalidate_fingerprint(connection_data: Dict[str, Any]) -> None:
+    """Elimina la huella del dispositivo (p.ej. si dejó de coincidir)."""
+    if not _cache_path(connection_data):
+        return
+    path = _cache_path(connection_data)
+    try:
+        with _lock:
+            data = _read_all(path)
+            if data.pop(fingerprint_key(connection_data), None) is not None:
+                _write_all(path, data)
+    except Exception:
+        pass
+
+
+def apply_fingerprint(connection_data: Dict[str, Any]) -> str:
+    """Carga la huella vigente en ``connection_data`` y devuelve el vendor ('' si no hay).
+
+    Rellena ``vendor_hint``, ``cached_version_output`` y ``needs_enable`` para
+    que el análisis omita la detección y el comando de versión. Al grabar una
+    transcripción no se usa: la grabación debe contener esos comandos para
+    que su reproducción (sin caché de huellas) envíe lo mismo.
+    """
+    hint = (connection_data.get("vendor_hint") or "").strip().lower()
+    if hint in KNOWN_VENDORS:
+        return hint
+    if connection_data.get("record_transcripts") and not connection_data.get("replay_transcript"):
+        return ""
+    entry = load_fingerprint(connection_data)
+    if not entry:
+        return ""
+    vendor = entry["vendor"]
+    connection_data["vendor_hint"] = vendor
+    connection_data["fingerprint_hit"] = True
+    ver = entry.get("version_output")
+    if isinstance(ver, str) and ver.strip() and not connection_data.get("cached_version_output"):
+        connection_data["cached_version_output"] = ver
+    if isinstance(entry.get("needs_enable"), bool):
+        connection_data.setdefault("needs_enable", entry["needs_enable"])
+    if connection_data.get("verbose"):
+        print(f"[CLI] Huella en caché para {fingerprint_key(connection_data)}: {vendor}", flush=True)
+    return vendor
@@ -0,0 +1,189 @@
+import csv
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, IO
+
+from .router_analyzer import RouterAnalyzer
+from .connections import close_session
+from .records import json_default
+
+
+# Fabricantes que la detección reconoce (el resto cuenta como desconocido)
+_KNOWN_VENDORS = ("huawei", "cisco", "juniper")
+
+# Columnas reconocidas en el inventario (CSV o JSON)
+INVENTORY_FIELDS = (
+    "hostname", "port", "protocol", "username", "password", "enable_password",
+    "vendor_hint", "baudrate", "fast_mode",
+)
+
+
+def _coerce_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "si", "sí", "y")
+
+
+def load_inventory(path: str) -> List[Dict[str, Any]]:
+    """Carga el inventario de equipos desde CSV (con cabecera) o JSON.
+
+    JSON admite una lista de objetos o ``{"devices": [...]}``. Cada equipo
+    necesita al menos ``hostname`` (o ``port`` para Serial).
+    """
+    devices: List[Dict[str, Any]] = []
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        rows = data.get("devices", []) if isinstance(data, dict) else data
+        for row in rows or []:
+            if isinstance(row, dict):
+                devices.append(dict(row))
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                clean = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items() if k}
+                if any(clean.values()):
+                    devices.append(clean)
+    for dev in devices:
+        if "fast_mode" in dev:
+            dev["fast_mode"] = _coerce_bool(dev["fast_mode"])
+    return [d for d in devices if d.get("hostname") or (d.get("protocol") == "Serial" and d.get("port"))]
+
+
+def parse_vendor_limits(specs: Optional[List[str]]) -> Dict[str, int]:
+    """Convierte ['cisco=4', 'huawei=2'] (o 'cisco=4,huawei=2') en un dict."""
+    limits: Dict[str, int] = {}
+    for spec in specs or []:
+        for item in str(spec).split(","):
+            if "=" not in item:
+                continue
+            ven, num = item.split("=", 1)
+            try:
+                n = int(num)
+            except ValueError:
+                continue
+            if n > 0:
+                limits[ven.strip().lower()] = n
+    return limits
+
+
+def _device_connection_data(device: Dict[str, Any], defaults: Dict[str, Any]) -> Dict[str, Any]:
+    conn = dict(defaults)
+    for key, value in device.items():
+        if value not in (None, ""):
+            conn[key] = value
+    conn.setdefault("protocol", "SSH2")
+    if conn["protocol"] == "Serial":
+        conn["hostname"] = ""
+    conn.setdefault("prefetch_running_config", True)
+    return conn
+
+
+def analyze_device(connection_data: Dict[str, Any], vendor_gate: Optional[Callable[[str], Any]] = None) -> Dict[str, Any]:
+    """Analiza un equipo y devuelve el registro de resultado (una línea JSON).
+
+    ``vendor_gate(vendor)`` devuelve un context manager que limita la
+    concurrencia del análisis por fabricante (la conexión no se limita). Con
+    límite, el fabricante se resuelve antes (``resolve_vendor``): por SSH un
+    banner genérico no basta para elegir el semáforo.
+    """
+    host = connection_data.get("hostname") or ""
+    port = str(connection_data.get("port") or "")
+    record: Dict[str, Any] = {
+        "target": f"{host}:{port}" if host and port else (host or port),
+        "protocol": connection_data.get("protocol", "SSH2"),
+        "ok": False,
+        "vendor": "desconocido",
+    }
+    start = time.time()
+    try:
+        analyzer = RouterAnalyzer(connection_data)
+        if not analyzer.connect():
+            record["error"] = "no se pudo conectar"
+            return record
+        gate = vendor_gate(analyzer.resolve_vendor()) if vendor_gate else None
+        if gate is not None:
+            with gate:
+                analysis_data = analyzer.analyze_router()
+        else:
+            analysis_data = analyzer.analyze_router()
+        parsed = analyzer.parse_analysis_data(analysis_data)
+        record["ok"] = True
+        record["vendor"] = analysis_data.get("vendor", analyzer.vendor)
+        record["commands_executed"] = analysis_data.get("commands_executed", [])
+        record["parsed"] = parsed
+    except Exception as e:
+        record["error"] = str(e)
+    finally:
+        record["elapsed_s"] = round(time.time() - start, 3)
+        # No mantener cientos de sesiones abiertas tras el análisis
+        try:
+            close_session(connection_data)
+        except Exception:
+            pass
+    return record
+
+
+class _VendorLimiter:
+    """Semáforos por fabricante; los fabricantes conocidos sin límite no esperan.
+
+    Los equipos de fabricante desconocido comparten un semáforo con el límite
+    más estricto configurado: pueden ser de cualquiera de los fabricantes
+    limitados.
+    """
+
+    def __init__(self, limits: Dict[str, int]):
+        self._sems = {ven: threading.BoundedSemaphore(n) for ven, n in limits.items()}
+        self._unknown = threading.BoundedSemaphore(min(limits.values())) if limits else None
+        self._null = _NullGate()
+
+    def __call__(self, vendor: str) -> Any:
+        ven = (vendor or "").lower()
+        if ven in self._sems:
+            return self._sems[ven]
+        if ven in _KNOWN_VENDORS or self._unknown is None:
+            return self._null
+        return self._unknown
+
+
+class _NullGate:
+    def __enter__(self) -> "_NullGate":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+def run_fleet(devices: List[Dict[str, Any]], workers: int = 8, vendor_limits: Optional[Dict[str, int]] = None,
+              defaults: Optional[Dict[str, Any]] = None, out: Optional[IO[str]] = None) -> Dict[str, Any]:
+    """Analiza un inventario con un pool acotado de workers.
+
+    Escribe una línea JSON por equipo en ``out`` (stdout por defecto) en
+    cuanto termina, y devuelve un resumen con totales.
+    """
+    out = out or sys.stdout
+    defaults = dict(defaults or {})
+    # Sin límites no hace falta resolver el fabricante antes del análisis
+    limiter = _VendorLimiter(vendor_limits) if vendor_limits else None
+    write_lock = threading.Lock()
+    summary: Dict[str, Any] = {"total": len(devices), "ok": 0, "failed": 0, "by_vendor": {}}
+    start = time.time()
+
+    def _job(device: Dict[str, Any]) -> None:
+        record = analyze_device(_device_connection_data(device, defaults), limiter)
+        line = json.dumps(record, ensure_ascii=False, default=json_default)
+        with write_lock:
+            out.write(line + "\n")
+            out.flush()
+            summary["ok" if record.get("ok") else "failed"] += 1
+            ven = record.get("vendor") or "desconocido"
+            summary["by_vendor"][ven] = summary["by_vendor"].get(ven, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=max(1, int(workers or 1)), thread_name_prefix="fleet") as pool:
+        for _ in pool.map(_job, devices):
+            pass
+    summary["elapsed_s"] = round(time.time() - start, 3)
+    return summary
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+from typing import Dict, Any, List, Tuple
+
+from .fingerprint_cache import fingerprint_key
+
+
+# Archivo por defecto (relativo al directorio de trabajo, como device_fingerprints.json)
+DEFAULT_STORE_PATH = "device_latency.json"
+# Muestras recientes que se conservan por (dispositivo, comando)
+MAX_SAMPLES = 30
+# Muestras mínimas antes de sustituir los tiempos fijos (con pocas, el
+# percentil 95 es solo la muestra más lenta de unas pocas respuestas rápidas)
+MIN_SAMPLES = 10
+# Límites de los tiempos aprendidos (segundos)
+IDLE_BOUNDS = (0.3, 30.0)
+HARD_BOUNDS = (2.0, 300.0)
+
+_lock = threading.Lock()
+# Copia en memoria por archivo; se escribe al cerrar sesiones (flush_latencies)
+_stores: Dict[str, Dict[str, Any]] = {}
+_dirty: Dict[str, bool] = {}
+
+
+def _store_path(connection_data: Dict[str, Any]) -> str:
+    path = connection_data.get("latency_store", DEFAULT_STORE_PATH)
+    return path if isinstance(path, str) and path else ""
+
+
+def _command_key(connection_data: Dict[str, Any], cmd: str) -> str:
+    return f"{fingerprint_key(connection_data)}|{' '.join((cmd or '').lower().split())}"
+
+
+def _load(path: str) -> Dict[str, Any]:
+    # Llamar con _lock tomado
+    store = _stores.get(path)
+    if store is None:
+        store = {}
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                store = data if isinstance(data, dict) else {}
+        except Exception:
+            store = {}
+        _stores[path] = store
+    return store
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def record_latency(connection_data: Dict[str, Any], cmd: str, ttfb: float, total: float, gap: float = 0.0,
+                   complete: bool = True) -> None:
+    """Registra tiempo hasta el primer byte, mayor silencio entre fragmentos y duración total.
+
+    Una lectura que no llegó al prompt (``complete=False``) se registra con el
+    doble de duración para que la siguiente espera sea más generosa.
+    """
+    path = _store_path(connection_data)
+    if not path or not cmd:
+        return
+    if not complete:
+        ttfb, gap, total = ttfb * 2.0, gap * 2.0, total * 2.0
+    with _lock:
+        store = _load(path)
+        entry = store.setdefault(_command_key(connection_data, cmd), {})
+        for name, value in (("ttfb", ttfb), ("gap", gap), ("total", total)):
+            samples = entry.setdefault(name, [])
+            samples.append(round(max(0.0, float(value)), 4))
+            del samples[:-MAX_SAMPLES]
+        _dirty[path] = True
+
+
+def adaptive_timeouts(connection_data: Dict[str, Any], cmd: str, idle: float, hard: float) -> Tuple[float, float, bool]:
+    """Devuelve ``(idle, hard, aprendido)`` para ``cmd`` en este dispositivo.
+
+    Con al menos ``MIN_SAMPLES`` observaciones se usa el percentil 95: la
+    ventana de silencio cubre dos veces el silencio más largo observado y el
+    tope total tres veces la duración más lenta. La ventana aprendida solo
+    alarga la fija (``idle``), nunca la acorta: un equipo rápido termina antes
+    por el tope total aprendido, no por cortar silencios. Sin historial se
+    devuelven los valores fijos recibidos.
+    """
+    path = _store_path(connection_data)
+    if not path:
+        return idle, hard, False
+    with _lock:
+        entry = _load(path).get(_command_key(connection_data, cmd))
+        entry = entry if isinstance(entry, dict) else {}
+        ttfbs = list(entry.get("ttfb", []))
+        gaps = list(entry.get("gap", [])) or [0.0]
+        totals = list(entry.get("total", []))
+    if len(ttfbs) < MIN_SAMPLES or len(totals) < MIN_SAMPLES:
+        return idle, hard, False
+    silence = max(_percentile(ttfbs, 95), _percentile(gaps, 95))
+    learned_idle = max(idle, min(max(2.0 * silence + 0.25, IDLE_BOUNDS[0]), IDLE_BOUNDS[1]))
+    learned_hard = min(max(3.0 * _percentile(totals, 95) + 1.0, HARD_BOUNDS[0]), HARD_BOUNDS[1])
+    return learned_idle, max(learned_hard, learned_idle), True
+
+
+def flush_latencies() -> None:
+    """Escribe en disco los almacenes modificados (escritura atómica)."""
+    with _lock:
+        pending = [(path, json.dumps(_stores.get(path, {}), indent=1, ensure_ascii=False))
+                   for path, dirty in _dirty.items() if dirty]
+        _dirty.clear()
+    for path, text in pending:
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"[CLI] No se pudieron guardar las latencias: {e}", flush=True)
@@ -0,0 +1,84 @@
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+from .records import Record
+
+
+# Límite del caché: entradas y peso total (longitud de las entradas parseadas)
+MAX_ENTRIES = 256
+MAX_WEIGHT = 64 * 1024 * 1024
+# Textos más cortos se parsean directamente (copiar el resultado costaría lo mismo)
+MIN_TEXT_LEN = 256
+
+_lock = threading.Lock()
+_entries: "OrderedDict[Tuple[str, str], Tuple[Any, int]]" = OrderedDict()
+_weight = 0
+_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def _clone(value: Any) -> Any:
+    # Copia de dicts/listas anidados (los llamadores modifican los resultados);
+    # más barata que copy.deepcopy para estructuras de datos simples
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    if isinstance(value, Record):
+        # Los campos de los registros son texto: basta una copia superficial
+        return value.copy()
+    return value
+
+
+def cached_parser(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorador: memoriza ``fn(text)`` por (nombre del parser, hash del texto).
+
+    Cada llamada devuelve una copia del resultado guardado, así que los
+    llamadores pueden modificarlo sin afectar al caché.
+    """
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(text: Any, *args: Any, **kwargs: Any) -> Any:
+        global _weight
+        if not isinstance(text, str) or len(text) < MIN_TEXT_LEN or args or kwargs:
+            return fn(text, *args, **kwargs)
+        key = (name, _digest(text))
+        with _lock:
+            hit = _entries.get(key)
+            if hit is not None:
+                _entries.move_to_end(key)
+                _stats["hits"] += 1
+        if hit is not None:
+            return _clone(hit[0])
+        result = fn(text)
+        with _lock:
+            _stats["misses"] += 1
+            if key not in _entries:
+                _entries[key] = (_clone(result), len(text))
+                _weight += len(text)
+                while _entries and (len(_entries) > MAX_ENTRIES or _weight > MAX_WEIGHT):
+                    _, (_, size) = _entries.popitem(last=False)
+                    _weight -= size
+        return result
+
+    return wrapper
+
+
+def clear_parse_cache() -> None:
+    global _weight
+    with _lock:
+        _entries.clear()
+        _weight = 0
+        _stats["hits"] = _stats["misses"] = 0
+
+
+def parse_cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {"entries": len(_entries), "weight": _weight, **_stats}
@@ -1,10 +1,31 @@
+"""Parsers de las salidas de Huawei, Cisco y Juniper.
+
+Los parsers de tablas (interfaces, rutas estáticas, vecinos OSPF/BGP) y las
+redes OSPF de las configuraciones devuelven registros de ``records``
+(``Interface``, ``StaticRoute``, ``OspfNeighbor``, ``BgpPeer``,
+``OspfNetwork``), no dicts: se leen como un dict (``rec["name"]``,
+``rec.get``, ``{**rec}``) pero ``isinstance(rec, dict)`` es falso y
+``json.dumps`` necesita ``default=json_default``. Las versiones y las
+configuraciones OSPF/BGP siguen siendo dicts.
+"""
 import re
 from typing import Dict, Any, List
 
+from .bgp_table import BgpNeighborTable
+from .config_index import build_index
+from .parse_cache import cached_parser
+from .records import BgpPeer, Interface, OspfNeighbor, OspfNetwork, StaticRoute
+from .table_parser import TableParser
+
+_IP = r"\d{1,3}(?:\.\d{1,3}){3}"
+_IP_RE = re.compile(_IP)
+_TYPE_PREFIX = re.compile(r"^([A-Za-z-]+)")
+
 
 # ---------------- Huawei Parsers -----------------
 
-def parse_huawei_ip_interface_brief(text: str) -> List[Dict[str, Any]]:
+@cached_parser
+def parse_huawei_ip_interface_brief(text: str) -> List[Interface]:
     import re
 
     def cidr_to_mask(cidr: int) -> str:
@@ -107,10 +128,11 @@ def parse_huawei_ip_interface_brief(text: str) -> List[Dict[str, Any]]:
         if key in seen:
             continue
         seen.add(key)
-        unique.append(it)
+        unique.append(Interface(**it))
     return unique
 
 
+@cached_parser
 def parse_huawei_version(text: str) -> Dict[str, Any]:
     import re
     di: Dict[str, Any] = {
@@ -218,7 +240,8 @@ def parse_huawei_version(text: str) -> Dict[str, Any]:
 
 # ---------------- Huawei Static Routes -----------------
 
-def parse_huawei_static_routes(text: str) -> List[Dict[str, Any]]:
+@cached_parser
+def parse_huawei_static_routes(text: str) -> List[StaticRoute]:
     """Extrae rutas estáticas desde la salida filtrada de Huawei.
 
     Entrada típica:
@@ -230,7 +253,7 @@ def parse_huawei_static_routes(text: str) -> List[Dict[str, Any]]:
     Devuelve una lista de dicts con claves: dest, mask, next_hop, distance.
     Captura opcional de 'preference <n>' como distancia.
     """
-    routes: List[Dict[str, Any]] = []
+    routes: List[StaticRoute] = []
 
     def cidr_to_mask(cidr: str) -> str:
         try:
@@ -240,13 +263,8 @@ def parse_huawei_static_routes(text: str) -> List[Dict[str, Any]]:
         except Exception:
             return ""
 
-    for raw in text.splitlines():
-        line = raw.strip()
-        if not line:
-            continue
-        low = line.lower()
-        if low.startswith("<huawei>") or "display current-configuration" in low:
-            continue
+    for stanza in build_index(text).find("ip route-static"):
+        line = stanza.text
         # Buscar patrón principal: ip route-static [vpn-instance VRF] dest mask|cidr next-hop
         m = re.search(
             r"ip\s+route-static\s+(?:vpn-instance\s+\S+\s+)?"  # opcional VRF
@@ -263,15 +281,15 @@ def parse_huawei_static_routes(text: str) -> List[Dict[str, Any]]:
         next_hop = m.group(3)
         dist = (m.group(4) or "") if m.lastindex and m.lastindex >= 4 else ""
         mask = mask_or_cidr if "." in mask_or_cidr else cidr_to_mask(mask_or_cidr)
-        routes.append({
-            "dest": dest,
-            "mask": mask,
-            "next_hop": next_hop,
-            "distance": dist,
-        })
+        routes.append(StaticRoute(
+            dest=dest,
+            mask=mask,
+            next_hop=next_hop,
+            distance=dist,
+        ))
 
     # Eliminar duplicados básicos
-    unique: List[Dict[str, Any]] = []
+    unique: List[StaticRoute] = []
     seen = set()
     for r in routes:
         key = (r["dest"], r["mask"], r["next_hop"])  # distancia no se considera
@@ -284,57 +302,48 @@ def parse_huawei_static_routes(text: str) -> List[Dict[str, Any]]:
 
 # ---------------- Cisco Parsers -----------------
 
-def parse_cisco_ip_interface_brief(text: str) -> List[Dict[str, Any]]:
-    import re
-    interfaces: List[Dict[str, Any]] = []
-
-    def infer_type(name: str) -> str:
-        m = re.match(r"^([A-Za-z-]+)", name)
-        return m.group(1) if m else "Ethernet"
-
-    for line in text.splitlines():
-        s = line.strip()
-        if not s:
-            continue
-        l = s.lower()
-        if any(k in l for k in [
-            "interface", "ip-address", "ok?", "method", "status", "protocol",
-            "show ip interface brief", "copyright",
-        ]):
-            continue
-        if not s[0].isalnum():
-            continue
-        parts = re.split(r"\s+", s)
-        if len(parts) < 3:
-            continue
-        name = parts[0]
-        iptok = parts[1]
-        import re as _re
-        is_ip = bool(_re.match(r"^\d{1,3}(?:\.\d{1,3}){3}$", iptok))
-        if (iptok.lower() != "unassigned") and (not is_ip):
-            continue
-        ipaddr = iptok if is_ip else ""
-        status = "down"
-        if len(parts) >= 6:
-            st = parts[-2].lower()
-            pr = parts[-1].lower()
-            status = "up" if (st.startswith("up") and pr.startswith("up")) else ("down")
-        interfaces.append({
-            "name": name,
-            "type": infer_type(name),
-            "ip_address": ipaddr,
-            "mask": "",
-            "status": status,
-            "description": "",
-        })
+_CISCO_IP_BRIEF = TableParser(
+    {"Interface": "name", "IP-Address": "ip_address", "OK?": "ok", "Method": "method",
+     "Status": "status", "Protocol": "protocol"},
+    required=("name", "ip_address", "status"),
+    accept=lambda row: bool(row["name"][:1].isalnum()) and (
+        row["ip_address"].lower() == "unassigned" or bool(_IP_RE.fullmatch(row["ip_address"]))),
+    # Sin cabecera: <Interface> <IP> <OK?> [<Method> <Status> <Protocol>], saltando títulos y banners
+    fallback=(re.compile(
+        r"^(?!.*(?i:interface|ip-address|ok\?|method|status|protocol|copyright))"
+        r"(?P<name>\S+)\s+(?P<ip_address>\S+)\s+\S+"
+        r"(?:\s+\S+\s+(?P<status>.*\S)\s+(?P<protocol>\S+)\s*$)?"
+    ),),
+)
+
+
+@cached_parser
+def parse_cisco_ip_interface_brief(text: str) -> List[Interface]:
+    interfaces: List[Interface] = []
+    for row in _CISCO_IP_BRIEF.rows(text):
+        name = row["name"]
+        ipaddr = row["ip_address"]
+        up = row.get("status", "").lower().startswith("up") and row.get("protocol", "").lower().startswith("up")
+        m = _TYPE_PREFIX.match(name)
+        interfaces.append(Interface(
+            name=name,
+            type=m.group(1) if m else "Ethernet",
+            ip_address="" if ipaddr.lower() == "unassigned" else ipaddr,
+            mask="",
+            status="up" if up else "down",
+            description="",
+        ))
     return interfaces
 
-def parse_cisco_interface_section(text: str) -> List[Dict[str, Any]]:
-    import re
-    results: List[Dict[str, Any]] = []
-    for m in re.finditer(r"(?mis)^\s*interface\s+(\S+)\s*([\s\S]*?)(?=^\s*interface\s+\S+|\Z)", text):
-        name = m.group(1)
-        blk = m.group(2) or ""
+@cached_parser
+def parse_cisco_interface_section(text: str) -> List[Interface]:
+    results: List[Interface] = []
+    for stanza in build_index(text).find("interface"):
+        words = stanza.words
+        if len(words) < 2:
+            continue
+        name = words[1]
+        blk = stanza.body()
         ip = ""
         mask = ""
         vrf = ""
@@ -349,10 +358,11 @@ def parse_cisco_interface_section(text: str) -> List[Dict[str, Any]]:
             vrf = vm.group(1)
         tmatch = re.match(r"^([A-Za-z-]+)", name)
         itype = tmatch.group(1) if tmatch else "Ethernet"
-        results.append({"name": name, "type": itype, "ip_address": ip, "mask": mask, "vrf": vrf})
+        results.append(Interface(name=name, type=itype, ip_address=ip, mask=mask, vrf=vrf))
     return results
 
 
+@cached_parser
 def parse_cisco_version(text: str) -> Dict[str, Any]:
     import re
     di: Dict[str, Any] = {
@@ -421,7 +431,8 @@ def parse_cisco_version(text: str) -> Dict[str, Any]:
     return di
 
 
-def parse_cisco_static_routes(text: str) -> List[Dict[str, Any]]:
+@cached_parser
+def parse_cisco_static_routes(text: str) -> List[StaticRoute]:
     """Extrae rutas estáticas desde 'show running-config | sec ip route'.
 
     Soporta formas comunes:
@@ -429,7 +440,7 @@ def parse_cisco_static_routes(text: str) -> List[Dict[str, Any]]:
       ip route vrf <VRF> <dest> <mask> <next-hop> [distance]
       ip route <dest> <mask> <ifname> <next-hop> [distance]  (captura next-hop)
     """
-    routes: List[Dict[str, Any]] = []
+    routes: List[StaticRoute] = []
 
     def is_ip(s: str) -> bool:
         return bool(re.match(r"^\d{1,3}(?:\.\d{1,3}){3}$", s))
@@ -469,17 +480,17 @@ def parse_cisco_static_routes(text: str) -> List[Dict[str, Any]]:
             if not next_hop:
                 # No soportamos rutas solo con interfaz sin IP
                 continue
-            routes.append({
-                "dest": dest,
-                "mask": mask,
-                "next_hop": next_hop,
-                "distance": distance,
-            })
+            routes.append(StaticRoute(
+                dest=dest,
+                mask=mask,
+                next_hop=next_hop,
+                distance=distance,
+            ))
         except Exception:
             continue
 
     # Deduplicar
-    unique: List[Dict[str, Any]] = []
+    unique: List[StaticRoute] = []
     seen = set()
     for r in routes:
         key = (r["dest"], r["mask"], r["next_hop"], r.get("distance", ""))
@@ -492,6 +503,7 @@ def parse_cisco_static_routes(text: str) -> List[Dict[str, Any]]:
 
 # ---------------- Cisco OSPF/BGP Config Parsers -----------------
 
+@cached_parser
 def parse_cisco_ospf_config(text: str) -> Dict[str, Any]:
     """Parsea TODOS los procesos OSPF en un running-config de Cisco.
 
@@ -501,22 +513,24 @@ def parse_cisco_ospf_config(text: str) -> Dict[str, Any]:
     """
     result: Dict[str, Any] = {"process_id": "", "networks": [], "router_id": "", "processes": []}
 
-    # Encontrar bloques 'router ospf <pid>' y su contenido hasta el siguiente bloque
-    # o final del texto.
-    for match in re.finditer(r"(?mi)^router\s+ospf\s+(\d+)\b([\s\S]*?)(?=^router\s+ospf\s+\d+\b|\Z)", text):
-        pid = match.group(1)
-        block = match.group(2)
+    # Bloques 'router ospf <pid>' de primer nivel y sus líneas hijas
+    for stanza in build_index(text).find("router ospf"):
+        pid_m = re.match(r"(\d+)\b", stanza.words[2]) if len(stanza.words) > 2 else None
+        if stanza.indent != 0 or not pid_m:
+            continue
+        pid = pid_m.group(1)
+        block = stanza.body()
         # router-id dentro del bloque
         rid_m = re.search(r"router-id\s+(\d{1,3}(?:\.\d{1,3}){3})", block, re.IGNORECASE)
         rid = rid_m.group(1) if rid_m else ""
         # networks dentro del bloque
-        nets: List[Dict[str, Any]] = []
+        nets: List[OspfNetwork] = []
         for nm in re.finditer(r"(?i)network\s+(\d{1,3}(?:\.\d{1,3}){3})\s+(\d{1,3}(?:\.\d{1,3}){3})\s+area\s+([\d\.]+)", block):
-            nets.append({
-                "network": nm.group(1),
-                "wildcard": nm.group(2),
-                "area": nm.group(3),
-            })
+            nets.append(OspfNetwork(
+                network=nm.group(1),
+                wildcard=nm.group(2),
+                area=nm.group(3),
+            ))
         result["processes"].append({
             "process_id": pid,
             "router_id": rid,
@@ -533,6 +547,33 @@ def parse_cisco_ospf_config(text: str) -> Dict[str, Any]:
     return result
 
 
+_CISCO_NEIGHBOR = re.compile(rf"neighbor\s+({_IP})\s+remote-as\s+(\d+)\b", re.IGNORECASE)
+_HUAWEI_PEER = re.compile(rf"peer\s+({_IP})\s+as-number\s+(\d+)\b", re.IGNORECASE)
+
+
+def _vrf_of(stanza: Any) -> str:
+    """VRF del address-family que contiene ``stanza`` ('' si es global).
+
+    Cisco: 'address-family ipv4 vrf <NAME>'; Huawei: 'ipv4-family [vpnv4] vpn-instance <NAME>'.
+    """
+    parent = stanza.parent
+    while parent is not None and parent.line >= 0:
+        words = [w.lower() for w in parent.words]
+        if words[0] in ("address-family", "ipv4-family"):
+            for marker in ("vrf", "vpn-instance"):
+                if marker in words[:-1]:
+                    return parent.words[words.index(marker) + 1]
+            return ""
+        parent = parent.parent
+    return ""
+
+
+def _config_neighbors(table: BgpNeighborTable) -> List[Dict[str, Any]]:
+    # Lista combinada (global + VRFs) en orden de aparición, sin duplicados por (vrf, ip)
+    return [{"ip": row["ip"], "remote_as": row["remote_as"], "vrf": row["vrf"]} for row in table]
+
+
+@cached_parser
 def parse_cisco_bgp_config(text: str) -> Dict[str, Any]:
     """Extrae AS, vecinos y VRFs de 'show running-config' Cisco.
 
@@ -551,140 +592,159 @@ def parse_cisco_bgp_config(text: str) -> Dict[str, Any]:
         "vrfs": [],
     }
 
+    idx = build_index(text)
+    table = BgpNeighborTable()
+
     # AS global y router-id
-    m = re.search(r"(?mi)^\s*router\s+bgp\s+(\d+)\b", text)
-    if m:
-        result["as_number"] = m.group(1)
-    rid = re.search(r"(?mi)^\s*bgp\s+router-id\s+(\d{1,3}(?:\.\d{1,3}){3})\b", text)
-    if rid:
-        result["router_id"] = rid.group(1)
-
-    # Bloque global address-family ipv4
-    gblk_m = re.search(r"(?mis)^\s*address-family\s+ipv4\b([\s\S]*?)^\s*exit-address-family\b", text)
-    if gblk_m:
-        gblk = gblk_m.group(1)
-        result["global"]["config_text"] = gblk.strip()
-        # networks
-        for nm in re.finditer(r"(?mi)^\s*network\s+(\d{1,3}(?:\.\d{1,3}){3})\s+mask\s+(\d{1,3}(?:\.\d{1,3}){3})\b", gblk):
-            result["global"]["networks"].append({"prefix": nm.group(1), "mask": nm.group(2)})
-        # neighbors en global
-        for nb in re.finditer(r"(?mi)^\s*neighbor\s+(\d{1,3}(?:\.\d{1,3}){3})\s+remote-as\s+(\d+)\b", gblk):
-            item = {"ip": nb.group(1), "remote_as": nb.group(2)}
-            result["global"]["neighbors"].append(item)
-            result["neighbors"].append(item)
-
-    # VRFs: bloques 'address-family ipv4 vrf <NAME>'
-    for mvrf in re.finditer(r"(?mis)^\s*address-family\s+ipv4\s+vrf\s+(\S+)\b([\s\S]*?)^\s*exit-address-family\b", text):
-        name = mvrf.group(1)
-        body = mvrf.group(2)
-        vrf: Dict[str, Any] = {"name": name, "router_id": "", "networks": [], "neighbors": [], "config_text": body.strip()}
-        rid2 = re.search(r"(?mi)^\s*bgp\s+router-id\s+(\d{1,3}(?:\.\d{1,3}){3})\b", body)
-        if rid2:
-            vrf["router_id"] = rid2.group(1)
-        for nm in re.finditer(r"(?mi)^\s*network\s+(\d{1,3}(?:\.\d{1,3}){3})\s+mask\s+(\d{1,3}(?:\.\d{1,3}){3})\b", body):
-            vrf["networks"].append({"prefix": nm.group(1), "mask": nm.group(2)})
-        for nb in re.finditer(r"(?mi)^\s*neighbor\s+(\d{1,3}(?:\.\d{1,3}){3})\s+remote-as\s+(\d+)\b", body):
-            item = {"ip": nb.group(1), "remote_as": nb.group(2)}
-            vrf["neighbors"].append(item)
-            result["neighbors"].append(item)
-        result["vrfs"].append(vrf)
+    for stanza in idx.find("router bgp"):
+        m = re.match(r"(\d+)\b", stanza.words[2]) if len(stanza.words) > 2 else None
+        if m:
+            result["as_number"] = m.group(1)
+            break
+    for stanza in idx.find("bgp router-id"):
+        rid = re.match(rf"({_IP})\b", stanza.words[2]) if len(stanza.words) > 2 else None
+        if rid:
+            result["router_id"] = rid.group(1)
+            break
+
+    def _neighbors(block: Any) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        for nb in block.find("neighbor"):
+            mm = _CISCO_NEIGHBOR.match(nb.text)
+            if mm:
+                items.append({"ip": mm.group(1), "remote_as": mm.group(2)})
+        return items
 
-    # Vecinos globales en otros lugares (fallback)
-    for nm in re.finditer(r"(?mi)^\s*neighbor\s+(\d{1,3}(?:\.\d{1,3}){3})\s+remote-as\s+(\d+)\b", text):
-        item = {"ip": nm.group(1), "remote_as": nm.group(2)}
-        # evitar duplicados
-        if item not in result["neighbors"]:
-            result["neighbors"].append(item)
+    def _networks(block: Any) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        for nw in block.find("network"):
+            mm = re.match(rf"network\s+({_IP})\s+mask\s+({_IP})\b", nw.text, re.IGNORECASE)
+            if mm:
+                items.append({"prefix": mm.group(1), "mask": mm.group(2)})
+        return items
+
+    # Bloque global 'address-family ipv4' (el primero sin vrf) y VRFs 'address-family ipv4 vrf <NAME>'
+    global_seen = False
+    for af in idx.find("address-family ipv4"):
+        words = [w.lower() for w in af.words]
+        if "vrf" in words:
+            if len(words) < 4 or words[2] != "vrf":
+                continue
+            vrf: Dict[str, Any] = {"name": af.words[3], "router_id": "", "networks": _networks(af),
+                                   "neighbors": _neighbors(af), "config_text": af.body().strip()}
+            for rid_st in af.find("bgp router-id"):
+                rid2 = re.match(rf"({_IP})\b", rid_st.words[2]) if len(rid_st.words) > 2 else None
+                if rid2:
+                    vrf["router_id"] = rid2.group(1)
+                    break
+            table.add_config(vrf["neighbors"], vrf=vrf["name"])
+            result["vrfs"].append(vrf)
+        elif not global_seen:
+            global_seen = True
+            result["global"]["config_text"] = af.body().strip()
+            result["global"]["networks"] = _networks(af)
+            result["global"]["neighbors"] = _neighbors(af)
+            table.add_config(result["global"]["neighbors"])
+
+    # Vecinos en otros lugares (p. ej. directamente bajo 'router bgp'), con la VRF de su address-family
+    for nb in idx.find("neighbor"):
+        mm = _CISCO_NEIGHBOR.match(nb.text)
+        if mm:
+            table.merge(mm.group(1), _vrf_of(nb), remote_as=mm.group(2), configured=True)
 
+    result["neighbors"] = _config_neighbors(table)
     return result
 
 
 # ---------------- Cisco OSPF/BGP Operational Parsers -----------------
 
-def parse_cisco_ospf_neighbor(text: str) -> List[Dict[str, Any]]:
+_CISCO_OSPF_NEIGHBOR = TableParser(
+    {"Neighbor ID": "router_id", "Pri": "pri", "State": "state", "Dead Time": "dead_time",
+     "Address": "address", "Interface": "interface"},
+    required=("router_id", "state", "address"),
+    accept=lambda row: bool(_IP_RE.fullmatch(row["router_id"]) and _IP_RE.fullmatch(row["address"])
+                            and row.get("interface")),
+    # Formato típico: <RID> <Pri> <State> <Dead> <Address> <Interface>
+    fallback=(re.compile(
+        rf"^(?P<router_id>{_IP})\s+\d+\s+(?P<state>\S+)\s+(?P<dead_time>\S+)\s+(?P<address>{_IP})\s+(?P<interface>\S+)$"
+    ),),
+)
+
+
+# Claves (y orden) de cada vecino OSPF devuelto
+_OSPF_NEIGHBOR_FIELDS = dict.fromkeys(("router_id", "address", "state", "dead_time", "area", "interface"), "")
+
+
+@cached_parser
+def parse_cisco_ospf_neighbor(text: str) -> List[OspfNeighbor]:
     """Parsea 'show ip ospf neighbor' de Cisco.
 
     Devuelve una lista de dicts con: router_id, address, state, area (vacío), interface.
     """
-    peers: List[Dict[str, Any]] = []
-    for raw in text.splitlines():
-        line = raw.strip()
-        if not line or line.lower().startswith("neighbor id"):
-            continue
-        # Formato típico: <RID> <Pri> <State> <Dead> <Address> <Interface>
-        m = re.match(
-            r"^(?P<rid>\d{1,3}(?:\.\d{1,3}){3})\s+\d+\s+(?P<state>\S+)\s+(?P<dead>\S+)\s+(?P<addr>\d{1,3}(?:\.\d{1,3}){3})\s+(?P<intf>\S+)$",
-            line
-        )
-        if m:
-            peers.append({
-                "router_id": m.group("rid"),
-                "address": m.group("addr"),
-                "state": m.group("state"),
-                "dead_time": m.group("dead"),
-                "area": "",  # 'show ip ospf neighbor' no muestra área directamente
-                "interface": m.group("intf"),
-            })
+    peers: List[OspfNeighbor] = []
+    for row in _CISCO_OSPF_NEIGHBOR.rows(text):
+        row.pop("pri", None)
+        # 'area' queda vacío: 'show ip ospf neighbor' no muestra área directamente
+        peers.append(OspfNeighbor(**{**_OSPF_NEIGHBOR_FIELDS, **row}))
     return peers
 
 
-def parse_cisco_bgp_summary(text: str) -> List[Dict[str, Any]]:
+_BGP_NOT_ACTIVE = re.compile(r"BGP\s+not\s+active", re.IGNORECASE)
+
+_CISCO_BGP_SUMMARY = TableParser(
+    {"Neighbor": "ip", "V": "v", "AS": "as", "MsgRcvd": "msg_rcvd", "MsgSent": "msg_sent",
+     "TblVer": "tblver", "InQ": "inq", "OutQ": "outq", "Up/Down": "updown",
+     "State/PfxRcd": "statepfx", "State/PfxAcc": "statepfx"},
+    required=("ip", "v", "as", "updown"),
+    accept=lambda row: bool(_IP_RE.fullmatch(row["ip"])) and row["v"].isdigit(),
+    # Formato estándar IOS sin cabecera
+    fallback=(re.compile(
+        rf"^(?P<ip>{_IP})\s+"                    # Neighbor
+        r"(?P<v>\d+)\s+"                          # V
+        r"(?P<as>\d+)\s+"                         # AS
+        r"(?P<msg_rcvd>\d+)\s+"                   # MsgRcvd
+        r"(?P<msg_sent>\d+)\s+"                   # MsgSent
+        r"(?P<tblver>\S+)\s+"                     # TblVer (puede ser número o '-')
+        r"(?P<inq>\d+)\s+"                        # InQ
+        r"(?P<outq>\d+)\s+"                       # OutQ
+        r"(?P<updown>\S+)\s+"                     # Up/Down
+        r"(?P<statepfx>\S+)\s*$"                  # State/PfxRcd
+    ),),
+)
+
+
+# Claves (y orden) de cada peer BGP devuelto
+_BGP_PEER_FIELDS = dict.fromkeys(
+    ("ip", "v", "as", "msg_rcvd", "msg_sent", "tblver", "inq", "outq", "updown", "state", "pref_rcv"), "")
+
+
+def _bgp_peer(row: Dict[str, str]) -> BgpPeer:
+    # Una sola columna State/PfxRcd: un número indica sesión establecida
+    statepfx = row.pop("statepfx", None)
+    peer = BgpPeer(**{**_BGP_PEER_FIELDS, **row})
+    if statepfx is not None:
+        if statepfx.isdigit():
+            peer["state"], peer["pref_rcv"] = "Established", statepfx
+        else:
+            peer["state"] = statepfx
+    return peer
+
+
+@cached_parser
+def parse_cisco_bgp_summary(text: str) -> List[BgpPeer]:
     """Parsea 'show ip bgp summary' y devuelve lista de peers con columnas completas.
 
     Columnas: Neighbor, V, AS, MsgRcvd, MsgSent, TblVer, InQ, OutQ, Up/Down, State/PfxRcd.
     Mantiene compatibilidad con claves usadas previamente: ip, as, updown, state, pref_rcv.
     """
-    peers: List[Dict[str, Any]] = []
-    if re.search(r"BGP\s+not\s+active", text or "", re.IGNORECASE):
-        return peers
-    for raw in (text or "").splitlines():
-        line = raw.strip()
-        if not line:
-            continue
-        # Saltar encabezados
-        if re.match(r"(?i)^neighbor\b", line):
-            continue
-        # Formato estándar IOS
-        m = re.match(
-            r"^(?P<ip>\d{1,3}(?:\.\d{1,3}){3})\s+"  # Neighbor
-            r"(?P<v>\d+)\s+"                          # V
-            r"(?P<as>\d+)\s+"                         # AS
-            r"(?P<msg_rcvd>\d+)\s+"                   # MsgRcvd
-            r"(?P<msg_sent>\d+)\s+"                   # MsgSent
-            r"(?P<tblver>\S+)\s+"                     # TblVer (puede ser número o '-')
-            r"(?P<inq>\d+)\s+"                        # InQ
-            r"(?P<outq>\d+)\s+"                       # OutQ
-            r"(?P<updown>\S+)\s+"                     # Up/Down
-            r"(?P<statepfx>\S+)\s*$",                 # State/PfxRcd
-            line
-        )
-        if not m:
-            # Variantes: algunos IOS muestran espacios múltiples o caracteres especiales
-            continue
-        statepfx = m.group("statepfx")
-        state = statepfx
-        pref = ""
-        if re.match(r"^\d+$", statepfx):
-            pref = statepfx
-            state = "Established"
-        peers.append({
-            "ip": m.group("ip"),
-            "v": m.group("v"),
-            "as": m.group("as"),
-            "msg_rcvd": m.group("msg_rcvd"),
-            "msg_sent": m.group("msg_sent"),
-            "tblver": m.group("tblver"),
-            "inq": m.group("inq"),
-            "outq": m.group("outq"),
-            "updown": m.group("updown"),
-            "state": state,
-            "pref_rcv": pref,
-        })
-    return peers
+    if _BGP_NOT_ACTIVE.search(text or ""):
+        return []
+    return [_bgp_peer(row) for row in _CISCO_BGP_SUMMARY.rows(text)]
 
 
 # ---------------- Huawei OSPF/BGP Parsers -----------------
 
+@cached_parser
 def parse_huawei_ospf_config(text: str) -> Dict[str, Any]:
     """Parsea TODOS los procesos OSPF en una configuración Huawei (VRP).
 
@@ -692,8 +752,6 @@ def parse_huawei_ospf_config(text: str) -> Dict[str, Any]:
     - 'process_id', 'router_id', 'networks' con el primer proceso encontrado
     - 'processes': lista con todos los procesos detectados
     """
-    import re
-
     out: Dict[str, Any] = {
         "process_id": "",
         "router_id": "",
@@ -701,31 +759,35 @@ def parse_huawei_ospf_config(text: str) -> Dict[str, Any]:
         "processes": [],
     }
 
-    # Bloques 'ospf <pid>' hasta el siguiente 'ospf <pid>' o fin
-    for m in re.finditer(r"(?mi)^\s*ospf\s+(\d+)\b([\s\S]*?)(?=^\s*ospf\s+\d+\b|\Z)", text):
-        pid = m.group(1)
-        blk = m.group(2) or ""
+    # Bloques 'ospf <pid>' (la cabecera puede llevar 'router-id') y sus áreas
+    for stanza in build_index(text).find("ospf"):
+        pid_m = re.match(r"(\d+)\b", stanza.words[1]) if len(stanza.words) > 1 else None
+        if not pid_m:
+            continue
         proc: Dict[str, Any] = {
-            "process_id": pid,
+            "process_id": pid_m.group(1),
             "router_id": "",
             "networks": [],
         }
 
-        # router-id dentro del bloque
-        rid = re.search(r"(?mi)router[- ]id\s+(\d{1,3}(?:\.\d{1,3}){3})", blk)
+        # router-id en la cabecera o dentro del bloque
+        rid = re.search(rf"(?i)router[- ]id\s+({_IP})", stanza.text) or re.search(rf"(?mi)router[- ]id\s+({_IP})", stanza.body())
         if rid:
             proc["router_id"] = rid.group(1)
 
         # Áreas y sus redes
-        for am in re.finditer(r"(?mi)^\s*area\s+([\d\.]+)\b([\s\S]*?)(?=^\s*area\s+[\d\.]+\b|\Z)", blk):
-            area_id = am.group(1)
-            body = am.group(2) or ""
-            for nm in re.finditer(r"(?mi)^\s*network\s+(\d{1,3}(?:\.\d{1,3}){3})\s+(\d{1,3}(?:\.\d{1,3}){3})\b", body):
-                proc["networks"].append({
-                    "network": nm.group(1),
-                    "wildcard": nm.group(2),
-                    "area": area_id,
-                })
+        for area in stanza.find("area"):
+            am = re.match(r"([\d\.]+)\b", area.words[1]) if len(area.words) > 1 else None
+            if not am:
+                continue
+            for nw in area.find("network"):
+                nm = re.match(rf"network\s+({_IP})\s+({_IP})\b", nw.text, re.IGNORECASE)
+                if nm:
+                    proc["networks"].append(OspfNetwork(
+                        network=nm.group(1),
+                        wildcard=nm.group(2),
+                        area=am.group(1),
+                    ))
 
         out["processes"].append(proc)
 
@@ -743,11 +805,11 @@ def parse_huawei_ospf_config(text: str) -> Dict[str, Any]:
                 area_id = am.group(1)
                 body = am.group(2) or ""
                 for nm in re.finditer(r"network\s+(\d{1,3}(?:\.\d{1,3}){3})\s+(\d{1,3}(?:\.\d{1,3}){3})", body, re.IGNORECASE):
-                    proc["networks"].append({
-                        "network": nm.group(1),
-                        "wildcard": nm.group(2),
-                        "area": area_id,
-                    })
+                    proc["networks"].append(OspfNetwork(
+                        network=nm.group(1),
+                        wildcard=nm.group(2),
+                        area=area_id,
+                    ))
             out["processes"].append(proc)
 
     # Poblar claves planas con el primer proceso para UI antigua
@@ -759,6 +821,7 @@ def parse_huawei_ospf_config(text: str) -> Dict[str, Any]:
     return out
 
 
+@cached_parser
 def parse_huawei_bgp_config(text: str) -> Dict[str, Any]:
     """Parsea BGP VRP: AS, vecinos, global y VRFs.
 
@@ -768,7 +831,6 @@ def parse_huawei_bgp_config(text: str) -> Dict[str, Any]:
     - global: {networks: [...], imports: [...], neighbors: [...], config_text: str}
     - vrfs: [{name, networks: [...], imports: [...], neighbors: [...], config_text: str}]
     """
-    import re
     result: Dict[str, Any] = {
         "as_number": "",
         "router_id": "",
@@ -776,142 +838,163 @@ def parse_huawei_bgp_config(text: str) -> Dict[str, Any]:
         "global": {"networks": [], "imports": [], "neighbors": [], "config_text": ""},
         "vrfs": [],
     }
+    idx = build_index(text)
+    table = BgpNeighborTable()
 
-    m = re.search(r"(?mi)^\s*bgp\s+(\d+)\b", text)
-    if m:
-        result["as_number"] = m.group(1)
-    rid = re.search(r"(?mi)^\s*bgp\s+router-id\s+(\d{1,3}(?:\.\d{1,3}){3})\b", text)
-    if rid:
-        result["router_id"] = rid.group(1)
+    for stanza in idx.find("bgp"):
+        m = re.match(r"(\d+)\b", stanza.words[1]) if len(stanza.words) > 1 else None
+        if m:
+            result["as_number"] = m.group(1)
+            break
+    for stanza in idx.find("bgp router-id"):
+        rid = re.match(rf"({_IP})\b", stanza.words[2]) if len(stanza.words) > 2 else None
+        if rid:
+            result["router_id"] = rid.group(1)
+            break
+
+    def _peers(block: Any) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        for pr in block.find("peer"):
+            mm = _HUAWEI_PEER.match(pr.text)
+            if mm:
+                items.append({"ip": mm.group(1), "remote_as": mm.group(2)})
+        return items
+
+    def _networks(block: Any) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        for nw in block.find("network"):
+            mm = re.match(rf"network\s+({_IP})\s+({_IP})\b", nw.text, re.IGNORECASE)
+            if mm:
+                items.append({"prefix": mm.group(1), "mask": mm.group(2)})
+        return items
+
+    def _imports(block: Any, with_redistribute: bool) -> List[Dict[str, Any]]:
+        # 'import-route ospf 1' y, en VRFs, 'redistribute static' (en orden del texto)
+        items: List[Dict[str, Any]] = []
+        found = block.find("import-route") + (block.find("redistribute") if with_redistribute else [])
+        for st in sorted(found, key=lambda x: x.line):
+            if st.words[0].lower() == "redistribute":
+                if len(st.words) > 1:
+                    items.append({"protocol": st.words[1], "process": ""})
+                continue
+            im = re.match(r"import-route\s+(\S+)(?:\s+(\d+))?", st.text, re.IGNORECASE)
+            if im:
+                items.append({"protocol": im.group(1), "process": im.group(2) or ""})
+        return items
 
     # Bloque global 'ipv4-family unicast'
-    gblk_m = re.search(r"(?mis)^\s*ipv4-family\s+unicast\b([\s\S]*?)(?=^\s*ipv4-family\b|\Z)", text)
-    if gblk_m:
-        gblk = gblk_m.group(1)
-        result["global"]["config_text"] = gblk.strip()
-        for nm in re.finditer(r"(?mi)^\s*network\s+(\d{1,3}(?:\.\d{1,3}){3})\s+(\d{1,3}(?:\.\d{1,3}){3})\b", gblk):
-            result["global"]["networks"].append({"prefix": nm.group(1), "mask": nm.group(2)})
-        for im in re.finditer(r"(?mi)^\s*import-route\s+(\S+)(?:\s+(\d+))?", gblk):
-            proto = im.group(1)
-            pid = im.group(2) or ""
-            result["global"]["imports"].append({"protocol": proto, "process": pid})
-        for nb in re.finditer(r"(?mi)^\s*peer\s+(\d{1,3}(?:\.\d{1,3}){3})\s+as-number\s+(\d+)\b", gblk):
-            item = {"ip": nb.group(1), "remote_as": nb.group(2)}
-            result["global"]["neighbors"].append(item)
-            result["neighbors"].append(item)
+    gblk = idx.first("ipv4-family unicast")
+    if gblk is not None:
+        result["global"]["config_text"] = gblk.body().strip()
+        result["global"]["networks"] = _networks(gblk)
+        result["global"]["imports"] = _imports(gblk, False)
+        result["global"]["neighbors"] = _peers(gblk)
+        table.add_config(result["global"]["neighbors"])
 
     # VRFs: 'ipv4-family vpnv4 vpn-instance <NAME>'
-    for mvrf in re.finditer(r"(?mis)^\s*ipv4-family\s+vpnv4\s+vpn-instance\s+(\S+)\b([\s\S]*?)(?=^\s*ipv4-family\b|\Z)", text):
-        name = mvrf.group(1)
-        body = mvrf.group(2)
-        vrf: Dict[str, Any] = {"name": name, "networks": [], "imports": [], "neighbors": [], "config_text": body.strip()}
-        for nm in re.finditer(r"(?mi)^\s*network\s+(\d{1,3}(?:\.\d{1,3}){3})\s+(\d{1,3}(?:\.\d{1,3}){3})\b", body):
-            vrf["networks"].append({"prefix": nm.group(1), "mask": nm.group(2)})
-        for im in re.finditer(r"(?mi)^\s*redistribute\s+(\S+)|^\s*import-route\s+(\S+)(?:\s+(\d+))?", body):
-            # Captura 'redistribute static' y 'import-route ospf 1'
-            if im.group(1):
-                vrf["imports"].append({"protocol": im.group(1), "process": ""})
-            else:
-                proto = im.group(2)
-                pid = im.group(3) or ""
-                vrf["imports"].append({"protocol": proto, "process": pid})
-        for nb in re.finditer(r"(?mi)^\s*peer\s+(\d{1,3}(?:\.\d{1,3}){3})\s+as-number\s+(\d+)\b", body):
-            item = {"ip": nb.group(1), "remote_as": nb.group(2)}
-            vrf["neighbors"].append(item)
-            result["neighbors"].append(item)
+    for fam in idx.find("ipv4-family vpnv4 vpn-instance"):
+        if len(fam.words) < 4:
+            continue
+        vrf: Dict[str, Any] = {"name": fam.words[3], "networks": _networks(fam), "imports": _imports(fam, True),
+                               "neighbors": _peers(fam), "config_text": fam.body().strip()}
+        table.add_config(vrf["neighbors"], vrf=vrf["name"])
         result["vrfs"].append(vrf)
 
-    # Vecinos definidos fuera de bloques (fallback)
-    for nm in re.finditer(r"(?mi)^\s*peer\s+(\d{1,3}(?:\.\d{1,3}){3})\s+as-number\s+(\d+)\b", text):
-        item = {"ip": nm.group(1), "remote_as": nm.group(2)}
-        if item not in result["neighbors"]:
-            result["neighbors"].append(item)
+    # Vecinos definidos fuera de bloques (p. ej. 'peer X as-number' bajo 'bgp'), con la VRF de su familia
+    for pr in idx.find("peer"):
+        mm = _HUAWEI_PEER.match(pr.text)
+        if mm:
+            table.merge(mm.group(1), _vrf_of(pr), remote_as=mm.group(2), configured=True)
+
+    result["neighbors"] = _config_neighbors(table)
     return result
 
 
-def parse_huawei_bgp_peer(text: str) -> List[Dict[str, Any]]:
+_HUAWEI_BGP_PEER = TableParser(
+    {"Peer": "ip", "Neighbor": "ip", "V": "v", "AS": "as", "MsgRcvd": "msg_rcvd", "MsgSent": "msg_sent",
+     "TblVer": "tblver", "InQ": "inq", "OutQ": "outq", "Up/Down": "updown",
+     "State/PfxRcd": "statepfx", "State": "state", "PrefRcv": "pref_rcv"},
+    required=("ip", "v", "as", "updown"),
+    accept=lambda row: bool(_IP_RE.fullmatch(row["ip"])) and row["v"].isdigit(),
+    fallback=(
+        # Variante completa con TblVer/InQ/OutQ
+        re.compile(
+            rf"^(?P<ip>{_IP})\s+"                 # Neighbor
+            r"(?P<v>\d+)\s+"                       # V
+            r"(?P<as>\d+)\s+"                      # AS
+            r"(?P<msg_rcvd>\d+)\s+"                # MsgRcvd
+            r"(?P<msg_sent>\d+)\s+"                # MsgSent
+            r"(?P<tblver>\d+)\s+"                  # TblVer
+            r"(?P<inq>\d+)\s+"                     # InQ
+            r"(?P<outq>\d+)\s+"                    # OutQ
+            r"(?P<updown>\S+)\s+"                  # Up/Down
+            r"(?P<statepfx>\S+)\s*$"               # State/PfxRcd
+        ),
+        # Variante sin TblVer/InQ/OutQ (común en algunos VRP)
+        re.compile(
+            rf"^(?P<ip>{_IP})\s+"                 # Neighbor
+            r"(?P<v>\d+)\s+"                       # V
+            r"(?P<as>\d+)\s+"                      # AS
+            r"(?P<msg_rcvd>\d+)\s+"                # MsgRcvd
+            r"(?P<msg_sent>\d+)\s+"                # MsgSent
+            r"(?P<updown>\S+)\s+"                  # Up/Down
+            r"(?P<statepfx>\S+)\s*$"               # State/PfxRcd
+        ),
+    ),
+)
+
+
+@cached_parser
+def parse_huawei_bgp_peer(text: str) -> List[BgpPeer]:
     """Parsea 'display bgp peer' de Huawei.
 
-    Intenta capturar las columnas estándar: Neighbor, V, AS, MsgRcvd, MsgSent,
-    TblVer, InQ, OutQ, Up/Down, State/PfxRcd. En plataformas que no muestran
-    TblVer/InQ/OutQ, esas columnas se devuelven vacías.
+    Columnas según la cabecera: Peer, V, AS, MsgRcvd, MsgSent, [TblVer, InQ,]
+    OutQ, Up/Down, State y PrefRcv (o una sola columna State/PfxRcd). Las
+    columnas que la plataforma no muestra se devuelven vacías.
     """
-    import re
-    peers: List[Dict[str, Any]] = []
-    for raw in (text or "").splitlines():
-        line = raw.strip()
-        if not line:
-            continue
-        # Saltar encabezados
-        if re.match(r"(?i)^peer\b|^neighbor\b", line):
-            continue
-        # Variante completa con TblVer/InQ/OutQ
-        m = re.match(
-            r"^(?P<ip>\d{1,3}(?:\.\d{1,3}){3})\s+"     # Neighbor
-            r"(?P<v>\d+)\s+"                             # V
-            r"(?P<as>\d+)\s+"                            # AS
-            r"(?P<msg_rcvd>\d+)\s+"                      # MsgRcvd
-            r"(?P<msg_sent>\d+)\s+"                      # MsgSent
-            r"(?P<tblver>\d+)\s+"                        # TblVer
-            r"(?P<inq>\d+)\s+"                           # InQ
-            r"(?P<outq>\d+)\s+"                          # OutQ
-            r"(?P<updown>\S+)\s+"                        # Up/Down
-            r"(?P<statepfx>\S+)\s*$",                    # State/PfxRcd
-            line
-        )
-        if not m:
-            # Variante sin TblVer/InQ/OutQ (común en algunos VRP)
-            m = re.match(
-                r"^(?P<ip>\d{1,3}(?:\.\d{1,3}){3})\s+"   # Neighbor
-                r"(?P<v>\d+)\s+"                           # V
-                r"(?P<as>\d+)\s+"                          # AS
-                r"(?P<msg_rcvd>\d+)\s+"                    # MsgRcvd
-                r"(?P<msg_sent>\d+)\s+"                    # MsgSent
-                r"(?P<updown>\S+)\s+"                      # Up/Down
-                r"(?P<statepfx>\S+)\s*$",                  # State/PfxRcd
-                line
-            )
-        if not m:
-            continue
-        statepfx = m.group("statepfx")
-        state = statepfx
-        pref = ""
-        if re.match(r"^\d+$", statepfx):
-            pref = statepfx
-            state = "Established"
-        peers.append({
-            "ip": m.group("ip"),
-            "v": m.groupdict().get("v", ""),
-            "as": m.group("as"),
-            "msg_rcvd": m.groupdict().get("msg_rcvd", ""),
-            "msg_sent": m.groupdict().get("msg_sent", ""),
-            "tblver": m.groupdict().get("tblver", ""),
-            "inq": m.groupdict().get("inq", ""),
-            "outq": m.groupdict().get("outq", ""),
-            "updown": m.group("updown"),
-            "state": state,
-            "pref_rcv": pref,
-        })
-    return peers
-
-
-def parse_huawei_ospf_peer(text: str) -> List[Dict[str, Any]]:
-    import re
-    peers: List[Dict[str, Any]] = []
+    return [_bgp_peer(row) for row in _HUAWEI_BGP_PEER.rows(text)]
+
+
+# 'display ospf peer brief': tabla Area Id / Interface / Neighbor id / State
+_HUAWEI_OSPF_PEER_BRIEF = TableParser(
+    {"Area Id": "area", "Interface": "interface", "Neighbor id": "router_id", "State": "state"},
+    required=("area", "router_id", "state"),
+    accept=lambda row: bool(_IP_RE.fullmatch(row["router_id"])),
+)
+# 'display ospf peer' (detalle): bloques por interfaz y por vecino
+_HW_OSPF_PREFIX = re.compile(r"^\[[^\]]+\]\s*")
+_HW_OSPF_AREA = re.compile(rf"Area\s+([\d\.]+)\s+interface\s+({_IP})\s*\(([^\)]+)\)'s neighbors", re.IGNORECASE)
+_HW_OSPF_NEIGHBOR = re.compile(rf"Router ID:\s+({_IP})\s+Address:\s+({_IP})", re.IGNORECASE)
+_HW_OSPF_STATE = re.compile(r"State:\s*([A-Za-z]+)", re.IGNORECASE)
+_HW_OSPF_DEAD = re.compile(r"Dead\s+timer\s+due\s+in\s+(\d+)\s+sec", re.IGNORECASE)
+
+
+@cached_parser
+def parse_huawei_ospf_peer(text: str) -> List[OspfNeighbor]:
+    peers: List[OspfNeighbor] = [OspfNeighbor(
+        router_id=row["router_id"],
+        address="",
+        state=row["state"],
+        dead_time="",
+        area=row["area"],
+        interface=row.get("interface", ""),
+    ) for row in _HUAWEI_OSPF_PEER_BRIEF.rows(text)]
     current_area = ""
     current_iface_ip = ""
     current_iface_name = ""
-    last_peer: Dict[str, Any] | None = None
+    last_peer: OspfNeighbor | None = None
 
+    # Cada expresión solo se evalúa si la línea contiene su palabra clave
     for line in text.splitlines():
         la = line.strip()
-        # Eliminar prefijos como "[Telnet3]" si existen
-        s = re.sub(r"^\[[^\]]+\]\s*", "", la)
         if not la:
             continue
+        # Eliminar prefijos como "[Telnet3]" si existen
+        s = _HW_OSPF_PREFIX.sub("", la) if la[0] == "[" else la
+        low = s.lower()
 
         # Ejemplo: "Area 0.0.0.0 interface 10.10.10.2 (Eth1/0/1)'s neighbors"
-        am = re.search(r"Area\s+([\d\.]+)\s+interface\s+(\d{1,3}(?:\.\d{1,3}){3})\s*\(([^\)]+)\)'s neighbors", s, re.IGNORECASE)
+        am = _HW_OSPF_AREA.search(s) if "'s neighbors" in low else None
         if am:
             current_area = am.group(1)
             current_iface_ip = am.group(2)
@@ -920,29 +1003,32 @@ def parse_huawei_ospf_peer(text: str) -> List[Dict[str, Any]]:
             continue
 
         # Inicio de bloque de vecino
-        nm = re.search(r"Router ID:\s+(\d{1,3}(?:\.\d{1,3}){3})\s+Address:\s+(\d{1,3}(?:\.\d{1,3}){3})", s, re.IGNORECASE)
+        nm = _HW_OSPF_NEIGHBOR.search(s) if "router id:" in low else None
         if nm:
-            last_peer = {
-                "router_id": nm.group(1),
-                "address": nm.group(2),
-                "state": "",
-                "dead_time": "",
-                "area": current_area,
+            last_peer = OspfNeighbor(
+                router_id=nm.group(1),
+                address=nm.group(2),
+                state="",
+                dead_time="",
+                area=current_area,
                 # Priorizar nombre de interfaz si está disponible; si no, usar IP
-                "interface": current_iface_name or current_iface_ip,
-            }
+                interface=current_iface_name or current_iface_ip,
+            )
             peers.append(last_peer)
             continue
 
+        if last_peer is None:
+            continue
+
         # Línea de estado (suele venir inmediatamente después)
-        sm = re.search(r"State:\s*([A-Za-z]+)", s, re.IGNORECASE)
-        if sm and last_peer is not None:
+        sm = _HW_OSPF_STATE.search(s) if "state:" in low else None
+        if sm:
             last_peer["state"] = sm.group(1)
             continue
 
         # Línea de dead timer
-        dm = re.search(r"Dead\s+timer\s+due\s+in\s+(\d+)\s+sec", s, re.IGNORECASE)
-        if dm and last_peer is not None:
+        dm = _HW_OSPF_DEAD.search(s) if "dead" in low else None
+        if dm:
             last_peer["dead_time"] = f"{dm.group(1)} sec"
             continue
 
@@ -951,6 +1037,7 @@ def parse_huawei_ospf_peer(text: str) -> List[Dict[str, Any]]:
 
 # ---------------- Juniper Parsers -----------------
 
+@cached_parser
 def parse_juniper_interfaces_terse(text: str) -> List[Dict[str, Any]]:
     interfaces: List[Dict[str, Any]] = []
     for line in text.splitlines():
@@ -966,6 +1053,7 @@ def parse_juniper_interfaces_terse(text: str) -> List[Dict[str, Any]]:
     return interfaces
 
 
+@cached_parser
 def parse_juniper_version(text: str) -> Dict[str, Any]:
     info: Dict[str, Any] = {"vendor": "Juniper"}
     m = re.search(r"JUNOS\s+([\w\.-]+)", text)
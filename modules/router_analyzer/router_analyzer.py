@@ -1,14 +1,23 @@
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Callable, Optional
 from .analyzer_core import analyze, fetch_running_config as _fetch_running_config
 from .connections import (
+    abort_session,
+    cancel_requested,
     ping_host,
     check_serial_port,
     quick_tcp_check,
+    probe_ssh_banner,
     detect_vendor_ssh,
     detect_vendor_telnet,
     detect_vendor_serial,
 )
-from .vendor_commands import DISABLE_PAGING, VERSION_COMMAND, INTERFACES_BRIEF, RUNNING_CONFIG, INTERFACE_CONFIG_SECTION
+from .bgp_table import BgpNeighborTable
+from .config_filters import apply_config_filter
+from .fingerprint_cache import apply_fingerprint
+from .timings import current_timings, start_timings, timed_parse, timing_span, timings_snapshot
+from .transcripts import prepare_replay, replaying
+from .vendor_commands import DISABLE_PAGING, VERSION_COMMAND, INTERFACES_BRIEF, RUNNING_CONFIG, INTERFACE_CONFIG_SECTION, command_spec
 from .parsers import (
     parse_huawei_version,
     parse_huawei_ip_interface_brief,
@@ -28,12 +37,14 @@ from .parsers import (
 from .connections import run_telnet_command, run_ssh_command, run_serial_command
 
 
-def run_analysis(connection_data: Dict[str, Any]) -> Dict[str, Any]:
+def run_analysis(connection_data: Dict[str, Any],
+                 on_result: Optional[Callable[[str, str, str, float], None]] = None,
+                 on_parsed: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
     """
     Fachada simple para la GUI.
     Uso: from modules.router_analyzer.router_analyzer import run_analysis
     """
-    return analyze(connection_data)
+    return analyze(connection_data, on_result=on_result, on_parsed=on_parsed)
 
 
 def fetch_running_config(connection_data: Dict[str, Any]) -> str:
@@ -46,8 +57,10 @@ class RouterAnalyzer:
 
     Métodos:
     - connect() -> bool
-    - analyze_router() -> Dict[str, Any]
+    - analyze_router(on_result=None, on_parsed=None) -> Dict[str, Any]
     - parse_analysis_data(analysis_data) -> Dict[str, Any]
+    - resolve_vendor() -> str
+    - cancel() (desde otro hilo) y ``cancelled``
     """
 
     def __init__(self, connection_data: Dict[str, Any]):
@@ -58,6 +71,19 @@ class RouterAnalyzer:
         self.vendor: str = "desconocido"
         self.last_check_details: List[str] = []
 
+    def cancel(self) -> None:
+        """Cancela el análisis en curso desde otro hilo (p.ej. la GUI).
+
+        Corta la lectura pendiente (ver ``abort_session``): ``connect`` y
+        ``analyze_router`` vuelven en cuanto termina, con lo recibido hasta ahí.
+        """
+        self.connection_data.setdefault("cancel_event", threading.Event()).set()
+        abort_session(self.connection_data, self.protocol)
+
+    @property
+    def cancelled(self) -> bool:
+        return cancel_requested(self.connection_data)
+
     def connect(self) -> bool:
         """Conectar y detectar vendor al inicio.
 
@@ -66,22 +92,33 @@ class RouterAnalyzer:
         - Si la conectividad es correcta, detectar inmediatamente el fabricante
           y guardar la pista en `connection_data['vendor_hint']` para acelerar
           las siguientes operaciones.
+        - Reproducción (``replay_transcript``): sin red ni puerto; la sesión
+          grabada sustituye al equipo (ver ``transcripts``).
+
+        Inicia el registro de tiempos del análisis (ver ``timings``).
         """
+        start_timings(self.connection_data)
         try:
             verbose = bool(self.connection_data.get("verbose"))
             fast = bool(self.connection_data.get("fast_mode"))
+            replay = replaying(self.connection_data)
             if self.protocol == "Serial":
                 port = self.connection_data.get("port", "")
                 baudrate = int(self.connection_data.get("baudrate", 9600) or 9600)
                 if verbose:
                     print(f"[CLI] Abriendo puerto serial {port} @ {baudrate}…", flush=True)
-                ok = check_serial_port(port, baudrate=baudrate, timeout=1.0, verbose=verbose, fast=fast)
+                with timing_span(self.connection_data, "serial_open", "connect", port=port):
+                    ok = prepare_replay(self.connection_data) if replay else check_serial_port(
+                        port, baudrate=baudrate, timeout=1.0, verbose=verbose, fast=fast, connection_data=self.connection_data)
                 self.is_connected = bool(ok)
                 if verbose:
                     print(f"[CLI] Serial {'OK' if self.is_connected else 'ERROR'}", flush=True)
                 # Detectar vendor inmediatamente si hay conectividad
                 if self.is_connected:
-                    ven = detect_vendor_serial(self.connection_data)
+                    # Huella vigente en caché: omitir la detección
+                    with timing_span(self.connection_data, "vendor_detect", "connect") as span:
+                        ven = apply_fingerprint(self.connection_data) or detect_vendor_serial(self.connection_data)
+                        span["vendor"] = ven
                     self.vendor = (ven or "desconocido").lower()
                     self.connection_data["vendor_hint"] = self.vendor
                     if verbose:
@@ -103,25 +140,46 @@ class RouterAnalyzer:
                     print(f"[CLI] Verificando conectividad hacia {host}:{port_for_check} ({self.protocol})…", flush=True)
                 else:
                     print(f"[CLI] Verificando conectividad hacia {host} ({self.protocol})…", flush=True)
-            if use_quick_tcp and host:
-                ok = quick_tcp_check(host, port_for_check, timeout_s=(0.7 if fast else 1.0))
+            if replay:
+                with timing_span(self.connection_data, "replay_open", "connect"):
+                    self.is_connected = prepare_replay(self.connection_data)
+                if verbose:
+                    print(f"[CLI] Reproducción {'OK' if self.is_connected else 'ERROR'}", flush=True)
+            elif use_quick_tcp and host and self.protocol == "SSH2":
+                # El chequeo TCP captura también el banner SSH (pista de fabricante)
+                with timing_span(self.connection_data, "tcp_check", "connect", host=host, port=port_for_check):
+                    banner = probe_ssh_banner(host, port_for_check, timeout_s=(0.7 if fast else 1.0))
+                self.is_connected = banner is not None
+                if banner is not None:
+                    self.connection_data["ssh_banner"] = banner
+                if verbose:
+                    print(f"[CLI] TCP {'OK' if self.is_connected else 'ERROR'}", flush=True)
+            elif use_quick_tcp and host:
+                with timing_span(self.connection_data, "tcp_check", "connect", host=host, port=port_for_check):
+                    ok = quick_tcp_check(host, port_for_check, timeout_s=(0.7 if fast else 1.0))
                 self.is_connected = bool(ok)
                 if verbose:
                     print(f"[CLI] TCP {'OK' if self.is_connected else 'ERROR'}", flush=True)
             else:
-                ok = ping_host(host, count=(1 if fast else 2), timeout_ms=(700 if fast else 1000)) if host else False
+                with timing_span(self.connection_data, "ping", "connect", host=host):
+                    ok = ping_host(host, count=(1 if fast else 2), timeout_ms=(700 if fast else 1000)) if host else False
                 self.is_connected = bool(ok)
                 if verbose:
                     print(f"[CLI] Ping {'OK' if self.is_connected else 'ERROR'}", flush=True)
 
             # Detectar vendor inmediatamente si hay conectividad
             if self.is_connected:
-                if self.protocol == "SSH2":
-                    ven = detect_vendor_ssh(self.connection_data)
-                elif self.protocol == "Telnet":
-                    ven = detect_vendor_telnet(self.connection_data)
-                else:
-                    ven = "desconocido"
+                with timing_span(self.connection_data, "vendor_detect", "connect") as span:
+                    # Huella vigente en caché: omitir la detección
+                    ven = apply_fingerprint(self.connection_data)
+                    if not ven and self.protocol == "SSH2":
+                        # Solo banner: si es ambiguo, el prompt del primer lote decide
+                        ven = detect_vendor_ssh(self.connection_data, open_session=False)
+                    elif not ven and self.protocol == "Telnet":
+                        ven = detect_vendor_telnet(self.connection_data)
+                    elif not ven:
+                        ven = "desconocido"
+                    span["vendor"] = ven
                 self.vendor = (ven or "desconocido").lower()
                 self.connection_data["vendor_hint"] = self.vendor
                 if verbose:
@@ -131,15 +189,41 @@ class RouterAnalyzer:
             self.is_connected = False
             return False
 
-    def analyze_router(self) -> Dict[str, Any]:
-        """Ejecuta análisis modular y devuelve estructura compatible con la GUI actual."""
+    def resolve_vendor(self) -> str:
+        """Fabricante con detección completa, antes del primer lote.
+
+        ``connect()`` por SSH solo mira el banner y deja un banner ambiguo
+        para el prompt del primer lote. Quien necesita el fabricante antes
+        (p.ej. los límites por fabricante de ``fleet``) lo resuelve aquí con
+        el prompt de la sesión agrupada, la misma que usará el análisis.
+        """
+        if not self.is_connected or self.protocol != "SSH2" or self.vendor in ("huawei", "cisco", "juniper"):
+            return self.vendor
+        with timing_span(self.connection_data, "vendor_detect", "connect") as span:
+            ven = detect_vendor_ssh(self.connection_data, open_session=True)
+            span["vendor"] = ven
+        self.vendor = (ven or "desconocido").lower()
+        self.connection_data["vendor_hint"] = self.vendor
+        return self.vendor
+
+    def analyze_router(self, on_result: Optional[Callable[[str, str, str, float], None]] = None,
+                       on_parsed: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """Ejecuta análisis modular y devuelve estructura compatible con la GUI actual.
+
+        ``on_result``/``on_parsed`` reciben el progreso real del lote (ver ``analyze``).
+        El resultado incluye ``timings``: tramos de conexión, sesión, comandos y
+        parsers medidos desde ``connect()`` (``parse_analysis_data`` los amplía).
+        """
         from datetime import datetime
         verbose = bool(self.connection_data.get("verbose"))
+        if current_timings(self.connection_data) is None:
+            start_timings(self.connection_data)
 
         target = self.connection_data.get("hostname") if self.protocol != "Serial" else self.connection_data.get("port")
         if verbose:
             print(f"[CLI] Analizando router en {target} via {self.protocol}…", flush=True)
-        result = analyze(self.connection_data)
+        with timing_span(self.connection_data, "analyze", "phase"):
+            result = analyze(self.connection_data, on_result=on_result, on_parsed=on_parsed)
         if verbose:
             print("[CLI] Análisis terminado, compilando resumen…", flush=True)
         vendor = (result.get("raw", {}).get("vendor") or "desconocido").lower()
@@ -159,12 +243,13 @@ class RouterAnalyzer:
         raw_running_present = bool(result.get("raw", {}).get("running_config"))
 
         # Si el análisis rápido no trajo running-config, obtenerla ahora de forma robusta
-        if (not raw_running_present):
+        if not raw_running_present and not self.cancelled:
             try:
                 if verbose:
                     print("[CLI] Running-config no presente; intentando obtenerla ahora…", flush=True)
                 # Esto deshabilita paginación si es necesario y usa el comando correcto por vendor
-                fetched_cfg = _fetch_running_config(self.connection_data)
+                with timing_span(self.connection_data, "fetch_running_config", "phase"):
+                    fetched_cfg = _fetch_running_config(self.connection_data)
                 if fetched_cfg and fetched_cfg.strip():
                     # Insertar en estructura cruda para que la GUI la reciba
                     result.setdefault("raw", {})["running_config"] = fetched_cfg
@@ -186,7 +271,16 @@ class RouterAnalyzer:
         try:
             if ven_key == "cisco":
                 sec_cmd = INTERFACE_CONFIG_SECTION.get("cisco", "")
-                if sec_cmd:
+                sec_spec = command_spec(sec_cmd) if sec_cmd else None
+                local_raw = None
+                if sec_spec is not None and raw_running_present and self.connection_data.get("local_sections", True):
+                    # Extraer la sección de la configuración ya descargada (sin regenerarla en el equipo)
+                    with timing_span(self.connection_data, "derive interface_section", "local"):
+                        local_raw = apply_config_filter(result.get("raw", {}).get("running_config", ""), sec_spec.pipe_filter)
+                if local_raw is not None:
+                    if local_raw.strip():
+                        result.setdefault("raw", {})["interface_config_section"] = local_raw
+                elif sec_cmd and not self.cancelled:
                     conn_fast = dict(self.connection_data)
                     conn_fast["fast_mode"] = True
                     conn_fast["vendor_hint"] = "cisco"
@@ -261,6 +355,7 @@ class RouterAnalyzer:
             # Campos esperados por el dashboard
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "hostname": self.connection_data.get("hostname", "N/A"),
+            "timings": timings_snapshot(self.connection_data),
         }
 
     def get_running_config(self) -> str:
@@ -268,13 +363,19 @@ class RouterAnalyzer:
         return _fetch_running_config(self.connection_data)
 
     def parse_analysis_data(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Parsea los datos del análisis en la misma estructura que la GUI espera."""
+        """Parsea los datos del análisis en la misma estructura que la GUI espera.
+
+        Los tiempos de cada parser se añaden a ``analysis_data['timings']``.
+        """
         interfaces: List[Dict[str, Any]] = []
         device_info: Dict[str, Any] = {}
         routing_protocols: Dict[str, Any] = {
             "ospf": {"enabled": False, "config": "", "process_id": "", "networks": []},
-            "bgp": {"enabled": False, "config": "", "as_number": "", "neighbors": []},
+            "bgp": {"enabled": False, "config": "", "as_number": "", "neighbors": [],
+                    "neighbors_by_vrf": {}, "neighbors_by_as": {}},
         }
+        # Vecinos BGP (configuración + resúmenes) fusionados por (vrf, ip)
+        bgp_table = BgpNeighborTable()
         # Detalles adicionales para ventanas de módulos
         ospf_neighbors: List[Dict[str, Any]] = []
         bgp_peers: List[Dict[str, Any]] = []
@@ -292,21 +393,21 @@ class RouterAnalyzer:
             if vendor == "huawei":
                 h_ver = data.get("huawei_version", "")
                 if h_ver:
-                    device_info = parse_huawei_version(h_ver)
+                    device_info = timed_parse(self.connection_data, parse_huawei_version, h_ver)
                 h_text = data.get("huawei_ip_int_brief", "")
                 if h_text:
-                    interfaces = parse_huawei_ip_interface_brief(h_text)
+                    interfaces = timed_parse(self.connection_data, parse_huawei_ip_interface_brief, h_text)
                 running_cfg = data.get("huawei_running_config", "")
                 # Rutas estáticas Huawei (sin distancia)
                 from .parsers import parse_huawei_static_routes
                 h_static = data.get("huawei_static_routes", "")
                 if h_static:
-                    static_routes = parse_huawei_static_routes(h_static)
+                    static_routes = timed_parse(self.connection_data, parse_huawei_static_routes, h_static)
                 # OSPF/BGP: si están presentes, parsearlos
                 # Huawei: intentar parsear OSPF/BGP primero desde claves dedicadas, si no, caer al running-config
                 ospf_cfg = data.get("huawei_ospf_config", "") or running_cfg
                 if ospf_cfg:
-                    parsed_ospf = parse_huawei_ospf_config(ospf_cfg)
+                    parsed_ospf = timed_parse(self.connection_data, parse_huawei_ospf_config, ospf_cfg)
                     routing_protocols["ospf"].update(parsed_ospf)
                     has_valid_ospf = (
                         bool(parsed_ospf.get("process_id"))
@@ -317,57 +418,46 @@ class RouterAnalyzer:
                     routing_protocols["ospf"]["enabled"] = has_valid_ospf
                 bgp_cfg = data.get("huawei_bgp_config", "") or running_cfg
                 if bgp_cfg:
-                    parsed_bgp = parse_huawei_bgp_config(bgp_cfg)
+                    parsed_bgp = timed_parse(self.connection_data, parse_huawei_bgp_config, bgp_cfg)
                     routing_protocols["bgp"].update(parsed_bgp)
+                    bgp_table.add_config(parsed_bgp.get("neighbors", []))
                     has_valid_bgp = bool(parsed_bgp.get("as_number")) or bool(parsed_bgp.get("neighbors"))
                     routing_protocols["bgp"]["config"] = bgp_cfg if has_valid_bgp else ""
                     routing_protocols["bgp"]["enabled"] = has_valid_bgp
                 bgp_peer = data.get("huawei_bgp_peer", "")
                 if bgp_peer:
-                    parsed_bgp_peers = parse_huawei_bgp_peer(bgpeers_text:=bgp_peer)
-                    known_ips = {n.get("ip") for n in routing_protocols["bgp"]["neighbors"]}
-                    for p in parsed_bgp_peers:
-                        if p.get("ip") and p["ip"] not in known_ips:
-                            routing_protocols["bgp"]["neighbors"].append({
-                                "ip": p.get("ip"),
-                                "remote_as": p.get("as", ""),
-                            })
+                    parsed_bgp_peers = timed_parse(self.connection_data, parse_huawei_bgp_peer, bgpeers_text:=bgp_peer)
+                    bgp_table.add_peers(parsed_bgp_peers)
                     bgp_peers = parsed_bgp_peers
                 ospf_peer = data.get("huawei_ospf_peer", "")
                 if ospf_peer:
-                    ospf_neighbors = parse_huawei_ospf_peer(ospf_peer)
+                    ospf_neighbors = timed_parse(self.connection_data, parse_huawei_ospf_peer, ospf_peer)
             elif vendor == "cisco":
                 c_ver = data.get("cisco_show_version", "")
                 if c_ver:
-                    device_info = parse_cisco_version(c_ver)
+                    device_info = timed_parse(self.connection_data, parse_cisco_version, c_ver)
                 c_text = data.get("cisco_ip_int_brief", "")
                 if c_text:
-                    interfaces = parse_cisco_ip_interface_brief(c_text)
+                    interfaces = timed_parse(self.connection_data, parse_cisco_ip_interface_brief, c_text)
                 running_cfg = data.get("cisco_running_config", "")
                 try:
                     from .parsers import parse_cisco_interface_section
                     sec_text = data.get("cisco_interface_config_section", "") or analysis_data.get("raw", {}).get("interface_config_section", "") or running_cfg
                     if sec_text:
-                        sec_list = parse_cisco_interface_section(sec_text)
+                        sec_list = timed_parse(self.connection_data, parse_cisco_interface_section, sec_text)
                         mask_map = {i.get("name"): i for i in sec_list}
-                        merged: List[Dict[str, Any]] = []
+                        # Completar en el mismo registro (la lista es una copia propia del parser)
                         for it in interfaces or []:
                             mi = mask_map.get(it.get("name"))
                             if mi:
-                                merged.append({
-                                    **it,
-                                    "ip_address": it.get("ip_address") or mi.get("ip_address", ""),
-                                    "mask": mi.get("mask", it.get("mask", "")),
-                                    "vrf": mi.get("vrf", it.get("vrf", "")),
-                                })
-                            else:
-                                merged.append(it)
-                        interfaces = merged or interfaces
+                                it["ip_address"] = it.get("ip_address") or mi.get("ip_address", "")
+                                it["mask"] = mi.get("mask", it.get("mask", ""))
+                                it["vrf"] = mi.get("vrf", it.get("vrf", ""))
                 except Exception:
                     pass
                 # OSPF/BGP Cisco: parsear desde running-config
                 if running_cfg:
-                    parsed_ospf = parse_cisco_ospf_config(running_cfg)
+                    parsed_ospf = timed_parse(self.connection_data, parse_cisco_ospf_config, running_cfg)
                     routing_protocols["ospf"].update(parsed_ospf)
                     has_valid_ospf = (
                         bool(parsed_ospf.get("process_id"))
@@ -380,8 +470,9 @@ class RouterAnalyzer:
                     routing_protocols["ospf"]["enabled"] = has_valid_ospf
                     # Usar sección BGP si está disponible
                     bgp_cfg = data.get("cisco_bgp_config", "") or running_cfg
-                    parsed_bgp = parse_cisco_bgp_config(bgp_cfg)
+                    parsed_bgp = timed_parse(self.connection_data, parse_cisco_bgp_config, bgp_cfg)
                     routing_protocols["bgp"].update(parsed_bgp)
+                    bgp_table.add_config(parsed_bgp.get("neighbors", []))
                     has_valid_bgp = bool(parsed_bgp.get("as_number")) or bool(parsed_bgp.get("neighbors"))
                     routing_protocols["bgp"]["config"] = bgp_cfg if has_valid_bgp else ""
                     routing_protocols["bgp"]["enabled"] = has_valid_bgp
@@ -389,36 +480,37 @@ class RouterAnalyzer:
                 from .parsers import parse_cisco_static_routes
                 c_static = data.get("cisco_static_routes", "")
                 if c_static:
-                    static_routes = parse_cisco_static_routes(c_static)
+                    static_routes = timed_parse(self.connection_data, parse_cisco_static_routes, c_static)
                 # Vecinos OSPF Cisco
                 c_ospf_peer = data.get("cisco_ospf_peer", "")
                 if c_ospf_peer:
-                    ospf_neighbors = parse_cisco_ospf_neighbor(c_ospf_peer)
+                    ospf_neighbors = timed_parse(self.connection_data, parse_cisco_ospf_neighbor, c_ospf_peer)
                 # Resumen BGP Cisco
                 c_bgp_summary = data.get("cisco_bgp_summary", "")
                 if c_bgp_summary:
-                    parsed_bgp_peers = parse_cisco_bgp_summary(c_bgp_summary)
-                    # Añadir al listado de neighbors de routing_protocols si no están ya
-                    known_ips = {n.get("ip") for n in routing_protocols["bgp"]["neighbors"]}
-                    for p in parsed_bgp_peers:
-                        ip = p.get("ip")
-                        if ip and ip not in known_ips:
-                            routing_protocols["bgp"]["neighbors"].append({
-                                "ip": ip,
-                                "remote_as": p.get("as", ""),
-                            })
+                    parsed_bgp_peers = timed_parse(self.connection_data, parse_cisco_bgp_summary, c_bgp_summary)
+                    # Estado operativo sobre los vecinos configurados (o vecinos nuevos)
+                    bgp_table.add_peers(parsed_bgp_peers)
                     bgp_peers = parsed_bgp_peers
             elif vendor == "juniper":
                 j_ver = data.get("juniper_show_version", "")
                 if j_ver:
-                    device_info = parse_juniper_version(j_ver)
+                    device_info = timed_parse(self.connection_data, parse_juniper_version, j_ver)
                 j_text = data.get("juniper_interfaces_terse", "")
                 if j_text:
-                    interfaces = parse_juniper_interfaces_terse(j_text)
+                    interfaces = timed_parse(self.connection_data, parse_juniper_interfaces_terse, j_text)
                 running_cfg = data.get("juniper_running_config", "")
         except Exception:
             pass
 
+        # Vecinos BGP fusionados, con índices por VRF y por AS remoto para el módulo BGP
+        routing_protocols["bgp"]["neighbors"] = bgp_table.to_list()
+        routing_protocols["bgp"]["neighbors_by_vrf"] = bgp_table.vrf_index()
+        routing_protocols["bgp"]["neighbors_by_as"] = bgp_table.as_index()
+
+        if "timings" in analysis_data:
+            analysis_data["timings"] = timings_snapshot(self.connection_data)
+
         # Construir 'neighbors' en el formato que usa el dashboard
         neighbors = {
             "ospf": routing_protocols.get("ospf", {}).get("networks", []) if routing_protocols.get("ospf", {}).get("enabled") else [],
@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import Dict, Any, Callable, Tuple
+
+
+SessionKey = Tuple[str, str, str, str]
+
+
+def session_key(protocol: str, connection_data: Dict[str, Any]) -> SessionKey:
+    """Clave de sesión: (protocolo, host, puerto, usuario).
+
+    Para Serial el host va vacío y el puerto es el nombre del puerto (COM7, /dev/ttyUSB0).
+    """
+    host = "" if protocol == "Serial" else str(connection_data.get("hostname", "") or "").strip()
+    port = str(connection_data.get("port", "") or "").strip()
+    user = str(connection_data.get("username", "") or "")
+    return (protocol, host, port, user)
+
+
+class SessionPool:
+    """Pool de sesiones autenticadas reutilizables por dispositivo.
+
+    Cada sesión es un objeto de conexión (SSHConnection/TelnetConnection/
+    SerialConnection) creado en modo persistente. El pool solo decide cuándo
+    crear, reutilizar o descartar sesiones; la serialización de comandos sobre
+    una misma sesión la hace cada conexión con su propio ``lock``.
+    """
+
+    def __init__(self, idle_timeout: float = 300.0):
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[SessionKey, Any] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: SessionKey, connection_data: Dict[str, Any], factory: Callable[[], Any], vendor: str = "") -> Any:
+        """Devuelve la sesión viva para ``key`` o crea una nueva con ``factory``."""
+        stale = []
+        with self._lock:
+            now = time.time()
+            sess = self._sessions.get(key)
+            if sess is not None:
+                idle_limit = float(connection_data.get("session_idle_timeout", self.idle_timeout) or self.idle_timeout)
+                expired = (now - getattr(sess, "last_used", now)) > idle_limit
+                # Credenciales distintas para la misma clave: no reutilizar la sesión
+                changed = getattr(sess, "password", "") != (connection_data.get("password", "") or "")
+                if expired or changed or not sess.is_reusable():
+                    stale.append(self._sessions.pop(key))
+                    sess = None
+            if sess is None:
+                sess = factory()
+                self._sessions[key] = sess
+            sess.bind(connection_data, vendor)
+        for old in stale:
+            try:
+                old.close()
+            except Exception:
+                pass
+        return sess
+
+    def discard(self, key: SessionKey) -> None:
+        with self._lock:
+            sess = self._sessions.pop(key, None)
+        if sess is not None:
+            try:
+                sess.close()
+            except Exception:
+                pass
+
+    def peek(self, key: SessionKey) -> Any:
+        with self._lock:
+            return self._sessions.get(key)
+
+    def find(self, protocol: str, port: str) -> Any:
+        """Primera sesión del protocolo en ``port`` (cualquier usuario), o None."""
+        with self._lock:
+            for key, sess in self._sessions.items():
+                if key[0] == protocol and key[2] == str(port).strip():
+                    return sess
+        return None
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for sess in sessions:
+            try:
+                sess.close()
+            except Exception:
+                pass
@@ -0,0 +1,179 @@
+import codecs
+import re
+import time
+from typing import List, Union
+
+
+# Secuencias ANSI CSI (colores, borrado de línea, movimiento de cursor)
+_ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+# Secuencia ANSI incompleta al final de un fragmento: se completa con el siguiente
+_ANSI_PARTIAL_RE = re.compile(r"\x1b(?:\[[0-9;?]*)?$")
+# Indicadores de paginación: '--More--', '-- More --', '---- More ----', '---(more 45%)---'
+_MORE_PATTERN = r"-{2,4} ?[Mm][Oo][Rr][Ee] ?-{2,4}|-{3}\([Mm]ore(?: \d{1,3}%)?\)-{3}"
+_MORE_RE = re.compile(_MORE_PATTERN)
+# Indicador de paginación (completo o no) al final de un fragmento: se retiene
+# porque su final puede llegar en el siguiente ('---- More --' + '--')
+_MORE_PARTIAL_RE = re.compile(
+    r"(?:-{1,4} ?(?:[Mm](?:[Oo](?:[Rr](?:[Ee] ?-{0,4})?)?)?)?"
+    r"|-{3}\((?:[Mm](?:o(?:r(?:e(?: \d{0,3}%?)?)?)?)?)?(?:\)-{0,3})?)$"
+)
+# Tokens que alteran el texto: backspace o indicador de paginación
+_TOKEN_RE = re.compile("\x08|" + _MORE_PATTERN)
+# Longitud máxima de un indicador de paginación (para retener su prefijo)
+_MORE_MAX_LEN = 20
+# Último carácter de una línea que puede cerrar una lectura (prompt o login)
+_STOP_CHARS = "#>]%:$"
+
+
+class StreamSanitizer:
+    """Limpieza incremental de la salida CLI a medida que llegan los fragmentos.
+
+    En una sola pasada por fragmento elimina secuencias ANSI, resuelve
+    backspaces y quita los indicadores de paginación. Los bytes se decodifican
+    con un decodificador UTF-8 incremental, de modo que un carácter multibyte
+    partido entre dos ``recv()`` no se pierde. El texto limpio se acumula en
+    una lista de fragmentos (sin concatenaciones cuadráticas).
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._chunks: List[str] = []
+        # Texto retenido: ANSI o indicador de paginación posiblemente incompletos
+        self._pending = ""
+        # Backspaces que borran un indicador de paginación ya eliminado
+        self._credit = 0
+        self._since_marker = 0
+        # True si el último fragmento contenía un indicador de paginación
+        self.more_seen = False
+        # Para el registro de tiempos: bytes recibidos (caracteres si el
+        # transporte ya entrega texto), fragmentos y segundos de limpieza
+        self.bytes_in = 0
+        self.chunks = 0
+        self.busy = 0.0
+
+    def feed(self, data: Union[bytes, bytearray, str]) -> str:
+        """Procesa un fragmento (bytes o str) y devuelve el texto limpio nuevo."""
+        started = time.perf_counter()
+        try:
+            return self._feed(data)
+        finally:
+            self.bytes_in += len(data or "")
+            self.chunks += 1
+            self.busy += time.perf_counter() - started
+
+    def _feed(self, data: Union[bytes, bytearray, str]) -> str:
+        text = self._decoder.decode(bytes(data)) if isinstance(data, (bytes, bytearray)) else (data or "")
+        self.more_seen = False
+        if not text:
+            return ""
+        text = self._pending + text
+        self._pending = ""
+        m = _ANSI_PARTIAL_RE.search(text, max(0, len(text) - 32))
+        if m:
+            self._pending = text[m.start():]
+            text = text[:m.start()]
+        if "\x1b" in text:
+            text = _ANSI_RE.sub("", text)
+        # Retener un posible indicador de paginación cortado entre fragmentos.
+        # Uno completo al final también se retiene: sus guiones pueden seguir
+        line_start = text.rfind("\n") + 1
+        hold = -1
+        done = max(line_start, len(text) - 2 * _MORE_MAX_LEN)
+        for mm in _MORE_RE.finditer(text, done):
+            done = mm.end()
+            hold = mm.start() if mm.end() == len(text) else -1
+        if hold < 0:
+            m = _MORE_PARTIAL_RE.search(text, max(done, len(text) - _MORE_MAX_LEN))
+            if m and m.start() < len(text):
+                hold = m.start()
+        if hold >= 0:
+            self._pending = text[hold:] + self._pending
+            text = text[:hold]
+        new = self._process(text)
+        # El equipo espera una tecla tras el indicador: avisar aunque quede retenido
+        if _MORE_RE.search(self._pending):
+            self.more_seen = True
+        return new
+
+    def flush(self) -> str:
+        """Fin del flujo: procesa lo retenido y devuelve el texto limpio completo."""
+        started = time.perf_counter()
+        rest = self._pending + self._decoder.decode(b"", final=True)
+        self._pending = ""
+        if rest:
+            if "\x1b" in rest:
+                rest = _ANSI_RE.sub("", rest)
+            self._process(rest)
+        text = self.getvalue()
+        self.busy += time.perf_counter() - started
+        return text
+
+    def getvalue(self) -> str:
+        """Texto limpio acumulado (más lo retenido, sin procesar aún)."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return (self._chunks[0] if self._chunks else "") + self._pending
+
+    def maybe_at_stop(self) -> bool:
+        """True si la última línea termina como un prompt o una petición de login.
+
+        Filtro barato para evaluar los predicados de fin de lectura (que
+        recorren el búfer completo) solo cuando pueden cumplirse.
+        """
+        for chunk in reversed(self._chunks):
+            t = chunk.rstrip(" \t\r")
+            if t:
+                return t[-1] in _STOP_CHARS
+            if "\n" in chunk:
+                return False
+        return False
+
+    def _process(self, text: str) -> str:
+        new: List[str] = []
+        pos = 0
+        for m in _TOKEN_RE.finditer(text):
+            if m.start() > pos:
+                self._append(text[pos:m.start()], new)
+            if m.group() == "\x08":
+                self._backspace(new)
+            else:
+                # El equipo borra después el indicador con backspaces: ya no hay nada que borrar
+                self._credit = len(m.group())
+                self._since_marker = 0
+                self.more_seen = True
+            pos = m.end()
+        if pos < len(text):
+            self._append(text[pos:], new)
+        return "".join(new)
+
+    def _append(self, s: str, new: List[str]) -> None:
+        self._chunks.append(s)
+        self._since_marker += len(s)
+        new.append(s)
+
+    def _backspace(self, new: List[str]) -> None:
+        if self._since_marker <= 0 and self._credit > 0:
+            self._credit -= 1
+            return
+        self._since_marker = max(0, self._since_marker - 1)
+        if self._chunks:
+            last = self._chunks[-1][:-1]
+            if last:
+                self._chunks[-1] = last
+            else:
+                self._chunks.pop()
+        if new:
+            tail = new[-1][:-1]
+            if tail:
+                new[-1] = tail
+            else:
+                new.pop()
+
+
+def sanitize_text(text: str) -> str:
+    """Limpieza de un texto completo (ANSI, backspaces y paginación)."""
+    if not text:
+        return ""
+    san = StreamSanitizer()
+    san.feed(text)
+    return san.flush()
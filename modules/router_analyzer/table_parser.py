@@ -0,0 +1,118 @@
+import re
+from bisect import bisect_right
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Pattern, Sequence, Tuple
+
+
+_WORD = re.compile(r"\S+")
+
+
+class TableLayout:
+    """Columnas de una tabla detectadas en su línea de cabecera.
+
+    Cada columna guarda su clave y la posición (inicio, fin) de su título.
+    Una fila con tantas palabras como columnas se asigna por orden (el caso
+    habitual, incluso si el equipo desplaza columnas por valores largos). En
+    otro caso las palabras se reparten por posición: cada una va a la columna
+    cuyo título solapa y, si no solapa ninguno (segunda palabra de
+    'administratively down' o 'Idle (Admin)'), a la columna que empieza a su
+    izquierda.
+    """
+
+    __slots__ = ("keys", "starts", "ends")
+
+    def __init__(self, spans: Sequence[Tuple[str, int, int]]) -> None:
+        self.keys: List[str] = [key for key, _, _ in spans]
+        self.starts: List[int] = [start for _, start, _ in spans]
+        self.ends: List[int] = [end for _, _, end in spans]
+
+    def split(self, line: str, tokens: Optional[List[str]] = None) -> Dict[str, str]:
+        if tokens is None:
+            tokens = line.split()
+        if len(tokens) == len(self.keys):
+            return dict(zip(self.keys, tokens))
+        starts, ends = self.starts, self.ends
+        # Por columna: posición de su primera palabra y fin de la última
+        cells: List[Optional[List[int]]] = [None] * len(starts)
+        for m in _WORD.finditer(line):
+            a, b = m.span()
+            best, overlap = -1, 0
+            for i, start in enumerate(starts):
+                if start >= b:
+                    break
+                o = min(b, ends[i]) - max(a, start)
+                if o > overlap:
+                    best, overlap = i, o
+            if best < 0:
+                best = max(bisect_right(starts, a) - 1, 0)
+            cell = cells[best]
+            if cell is None:
+                cells[best] = [a, b]
+            else:
+                cell[1] = b
+        return {key: line[cell[0]:cell[1]] if cell else "" for key, cell in zip(self.keys, cells)}
+
+
+class TableParser:
+    """Tabla de una salida 'show'/'display' descrita por los títulos de sus columnas.
+
+    - titles: título de cabecera (sin distinguir mayúsculas) -> clave de la fila
+    - required: claves que debe contener una línea para tomarse como cabecera
+    - accept: valida cada fila (descarta prompts, totales, leyendas...)
+    - fallback: expresiones regulares (grupos con nombre = claves) para filas
+      sin cabecera previa o que la cabecera detectada no explica
+
+    La cabecera se detecta una vez (y de nuevo si se repite, p. ej. una tabla
+    por VRF); las filas se dividen con ``str.split`` y las posiciones de la
+    cabecera, sin evaluar expresiones regulares por línea.
+    """
+
+    def __init__(self, titles: Mapping[str, str], required: Sequence[str],
+                 accept: Callable[[Dict[str, str]], bool],
+                 fallback: Sequence[Pattern] = ()) -> None:
+        ordered = sorted(titles, key=len, reverse=True)
+        self._header = re.compile(r"(?<!\S)(?:%s)(?!\S)" % "|".join(re.escape(t) for t in ordered), re.IGNORECASE)
+        self._keys = {title.lower(): key for title, key in titles.items()}
+        self._leads = {title.split()[0].lower() for title in titles}
+        self._required = set(required)
+        self._accept = accept
+        self._fallback = tuple(fallback)
+
+    def layout(self, line: str) -> Optional[TableLayout]:
+        """Columnas de ``line`` si es una cabecera de esta tabla; None en otro caso."""
+        spans = [(self._keys[m.group().lower()], m.start(), m.end()) for m in self._header.finditer(line)]
+        if not spans or spans[0][1] != len(line) - len(line.lstrip()):
+            return None
+        if not self._required.issubset(key for key, _, _ in spans):
+            return None
+        return TableLayout(spans)
+
+    def rows(self, text: str) -> Iterator[Dict[str, str]]:
+        """Filas aceptadas de ``text`` como dicts {clave: valor}."""
+        layout: Optional[TableLayout] = None
+        keys: List[str] = []
+        accept, leads = self._accept, self._leads
+        for line in (text or "").splitlines():
+            tokens = line.split()
+            if not tokens:
+                continue
+            first = tokens[0]
+            if not first[0].isdigit() and first.lower() in leads:
+                found = self.layout(line)
+                if found is not None:
+                    layout, keys = found, found.keys
+                    continue
+            if layout is not None:
+                # Fila completa: asignación directa sin pasar por las posiciones
+                row = dict(zip(keys, tokens)) if len(tokens) == len(keys) else layout.split(line, tokens)
+                if accept(row):
+                    yield row
+                    continue
+            if self._fallback:
+                stripped = line.strip()
+                for pattern in self._fallback:
+                    m = pattern.match(stripped)
+                    if m:
+                        row = {key: value or "" for key, value in m.groupdict().items()}
+                        if accept(row):
+                            yield row
+                        break
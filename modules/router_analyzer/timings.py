@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+# Clave de connection_data donde vive el registrador del análisis en curso
+RECORDER_KEY = "timing_recorder"
+
+
+class TimingRecorder:
+    """Tramos de tiempo (spans) de un análisis: conexión, sesión, comandos y parsers.
+
+    Cada tramo guarda nombre, categoría, inicio/fin (``time.time()``), hilo y
+    argumentos libres (p. ej. ``bytes`` de un comando). Los costes repartidos
+    en muchas llamadas cortas (limpieza de la salida por fragmento) se suman
+    en ``totals`` en lugar de generar un tramo por llamada. Es seguro entre
+    hilos: las sesiones registran desde el hilo del motor y sus executors.
+    """
+
+    def __init__(self) -> None:
+        self.origin = time.time()
+        self._lock = threading.Lock()
+        self._spans: List[Dict[str, Any]] = []
+        self._totals: Dict[str, Dict[str, float]] = {}
+        self._threads: Dict[int, str] = {}
+
+    def add(self, name: str, start: float, end: float, category: str = "", **args: Any) -> None:
+        thread = threading.current_thread()
+        span = {"name": name, "cat": category, "start": start, "end": max(start, end),
+                "tid": thread.ident or 0, "args": args}
+        with self._lock:
+            self._spans.append(span)
+            self._threads.setdefault(thread.ident or 0, thread.name)
+
+    @contextmanager
+    def span(self, name: str, category: str = "", **args: Any) -> Iterator[Dict[str, Any]]:
+        """Mide el bloque; los argumentos añadidos al dict devuelto se guardan con el tramo."""
+        start = time.time()
+        try:
+            yield args
+        finally:
+            self.add(name, start, time.time(), category, **args)
+
+    def add_total(self, name: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            entry = self._totals.setdefault(name, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += seconds
+            entry["calls"] += calls
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Datos simples (JSON) con tiempos relativos al inicio del registrador."""
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: s["start"])
+            totals = {name: dict(entry) for name, entry in self._totals.items()}
+            threads = dict(self._threads)
+        end = max((s["end"] for s in spans), default=self.origin)
+        return {
+            "started": self.origin,
+            "total_s": round(end - self.origin, 6),
+            "spans": [
+                {
+                    "name": s["name"],
+                    "cat": s["cat"],
+                    "start_s": round(s["start"] - self.origin, 6),
+                    "dur_s": round(s["end"] - s["start"], 6),
+                    "thread": threads.get(s["tid"], str(s["tid"])),
+                    "args": dict(s["args"]),
+                }
+                for s in spans
+            ],
+            "totals": {name: {"seconds": round(e["seconds"], 6), "calls": int(e["calls"])} for name, e in totals.items()},
+        }
+
+
+def start_timings(connection_data: Dict[str, Any]) -> TimingRecorder:
+    """Registrador nuevo para el análisis que empieza (sustituye al anterior)."""
+    recorder = TimingRecorder()
+    connection_data[RECORDER_KEY] = recorder
+    return recorder
+
+
+def current_timings(connection_data: Optional[Dict[str, Any]]) -> Optional[TimingRecorder]:
+    recorder = (connection_data or {}).get(RECORDER_KEY)
+    return recorder if isinstance(recorder, TimingRecorder) else None
+
+
+@contextmanager
+def timing_span(connection_data: Optional[Dict[str, Any]], name: str, category: str = "",
+                **args: Any) -> Iterator[Dict[str, Any]]:
+    """``with timing_span(cd, 'login', 'session'):``; sin registrador no mide nada."""
+    recorder = current_timings(connection_data)
+    if recorder is None:
+        yield args
+        return
+    with recorder.span(name, category, **args) as span_args:
+        yield span_args
+
+
+def record_span(connection_data: Optional[Dict[str, Any]], name: str, start: float, end: float,
+                category: str = "", **args: Any) -> None:
+    """Registra un tramo ya medido (inicio/fin con ``time.time()``)."""
+    recorder = current_timings(connection_data)
+    if recorder is not None:
+        recorder.add(name, start, end, category, **args)
+
+
+def add_timing_total(connection_data: Optional[Dict[str, Any]], name: str, seconds: float, calls: int = 1) -> None:
+    recorder = current_timings(connection_data)
+    if recorder is not None:
+        recorder.add_total(name, seconds, calls)
+
+
+def timed_parse(connection_data: Optional[Dict[str, Any]], parser: Callable[[str], Any], text: str) -> Any:
+    """Ejecuta ``parser(text)`` registrando un tramo 'parse' con el nombre del parser."""
+    with timing_span(connection_data, parser.__name__, "parse", chars=len(text or "")):
+        return parser(text)
+
+
+def timings_snapshot(connection_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    recorder = current_timings(connection_data)
+    return recorder.to_dict() if recorder is not None else {}
+
+
+def format_timings(timings: Dict[str, Any]) -> str:
+    """Tabla legible de los tramos (para ``main.py --cli --timings``)."""
+    if not timings or not timings.get("spans"):
+        return "Sin tiempos registrados."
+    lines = [f"Tiempos (total {timings.get('total_s', 0.0):.3f}s):",
+             f"  {'inicio':>9} {'duración':>10}  {'categoría':<9} tramo"]
+    for s in timings["spans"]:
+        extra = " ".join(f"{k}={v}" for k, v in s.get("args", {}).items())
+        lines.append(f"  {s['start_s']:>8.3f}s {s['dur_s'] * 1000:>8.1f}ms  {s['cat'] or '-':<9} {s['name']}"
+                     + (f"  [{extra}]" if extra else ""))
+    for name, entry in (timings.get("totals") or {}).items():
+        lines.append(f"  Acumulado {name}: {entry['seconds'] * 1000:.1f}ms en {entry['calls']} llamadas")
+    return "\n".join(lines)
+
+
+def to_chrome_trace(timings: Dict[str, Any]) -> Dict[str, Any]:
+    """Formato 'Trace Event' de Chrome (chrome://tracing, Perfetto): eventos completos 'X'."""
+    tids: Dict[str, int] = {}
+    events: List[Dict[str, Any]] = []
+    for s in timings.get("spans", []):
+        tid = tids.setdefault(s["thread"], len(tids) + 1)
+        events.append({
+            "name": s["name"],
+            "cat": s["cat"] or "misc",
+            "ph": "X",
+            "ts": round(s["start_s"] * 1e6, 1),
+            "dur": round(s["dur_s"] * 1e6, 1),
+            "pid": 1,
+            "tid": tid,
+            "args": s.get("args", {}),
+        })
+    for thread, tid in tids.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread}})
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"started": timings.get("started"), "totals": timings.get("totals", {})},
+    }
+
+
+def write_chrome_trace(timings: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(timings), f, ensure_ascii=False, default=str)
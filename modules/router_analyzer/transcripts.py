@@ -0,0 +1,791 @@
+import asyncio
+import bisect
+import codecs
+import gzip
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+# Formato de los ficheros de transcripción (JSON comprimido con gzip)
+TRANSCRIPT_FORMAT = "router-transcript"
+TRANSCRIPT_VERSION = 1
+DEFAULT_TRANSCRIPT_DIR = "transcripts"
+
+# Direcciones de cada evento: '>' enviado al equipo, '<' recibido del equipo
+SENT = ">"
+RECEIVED = "<"
+
+# Opciones del cliente que cambian lo que se envía: la reproducción usa las grabadas
+_CLIENT_OPTIONS = ("fast_mode", "pipeline_commands", "parallel_exec", "parallel_exec_channels",
+                   "reuse_sessions", "prefetch_running_config")
+# Testigos aleatorios que el cliente genera en cada ejecución (marcadores de la tubería)
+_TOKEN = re.compile(rb"[A-Za-z0-9]{8,}")
+
+
+def _raw(data: Union[bytes, str]) -> bytes:
+    # Telnet (telnetlib3) trabaja con str ya decodificado; SSH y serie con bytes
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    return bytes(data)
+
+
+def _as_text(data: bytes) -> str:
+    # latin-1: cada byte es un carácter, se guarda y recupera sin pérdidas
+    return data.decode("latin-1")
+
+
+# ---------------- Grabación -----------------
+
+class _ChannelLog:
+    """Eventos de un canal (shell, exec, telnet o serie) dentro de una transcripción."""
+
+    def __init__(self, recorder: "TranscriptRecorder", kind: str, command: str = ""):
+        self._recorder = recorder
+        self.entry: Dict[str, Any] = {"kind": kind, "command": command, "opened": recorder.elapsed(),
+                                      "closed": None, "events": []}
+
+    def sent(self, data: Union[bytes, str]) -> None:
+        if data:
+            self._recorder.event(self.entry, SENT, self._recorder.redact(_raw(data)))
+
+    def received(self, data: Union[bytes, str]) -> None:
+        if data:
+            self._recorder.event(self.entry, RECEIVED, _raw(data))
+
+    def close(self) -> None:
+        if self.entry["closed"] is None:
+            self.entry["closed"] = self._recorder.elapsed()
+
+
+class TranscriptRecorder:
+    """Graba todo lo enviado y recibido en una sesión, con marca de tiempo.
+
+    Cada canal guarda sus eventos ``[segundos, dirección, datos]`` con el
+    tiempo relativo al inicio de la sesión y los bytes tal cual (texto
+    latin-1). Las contraseñas enviadas (login por Telnet/serie, enable) se
+    sustituyen por asteriscos de la misma longitud para que la reproducción
+    siga cuadrando byte a byte. El fichero se escribe al cerrar la sesión.
+    """
+
+    def __init__(self, path: str, meta: Dict[str, Any], secrets: Tuple[str, ...] = ()):
+        self.path = path
+        self.meta = meta
+        self.origin = time.time()
+        self._lock = threading.Lock()
+        self._channels: List[Dict[str, Any]] = []
+        self._secrets = [s.encode("utf-8") for s in secrets if s]
+
+    def elapsed(self) -> float:
+        return round(time.time() - self.origin, 4)
+
+    def channel(self, kind: str, command: str = "") -> _ChannelLog:
+        log = _ChannelLog(self, kind, command)
+        with self._lock:
+            self._channels.append(log.entry)
+        return log
+
+    def redact(self, data: bytes) -> bytes:
+        for secret in self._secrets:
+            if secret in data:
+                data = data.replace(secret, b"*" * len(secret))
+        return data
+
+    def event(self, entry: Dict[str, Any], direction: str, data: bytes) -> None:
+        with self._lock:
+            entry["events"].append([self.elapsed(), direction, _as_text(data)])
+
+    def save(self) -> Optional[str]:
+        """Escribe (o reescribe) el fichero; None si la sesión no abrió ningún canal."""
+        with self._lock:
+            if not self._channels:
+                return None
+            doc = {"format": TRANSCRIPT_FORMAT, "version": TRANSCRIPT_VERSION, "started": self.origin,
+                   **self.meta, "channels": [dict(ch, events=list(ch["events"])) for ch in self._channels]}
+        try:
+            with gzip.open(self.path, "wt", encoding="utf-8") as f:
+                json.dump(doc, f, ensure_ascii=False, separators=(",", ":"))
+        except Exception as e:
+            print(f"[Transcript] No se pudo guardar {self.path}: {e}")
+            return None
+        return self.path
+
+
+class _Proxy:
+    # Reenvía al objeto real todo lo que el proxy no intercepta
+    def __init__(self, inner: Any, log: Any):
+        self._inner = inner
+        self._log = log
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+
+class _RecordingChannel(_Proxy):
+    """``paramiko.Channel`` que graba lo enviado y lo recibido (stdout y stderr)."""
+
+    def send(self, data: Any) -> int:
+        n = self._inner.send(data)
+        self._log.sent(data[:n] if isinstance(n, int) else data)
+        return n
+
+    def sendall(self, data: Any) -> None:
+        self._inner.sendall(data)
+        self._log.sent(data)
+
+    def recv(self, nbytes: int) -> bytes:
+        data = self._inner.recv(nbytes)
+        self._log.received(data)
+        return data
+
+    def recv_stderr(self, nbytes: int) -> bytes:
+        data = self._inner.recv_stderr(nbytes)
+        self._log.received(data)
+        return data
+
+    def exec_command(self, command: str) -> None:
+        self._log.entry["command"] = command
+        self._inner.exec_command(command)
+
+    def close(self) -> None:
+        try:
+            self._inner.close()
+        finally:
+            self._log.close()
+
+
+class _RecordingFile(_Proxy):
+    # stdout/stderr de ``SSHClient.exec_command``
+    def read(self, *args: Any) -> bytes:
+        data = self._inner.read(*args)
+        self._log.received(data)
+        return data
+
+
+class _RecordingTransport(_Proxy):
+    def open_session(self, *args: Any, **kwargs: Any) -> Any:
+        chan = self._inner.open_session(*args, **kwargs)
+        return _RecordingChannel(chan, self._log.channel("exec"))
+
+
+class RecordingSSHClient(_Proxy):
+    """``paramiko.SSHClient`` cuyos canales (shell y exec) quedan grabados."""
+
+    def invoke_shell(self, *args: Any, **kwargs: Any) -> Any:
+        return _RecordingChannel(self._inner.invoke_shell(*args, **kwargs), self._log.channel("shell"))
+
+    def exec_command(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        stdin, stdout, stderr = self._inner.exec_command(command, *args, **kwargs)
+        log = self._log.channel("exec", command)
+        return stdin, _RecordingFile(stdout, log), _RecordingFile(stderr, log)
+
+    def get_transport(self) -> Any:
+        transport = self._inner.get_transport()
+        return _RecordingTransport(transport, self._log) if transport is not None else None
+
+    def close(self) -> None:
+        try:
+            self._inner.close()
+        finally:
+            self._log.save()
+
+
+class _RecordingReader(_Proxy):
+    # Lector de telnetlib3 (corrutina ``read``)
+    async def read(self, n: int = -1) -> str:
+        data = await self._inner.read(n)
+        self._log.received(data)
+        return data
+
+
+class _RecordingWriter(_Proxy):
+    def __init__(self, inner: Any, log: _ChannelLog, recorder: TranscriptRecorder):
+        super().__init__(inner, log)
+        self._recorder = recorder
+
+    def write(self, data: str) -> None:
+        self._log.sent(data)
+        self._inner.write(data)
+
+    def close(self) -> None:
+        try:
+            self._inner.close()
+        finally:
+            self._log.close()
+            self._recorder.save()
+
+
+class _RecordingSerial(_Proxy):
+    def __init__(self, inner: Any, log: _ChannelLog, recorder: TranscriptRecorder):
+        super().__init__(inner, log)
+        self._recorder = recorder
+
+    def read(self, size: int = 1) -> bytes:
+        data = self._inner.read(size)
+        self._log.received(data)
+        return data
+
+    def write(self, data: bytes) -> Any:
+        self._log.sent(data)
+        return self._inner.write(data)
+
+    def close(self) -> None:
+        try:
+            self._inner.close()
+        finally:
+            self._log.close()
+            self._recorder.save()
+
+
+def _safe_name(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("_") or "device"
+
+
+def start_recording(connection_data: Dict[str, Any], protocol: str, **meta: Any) -> Optional[TranscriptRecorder]:
+    """Recorder para una sesión nueva si ``record_transcripts`` está activo.
+
+    ``record_transcripts`` es el directorio de destino (``True`` usa
+    ``transcripts/``). Cada sesión abierta genera su propio fichero
+    ``<equipo>_<protocolo>_<fecha>_<id>.transcript.json.gz``. Las sesiones
+    reproducidas no se vuelven a grabar.
+    """
+    target = connection_data.get("record_transcripts")
+    if not target or connection_data.get("replay_transcript"):
+        return None
+    directory = target if isinstance(target, str) else DEFAULT_TRANSCRIPT_DIR
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except Exception as e:
+        print(f"[Transcript] No se pudo crear {directory}: {e}")
+        return None
+    device = str(connection_data.get("hostname") or connection_data.get("port") or "device")
+    name = f"{_safe_name(device)}_{protocol.lower()}_{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    info = {
+        "protocol": protocol,
+        "hostname": connection_data.get("hostname", ""),
+        "port": connection_data.get("port", ""),
+        "vendor": connection_data.get("vendor_hint", ""),
+        "ssh_banner": connection_data.get("ssh_banner"),
+        "options": {key: connection_data[key] for key in _CLIENT_OPTIONS if key in connection_data},
+    }
+    info.update(meta)
+    secrets = (connection_data.get("password", ""), connection_data.get("enable_password", ""))
+    return TranscriptRecorder(os.path.join(directory, name + ".transcript.json.gz"), info, secrets)
+
+
+def record_ssh_client(connection_data: Dict[str, Any], client: Any) -> Any:
+    """Envuelve el cliente SSH recién conectado si hay que grabar la sesión."""
+    transport = client.get_transport()
+    recorder = start_recording(connection_data, "SSH2",
+                               remote_version=str(getattr(transport, "remote_version", "") or ""))
+    return RecordingSSHClient(client, recorder) if recorder is not None else client
+
+
+def record_telnet_streams(connection_data: Dict[str, Any], reader: Any, writer: Any) -> Tuple[Any, Any]:
+    recorder = start_recording(connection_data, "Telnet")
+    if recorder is None:
+        return reader, writer
+    log = recorder.channel("telnet")
+    return _RecordingReader(reader, log), _RecordingWriter(writer, log, recorder)
+
+
+def record_serial_port(connection_data: Dict[str, Any], ser: Any) -> Any:
+    recorder = start_recording(connection_data, "Serial", baudrate=connection_data.get("baudrate", ""))
+    if recorder is None:
+        return ser
+    return _RecordingSerial(ser, recorder.channel("serial"), recorder)
+
+
+# ---------------- Reproducción -----------------
+
+def load_transcript(path: str) -> Dict[str, Any]:
+    """Lee una transcripción (``.json.gz`` o ``.json``) y valida su formato."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        doc = json.load(f)
+    if not isinstance(doc, dict) or doc.get("format") != TRANSCRIPT_FORMAT:
+        raise ValueError(f"{path} no es una transcripción de sesión")
+    return doc
+
+
+class ReplayStream:
+    """Un canal grabado servido de nuevo al cliente.
+
+    Cada fragmento recibido en la grabación queda disponible cuando el
+    cliente ha enviado los mismos bytes que se habían enviado antes de él y
+    ha pasado el retardo grabado desde el evento anterior (envío o
+    recepción), dividido por ``speed`` (``speed`` <= 0: sin esperas).
+
+    Los testigos aleatorios del cliente (marcadores de la tubería) cambian en
+    cada ejecución: si lo enviado solo difiere en ellos, el testigo grabado
+    se sustituye por el nuevo en lo que queda por recibir (eco incluido).
+    Cualquier otra diferencia se avisa una vez: a partir de ahí la sesión ya
+    no reproduce el caso original.
+    """
+
+    def __init__(self, channel: Dict[str, Any], speed: float = 1.0, label: str = ""):
+        self.kind = channel.get("kind", "")
+        self.command = channel.get("command", "")
+        self.label = label or self.kind
+        self.speed = speed
+        self.diverged_at: Optional[int] = None
+        # Por fragmento recibido: (bytes enviados antes, retardo, ancla en un envío, datos)
+        self._incoming: List[Tuple[int, float, bool, bytes]] = []
+        expected = bytearray()
+        last_sent_t = last_recv_t = float(channel.get("opened") or 0.0)
+        anchor_is_send = True
+        for t, direction, text in channel.get("events", []):
+            data = text.encode("latin-1")
+            if direction == SENT:
+                expected += data
+                last_sent_t = max(last_sent_t, t)
+                anchor_is_send = True
+                continue
+            anchor = last_sent_t if anchor_is_send else last_recv_t
+            self._incoming.append((len(expected), max(0.0, t - anchor), anchor_is_send, data))
+            last_recv_t = t
+            anchor_is_send = False
+        self._expected = bytes(expected)
+        self._lock = threading.Lock()
+        self._opened = time.monotonic()
+        self._sent = 0
+        # Bytes enviados acumulados tras cada envío del cliente y su instante
+        self._send_totals: List[int] = []
+        self._send_times: List[float] = []
+        self._next = 0
+        self._prev_at = self._opened
+        self._buf = bytearray()
+
+    def _ready_at(self) -> Optional[float]:
+        # Instante en que el siguiente fragmento estará disponible (None: espera un envío)
+        if self._next >= len(self._incoming):
+            return None
+        needed, delay, after_send, _data = self._incoming[self._next]
+        if self._sent < needed:
+            return None
+        if not after_send:
+            anchor = self._prev_at
+        elif needed == 0:
+            anchor = self._opened
+        else:
+            # Instante del envío con el que el cliente completó esos bytes
+            anchor = self._send_times[bisect.bisect_left(self._send_totals, needed)]
+        return anchor + (delay / self.speed if self.speed > 0 else 0.0)
+
+    def _pump(self) -> None:
+        now = time.monotonic()
+        while True:
+            at = self._ready_at()
+            if at is None or at > now:
+                return
+            self._buf += self._incoming[self._next][3]
+            self._prev_at = at
+            self._next += 1
+
+    def pending(self) -> int:
+        with self._lock:
+            self._pump()
+            return len(self._buf)
+
+    def next_ready_at(self) -> Optional[float]:
+        with self._lock:
+            return self._ready_at()
+
+    def finished(self) -> bool:
+        """Todo lo grabado ya se entregó: el equipo no enviará nada más."""
+        with self._lock:
+            self._pump()
+            return self._next >= len(self._incoming) and not self._buf
+
+    def read(self, size: int) -> bytes:
+        with self._lock:
+            self._pump()
+            size = len(self._buf) if size is None or size < 0 else size
+            data = bytes(self._buf[:size])
+            del self._buf[:size]
+            return data
+
+    def send(self, data: Union[bytes, str]) -> None:
+        raw = _raw(data)
+        with self._lock:
+            start = self._sent
+            self._sent += len(raw)
+            self._send_totals.append(self._sent)
+            self._send_times.append(time.monotonic())
+            expected = self._expected[start:self._sent]
+            if self.diverged_at is None and not self._matches(expected, raw):
+                self.diverged_at = start
+                print(f"[Replay] {self.label}: lo enviado difiere de la grabación en el byte {start} "
+                          f"({raw[:40]!r} en lugar de {expected[:40]!r})")
+
+    @staticmethod
+    def _same(expected: bytes, raw: bytes) -> bool:
+        # Los asteriscos de una contraseña redactada no cuentan como diferencia
+        return len(expected) == len(raw) and all(e == r or e == 0x2A for e, r in zip(expected, raw))
+
+    def _matches(self, expected: bytes, raw: bytes) -> bool:
+        if self._same(expected, raw):
+            return True
+        if len(expected) != len(raw):
+            return False
+        subs: Dict[bytes, bytes] = {}
+        for m in _TOKEN.finditer(expected):
+            old, new = m.group(), raw[m.start():m.end()]
+            if old != new and _TOKEN.fullmatch(new) and re.search(rb"\d", old) and re.search(rb"[A-Za-z]", old):
+                subs[old] = new
+        patched = expected
+        for old, new in subs.items():
+            patched = patched.replace(old, new)
+        if not subs or not self._same(patched, raw):
+            return False
+        for old, new in subs.items():
+            self._substitute(old, new)
+        return True
+
+    def _substitute(self, old: bytes, new: bytes) -> None:
+        # Misma longitud: se reemplaza sobre todo lo pendiente y se vuelve a
+        # cortar por los mismos límites (un testigo puede caer entre dos fragmentos)
+        rest = self._incoming[self._next:]
+        joined = (bytes(self._buf) + b"".join(ev[3] for ev in rest)).replace(old, new)
+        self._buf = bytearray(joined[:len(self._buf)])
+        pos = len(self._buf)
+        for i, (needed, delay, after_send, data) in enumerate(rest):
+            rest[i] = (needed, delay, after_send, joined[pos:pos + len(data)])
+            pos += len(data)
+        self._incoming[self._next:] = rest
+        self._expected = self._expected[:self._sent] + self._expected[self._sent:].replace(old, new)
+
+    def wait(self, timeout: float) -> None:
+        """Espera (bloqueante) hasta que haya datos, termine el canal o pase ``timeout``."""
+        end = time.monotonic() + timeout
+        while True:
+            if self.pending() or self.finished():
+                return
+            now = time.monotonic()
+            if now >= end:
+                return
+            at = self.next_ready_at()
+            time.sleep(max(0.0, min(end, at if at is not None else now + 0.01) - now))
+
+
+class ReplayChannel:
+    """Canal paramiko simulado (shell o exec) sobre un ``ReplayStream``.
+
+    ``fileno()`` es un pipe que se marca legible cuando hay datos, como el de
+    ``paramiko.Channel``: el motor espera eventos igual que con un equipo real.
+    """
+
+    def __init__(self, source: "ReplaySource", stream: Optional[ReplayStream] = None):
+        self._source = source
+        self._stream = stream
+        self.closed = False
+        self._lock = threading.Lock()
+        self._pipe: Optional[Tuple[int, int]] = None
+        self._flagged = False
+        self._timer: Optional[threading.Timer] = None
+
+    # ---- Legibilidad (pipe + temporizador hasta el siguiente fragmento) ----
+    def fileno(self) -> int:
+        with self._lock:
+            if self._pipe is None:
+                self._pipe = os.pipe()
+        self._refresh()
+        return self._pipe[0]
+
+    def _refresh(self) -> None:
+        stream = self._stream
+        with self._lock:
+            if self._pipe is None or self.closed:
+                return
+            ready = stream is None or stream.pending() > 0 or stream.finished()
+            if ready and not self._flagged:
+                os.write(self._pipe[1], b"x")
+                self._flagged = True
+            elif not ready and self._flagged:
+                os.read(self._pipe[0], 1)
+                self._flagged = False
+            at = stream.next_ready_at() if stream is not None and not ready else None
+            if at is not None and self._timer is None:
+                self._timer = threading.Timer(max(0.0, at - time.monotonic()), self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+        self._refresh()
+
+    # ---- API de paramiko.Channel usada por las sesiones ----
+    def exec_command(self, command: str) -> None:
+        self._stream = self._source.next_stream("exec", command)
+        if self._stream is None:
+            raise RuntimeError(f"Sin canal exec grabado para '{command}'")
+
+    def recv_ready(self) -> bool:
+        return self._stream is not None and self._stream.pending() > 0
+
+    def recv(self, nbytes: int) -> bytes:
+        data = self._stream.read(nbytes) if self._stream is not None else b""
+        self._refresh()
+        return data
+
+    def recv_stderr_ready(self) -> bool:
+        return False
+
+    def recv_stderr(self, nbytes: int) -> bytes:
+        return b""
+
+    def send(self, data: Any) -> int:
+        if self._stream is not None:
+            self._stream.send(data)
+        self._refresh()
+        return len(data)
+
+    def sendall(self, data: Any) -> None:
+        self.send(data)
+
+    @property
+    def eof_received(self) -> bool:
+        return self._stream is None or self._stream.finished()
+
+    def exit_status_ready(self) -> bool:
+        return self.eof_received
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pipe, self._pipe = self._pipe, None
+        if pipe is not None:
+            for fd in pipe:
+                try:
+                    os.close(fd)
+                except Exception:
+                    pass
+
+
+class _ReplayFile:
+    # stdout/stderr de ``exec_command``: bloquea hasta el final del canal
+    def __init__(self, stream: Optional[ReplayStream]):
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if self._stream is None:
+            return b""
+        out = bytearray()
+        while not self._stream.finished() and (size < 0 or len(out) < size):
+            self._stream.wait(1.0)
+            out += self._stream.read(size - len(out) if size >= 0 else -1)
+        return bytes(out)
+
+
+class _ReplayTransport:
+    def __init__(self, client: "ReplaySSHClient"):
+        self._client = client
+        self.remote_version = str(client.source.meta.get("remote_version") or "")
+
+    def is_active(self) -> bool:
+        return not self._client.closed
+
+    def open_session(self, *args: Any, **kwargs: Any) -> ReplayChannel:
+        return ReplayChannel(self._client.source)
+
+
+class ReplaySSHClient:
+    """Sustituto de ``paramiko.SSHClient`` ya conectado que sirve la grabación."""
+
+    def __init__(self, source: "ReplaySource"):
+        self.source = source
+        self.closed = False
+        self._transport = _ReplayTransport(self)
+
+    def get_transport(self) -> _ReplayTransport:
+        return self._transport
+
+    def invoke_shell(self, *args: Any, **kwargs: Any) -> ReplayChannel:
+        stream = self.source.next_stream("shell")
+        if stream is None:
+            raise RuntimeError("La grabación no tiene más sesiones de shell")
+        return ReplayChannel(self.source, stream)
+
+    def exec_command(self, command: str, *args: Any, **kwargs: Any) -> Tuple[Any, Any, Any]:
+        stream = self.source.next_stream("exec", command)
+        return None, _ReplayFile(stream), _ReplayFile(None)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ReplayTelnetReader:
+    """Lector con la interfaz de telnetlib3 (``read`` asíncrono que devuelve str)."""
+
+    def __init__(self, stream: ReplayStream):
+        self._stream = stream
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    async def read(self, n: int = -1) -> str:
+        while True:
+            data = self._stream.read(n)
+            if data:
+                text = self._decoder.decode(data)
+                if text:
+                    return text
+                continue
+            if self._stream.finished():
+                return ""
+            at = self._stream.next_ready_at()
+            await asyncio.sleep(max(0.0, at - time.monotonic()) if at is not None else 0.01)
+
+    def at_eof(self) -> bool:
+        return self._stream.finished()
+
+
+class ReplayTelnetWriter:
+    def __init__(self, stream: ReplayStream):
+        self._stream = stream
+        self.transport = None
+
+    def write(self, data: str) -> None:
+        self._stream.send(data)
+
+    def close(self) -> None:
+        pass
+
+
+class ReplaySerial:
+    """Puerto serie simulado (``read`` con timeout corto, ``in_waiting``, ``write``)."""
+
+    def __init__(self, stream: ReplayStream, timeout: float = 0.05):
+        self._stream = stream
+        self.timeout = timeout
+        self.is_open = True
+
+    @property
+    def in_waiting(self) -> int:
+        return self._stream.pending()
+
+    def read(self, size: int = 1) -> bytes:
+        self._stream.wait(self.timeout)
+        return self._stream.read(size)
+
+    def write(self, data: bytes) -> int:
+        self._stream.send(data)
+        return len(data)
+
+    def reset_input_buffer(self) -> None:
+        pass
+
+    def reset_output_buffer(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.is_open = False
+
+
+class ReplaySource:
+    """Canales grabados de una o varias transcripciones, servidos en orden.
+
+    Cada apertura de shell/Telnet/serie consume el siguiente canal grabado
+    de ese tipo; los canales exec se emparejan por comando.
+    """
+
+    def __init__(self, transcripts: List[Dict[str, Any]], speed: float = 1.0):
+        self.meta: Dict[str, Any] = dict(transcripts[0]) if transcripts else {}
+        self.meta.pop("channels", None)
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._channels: List[Dict[str, Any]] = []
+        for doc in sorted(transcripts, key=lambda d: d.get("started", 0)):
+            self._channels.extend(doc.get("channels", []))
+        self._used = [False] * len(self._channels)
+
+    def next_stream(self, kind: str, command: Optional[str] = None) -> Optional[ReplayStream]:
+        with self._lock:
+            for i, channel in enumerate(self._channels):
+                if self._used[i] or channel.get("kind") != kind:
+                    continue
+                if command is not None and channel.get("command", "").strip() != command.strip():
+                    continue
+                self._used[i] = True
+                label = f"{kind} '{command}'" if command else kind
+                return ReplayStream(channel, self.speed, label)
+        return None
+
+    def ssh_client(self) -> ReplaySSHClient:
+        return ReplaySSHClient(self)
+
+    def telnet_streams(self) -> Tuple[ReplayTelnetReader, ReplayTelnetWriter]:
+        stream = self.next_stream("telnet")
+        if stream is None:
+            raise ConnectionError("La grabación no tiene más sesiones Telnet")
+        return ReplayTelnetReader(stream), ReplayTelnetWriter(stream)
+
+    def serial_port(self) -> ReplaySerial:
+        stream = self.next_stream("serial")
+        if stream is None:
+            raise OSError("La grabación no tiene más sesiones de consola")
+        return ReplaySerial(stream)
+
+
+def _replay_paths(connection_data: Dict[str, Any]) -> List[str]:
+    paths = connection_data.get("replay_transcript") or []
+    return [paths] if isinstance(paths, str) else list(paths)
+
+
+def replaying(connection_data: Optional[Dict[str, Any]]) -> bool:
+    return bool(_replay_paths(connection_data or {}))
+
+
+def replay_for(connection_data: Dict[str, Any]) -> Optional[ReplaySource]:
+    """Fuente de reproducción para una sesión nueva (None si no se reproduce).
+
+    ``replay_transcript``: fichero o lista de ficheros grabados;
+    ``replay_speed``: 1.0 a la velocidad grabada, 10 diez veces más rápido,
+    0 sin esperas.
+    """
+    paths = _replay_paths(connection_data)
+    if not paths:
+        return None
+    try:
+        speed = float(connection_data.get("replay_speed", 1.0))
+    except (TypeError, ValueError):
+        speed = 1.0
+    return ReplaySource([load_transcript(p) for p in paths], speed)
+
+
+def prepare_replay(connection_data: Dict[str, Any]) -> bool:
+    """Prepara ``connection_data`` para reproducir sin red (lo usa ``connect()``).
+
+    Completa protocolo/equipo con los de la grabación si faltan, toma el
+    banner SSH y las opciones del cliente grabadas (tubería, exec
+    paralelo, modo rápido) y, salvo que el llamador los fije, desactiva el
+    almacén de latencias y la caché de huellas: los tiempos de una
+    reproducción acelerada no deben enseñar nada al equipo real. La
+    grabación tampoco usa la caché de huellas (ver ``apply_fingerprint``),
+    así que contiene la detección y la versión que aquí se vuelven a pedir.
+    """
+    try:
+        docs = [load_transcript(p) for p in _replay_paths(connection_data)]
+    except Exception as e:
+        print(f"[Replay] No se pudo cargar la grabación: {e}")
+        return False
+    if not docs:
+        return False
+    meta = docs[0]
+    connection_data.setdefault("protocol", meta.get("protocol") or "SSH2")
+    for key in ("hostname", "port"):
+        if not connection_data.get(key) and meta.get(key):
+            connection_data[key] = meta[key]
+    if connection_data.get("ssh_banner") is None:
+        connection_data["ssh_banner"] = meta.get("ssh_banner") or ""
+    # Mismas opciones que en la grabación: otras cambiarían lo enviado
+    connection_data.update(meta.get("options") or {})
+    connection_data.setdefault("latency_store", "")
+    connection_data.setdefault("fingerprint_ttl", 0)
+    return True
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 
 DISABLE_PAGING: Dict[str, List[str]] = {
@@ -8,6 +8,20 @@ DISABLE_PAGING: Dict[str, List[str]] = {
 }
 
 
+# Prefijo de comentario (no-op) por fabricante; se usa para los marcadores
+# que separan las salidas en la ejecución en tubería (pipeline_commands)
+COMMENT_MARKER: Dict[str, str] = {
+    "huawei": "#",
+    "cisco": "!",
+    "juniper": "#",
+}
+
+
+# Prefijos de comandos de solo lectura: aptos para ejecutarse en canales
+# exec SSH paralelos (parallel_exec) sin alterar el estado del equipo
+READ_ONLY_PREFIXES = ("show ", "display ")
+
+
 VERSION_COMMAND: Dict[str, str] = {
     "huawei": "display version",
     "cisco": "show version",
@@ -69,3 +83,122 @@ BGP_CONFIG_SECTION: Dict[str, str] = {
     "huawei": "display current-configuration | section include bgp",
     # Juniper no aplica directamente; se omite
 }
+
+
+# Clases de coste de lectura: tiempos por defecto (modo rápido, normal).
+# - idle: silencio que cierra la lectura sin prompt aprendido
+# - hard: tope total por comando (SSH/Telnet)
+# - serial_hard: tope a 38400 baudios o más (se escala a menor velocidad)
+# - prompt_idle: silencio tolerado en Serial esperando el prompt final
+COST_CLASSES: Dict[str, Dict[str, Any]] = {
+    "light": {"idle": (0.8, 1.1), "hard": (8.0, 10.0), "serial_idle": (0.8, 1.0), "serial_hard": 15.0, "prompt_idle": (2.5, 4.0)},
+    # La configuración completa (o una sección, que el equipo obtiene recorriéndola)
+    # puede tardar varios segundos en empezar ('Building configuration...')
+    "heavy": {"idle": (0.8, 1.1), "hard": (16.0, 20.0), "serial_idle": (0.8, 1.0), "serial_hard": 60.0, "prompt_idle": (6.0, 8.0)},
+}
+
+# Fragmentos que identifican la configuración completa (también abreviada: 'dis current-configuration')
+_FULL_CONFIG_TOKENS = ("running-config", "current-configuration", "show configuration")
+# Redirecciones que escriben en el equipo aunque el comando sea 'show'/'display'
+_WRITING_FILTERS = ("| redirect", "| tee", "| save", "| append", ">")
+
+
+def _normalize(cmd: str) -> str:
+    return " ".join((cmd or "").lower().split())
+
+
+class CommandSpec:
+    """Metadatos de un comando CLI para planificar su ejecución.
+
+    - ``kind``: categoría del análisis ('version', 'running', 'ospf_cfg'...)
+    - ``size``: tamaño esperado de la salida ('small', 'medium', 'large')
+    - ``cost``: clase de tiempos de lectura (``COST_CLASSES``)
+    - ``paging``: requiere deshabilitar la paginación antes de ejecutarse
+    - ``read_only``: no altera el equipo ni la sesión (apto para canales exec paralelos)
+    - ``source``/``pipe_filter``: para filtros de la configuración, el comando
+      completo y el filtro aplicado ('sec ospf'); permiten obtener la misma
+      sección localmente a partir de la configuración ya descargada
+    """
+
+    def __init__(self, command: str, vendor: str = "", kind: str = "", size: str = "small",
+                 cost: str = "", paging: Optional[bool] = None, read_only: bool = True,
+                 source: str = "", pipe_filter: str = "") -> None:
+        self.command = command
+        self.vendor = vendor
+        self.kind = kind
+        self.size = size
+        self.cost = cost or ("heavy" if size == "large" or source else "light")
+        self.paging = self.cost == "heavy" if paging is None else paging
+        self.read_only = read_only
+        self.source = source
+        self.pipe_filter = pipe_filter
+
+    def timeouts(self, fast: bool) -> Tuple[float, float]:
+        """``(idle, hard)`` por defecto para SSH/Telnet."""
+        cls = COST_CLASSES[self.cost]
+        i = 0 if fast else 1
+        return cls["idle"][i], cls["hard"][i]
+
+    def serial_timeouts(self, fast: bool, baudrate: int) -> Tuple[float, float, float]:
+        """``(idle, hard, idle_con_prompt)`` para Serial; el tope crece a baja velocidad."""
+        cls = COST_CLASSES[self.cost]
+        i = 0 if fast else 1
+        hard = cls["serial_hard"] * max(1.0, 9600.0 / max(baudrate, 1200) / 4.0)
+        return cls["serial_idle"][i], hard, cls["prompt_idle"][i]
+
+    def __repr__(self) -> str:
+        return f"CommandSpec({self.command!r}, vendor={self.vendor!r}, kind={self.kind!r}, cost={self.cost!r})"
+
+
+# Registro: comando normalizado -> especificación (la primera registrada si
+# varios fabricantes comparten comando, p.ej. 'show version')
+COMMAND_SPECS: Dict[str, CommandSpec] = {}
+# Todas las especificaciones, por fabricante, en orden de registro
+_ALL_SPECS: List[CommandSpec] = []
+
+
+def register_command(spec: CommandSpec) -> CommandSpec:
+    COMMAND_SPECS.setdefault(_normalize(spec.command), spec)
+    _ALL_SPECS.append(spec)
+    return spec
+
+
+def _register_table(table: Dict[str, str], kind: str, size: str = "small") -> None:
+    for ven, cmd in table.items():
+        base, _, flt = cmd.partition(" | ")
+        source = base.strip() if flt and _normalize(base) == _normalize(RUNNING_CONFIG.get(ven, "")) else ""
+        register_command(CommandSpec(cmd, vendor=ven, kind=kind, size=size,
+                                     source=source, pipe_filter=flt.strip() if source else ""))
+
+
+for _ven, _cmds in DISABLE_PAGING.items():
+    for _cmd in _cmds:
+        register_command(CommandSpec(_cmd, vendor=_ven, kind="paging", paging=False, read_only=False))
+_register_table(VERSION_COMMAND, "version")
+_register_table(INTERFACES_BRIEF, "interfaces", size="medium")
+_register_table(RUNNING_CONFIG, "running", size="large")
+_register_table(INTERFACE_CONFIG_SECTION, "interface_cfg", size="medium")
+_register_table(STATIC_ROUTES, "static_routes")
+_register_table(OSPF_NEIGHBORS, "ospf_peers")
+_register_table(BGP_PEERS_SUMMARY, "bgp_summary")
+_register_table(OSPF_CONFIG_SECTION, "ospf_cfg")
+_register_table(BGP_CONFIG_SECTION, "bgp_cfg")
+
+
+def command_spec(cmd: str) -> CommandSpec:
+    """Especificación de ``cmd``; los comandos no registrados se clasifican por su texto."""
+    key = _normalize(cmd)
+    spec = COMMAND_SPECS.get(key)
+    if spec is not None:
+        return spec
+    base, _, flt = key.partition(" | ")
+    full_config = any(t in base for t in _FULL_CONFIG_TOKENS)
+    read_only = key.startswith(READ_ONLY_PREFIXES) and not any(t in key for t in _WRITING_FILTERS)
+    if full_config:
+        return CommandSpec(cmd, size="medium" if flt else "large", cost="heavy", read_only=read_only)
+    return CommandSpec(cmd, read_only=read_only)
+
+
+def command_specs(kind: str, vendor: str = "") -> List[CommandSpec]:
+    """Especificaciones registradas de una categoría (opcionalmente de un fabricante)."""
+    return [s for s in _ALL_SPECS if s.kind == kind and (not vendor or s.vendor == vendor)]
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Benchmark de extremo a extremo: connect -> analyze_router -> parse_analysis_data.
+
+Levanta ``device_simulator.py`` por cada combinación de fabricante, tamaño de
+configuración y latencia del enlace, y analiza el equipo simulado por cada
+protocolo. Cada análisis corre en un proceso propio (memoria pico aislada,
+sin cachés compartidas) y se repite ``--repeat`` veces (se guarda la mediana).
+
+Métricas por caso:
+- wall_s: tiempo total del análisis (conexión + lote + parseo)
+- round_trips: intercambios con el equipo (login, paginación y cada comando
+  o lote en tubería), contados en los tiempos del análisis (``timings``)
+- bytes: bytes recibidos en las salidas de los comandos
+- peak_rss_kb: memoria residente pico del proceso del análisis
+
+Uso:
+    python scripts/bench_analysis.py --output bench.json
+    python scripts/bench_analysis.py --vendors cisco --sizes 1k,50k --latencies 0,50 \\
+        --baseline bench.json --threshold 0.15
+    python scripts/bench_analysis.py --protocols SSH2,Telnet,Serial --sizes 500k --repeat 1
+
+Con ``--baseline`` se compara cada caso con el mismo caso del JSON indicado y
+el proceso termina con código 1 si alguno es más lento que el umbral.
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SIMULATOR = os.path.join(ROOT, "scripts", "device_simulator.py")
+
+try:
+    import resource  # type: ignore
+except Exception:
+    resource = None  # type: ignore
+
+
+def _parse_size(text: str) -> int:
+    text = text.strip().lower()
+    mult = 1
+    if text.endswith("k"):
+        text, mult = text[:-1], 1000
+    elif text.endswith("m"):
+        text, mult = text[:-1], 1000000
+    return int(float(text) * mult)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _case_key(case: Dict[str, Any]) -> str:
+    return f"{case['vendor']}/{case['protocol']}/{case['config_lines']}/{case['latency_ms']:g}ms"
+
+
+# ----------------------- Proceso hijo: un análisis -----------------------
+
+def run_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Analiza el equipo simulado descrito por ``case`` y devuelve sus métricas."""
+    sys.path.insert(0, ROOT)
+    from modules.router_analyzer import RouterAnalyzer, close_all_sessions
+
+    serial = case["protocol"] == "Serial"
+    connection_data = {
+        "protocol": case["protocol"],
+        "hostname": "" if serial else "127.0.0.1",
+        "port": case["port"],
+        "username": "admin",
+        "password": "admin",
+        "enable_password": "admin",
+        "fast_mode": bool(case.get("fast")),
+        "baudrate": 115200 if serial else "",
+        "prefetch_running_config": True,
+        # Sin aprendizaje entre ejecuciones: cada medida parte de cero
+        "latency_store": "",
+        "fingerprint_ttl": 0,
+    }
+    started = time.time()
+    result: Dict[str, Any] = {"ok": False}
+    try:
+        analyzer = RouterAnalyzer(connection_data)
+        if analyzer.connect():
+            analysis_data = analyzer.analyze_router()
+            parsed = analyzer.parse_analysis_data(analysis_data)
+            timings = analysis_data.get("timings", {})
+            spans = timings.get("spans", [])
+            result.update({
+                "ok": bool(parsed.get("interfaces")),
+                "vendor_detected": analysis_data.get("vendor", ""),
+                "interfaces": len(parsed.get("interfaces", [])),
+                "round_trips": sum(1 for s in spans if s["cat"] in ("command", "session") and s["name"] != "open_shell"),
+                "bytes": sum(int(s["args"].get("bytes", 0)) for s in spans if s["cat"] == "command"),
+                "sanitize_s": timings.get("totals", {}).get("sanitize", {}).get("seconds", 0.0),
+            })
+        else:
+            result["error"] = "no se pudo conectar"
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        try:
+            close_all_sessions()
+        except Exception:
+            pass
+    result["wall_s"] = round(time.time() - started, 4)
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa KiB; macOS, bytes
+        result["peak_rss_kb"] = peak // 1024 if sys.platform == "darwin" else peak
+    else:
+        result["peak_rss_kb"] = None
+    return result
+
+
+# ----------------------- Proceso principal -----------------------
+
+class Simulator:
+    """Simulador en segundo plano para un fabricante, tamaño y latencia."""
+
+    def __init__(self, vendor: str, config_lines: int, latency_ms: float, jitter_ms: float,
+                 bandwidth_bps: float, serial: bool, tmpdir: str):
+        self.ports = {"SSH2": _free_port(), "Telnet": _free_port()}
+        cmd = [sys.executable, SIMULATOR, "--vendor", vendor,
+               "--ssh-port", str(self.ports["SSH2"]), "--telnet-port", str(self.ports["Telnet"]),
+               "--config-lines", str(config_lines), "--latency-ms", str(latency_ms),
+               "--jitter-ms", str(jitter_ms), "--bandwidth-bps", str(bandwidth_bps)]
+        if serial:
+            self.ports["Serial"] = os.path.join(tmpdir, f"tty_{vendor}_{config_lines}_{latency_ms:g}")
+            cmd += ["--serial-link", self.ports["Serial"]]
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        # El simulador imprime 'ready' cuando escucha (la configuración grande tarda en generarse)
+        line = self.proc.stdout.readline() if self.proc.stdout else ""
+        if line.strip() != "ready":
+            self.close()
+            raise RuntimeError(f"el simulador {vendor} no arrancó")
+
+    def close(self) -> None:
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+def _run_child(case: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    try:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-case", json.dumps(case)],
+                             capture_output=True, text=True, timeout=timeout, cwd=tempfile.gettempdir())
+    except subprocess.TimeoutExpired:
+        return {"ok": False, "error": f"timeout ({timeout:g}s)", "wall_s": timeout}
+    for line in reversed(out.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    return {"ok": False, "error": (out.stderr.strip().splitlines() or ["sin salida"])[-1]}
+
+
+def _median_result(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [r for r in runs if r.get("ok")]
+    if not ok:
+        return dict(runs[-1], runs=len(runs))
+    ordered = sorted(ok, key=lambda r: r["wall_s"])
+    merged = dict(ordered[len(ordered) // 2])
+    merged["wall_s"] = round(statistics.median(r["wall_s"] for r in ok), 4)
+    merged["wall_min_s"] = ordered[0]["wall_s"]
+    merged["wall_max_s"] = ordered[-1]["wall_s"]
+    rss = [r["peak_rss_kb"] for r in ok if r.get("peak_rss_kb") is not None]
+    merged["peak_rss_kb"] = max(rss) if rss else None
+    merged["runs"] = len(runs)
+    merged["failed_runs"] = len(runs) - len(ok)
+    return merged
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[Tuple[str, float, float, float]]:
+    """Casos más lentos que la línea base: ``[(caso, base_s, actual_s, variación)]``."""
+    base = {r["key"]: r for r in baseline.get("results", []) if r.get("ok")}
+    regressions = []
+    for r in results:
+        old = base.get(r["key"])
+        if not old or not r.get("ok") or old["wall_s"] <= 0:
+            continue
+        change = (r["wall_s"] - old["wall_s"]) / old["wall_s"]
+        print(f"  {r['key']:<36} {old['wall_s']:>8.3f}s -> {r['wall_s']:>8.3f}s  {change * 100:+6.1f}%"
+              + ("  REGRESIÓN" if change > threshold else ""))
+        if change > threshold:
+            regressions.append((r["key"], old["wall_s"], r["wall_s"], change))
+    return regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark de análisis contra equipos simulados")
+    ap.add_argument("--vendors", default="cisco,huawei,juniper")
+    ap.add_argument("--protocols", default="SSH2,Telnet", help="SSH2, Telnet y/o Serial (pty, solo POSIX)")
+    ap.add_argument("--sizes", default="1k,50k,500k", help="Líneas de configuración, ej. 1k,50k,500k")
+    ap.add_argument("--latencies", default="0,50", help="Latencia del enlace en ms por comando")
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--bandwidth-bps", type=float, default=0.0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--fast", action="store_true", help="Analizar en fast_mode")
+    ap.add_argument("--timeout", type=float, default=600.0, help="Tope por análisis (s)")
+    ap.add_argument("--output", default="", help="JSON de resultados (para usarlo luego como línea base)")
+    ap.add_argument("--baseline", default="", help="JSON de una ejecución anterior")
+    ap.add_argument("--threshold", type=float, default=0.10, help="Regresión tolerada sobre la línea base (0.10 = 10%%)")
+    ap.add_argument("--run-case", dest="run_case", default="", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))), flush=True)
+        return
+
+    vendors = [v.strip() for v in args.vendors.split(",") if v.strip()]
+    protocols = [p.strip() for p in args.protocols.split(",") if p.strip()]
+    sizes = [_parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    latencies = [float(x) for x in args.latencies.split(",") if x.strip()]
+    if "Serial" in protocols and os.name != "posix":
+        print("[BENCH] Serial requiere pty (POSIX); se omite.", file=sys.stderr)
+        protocols.remove("Serial")
+
+    results: List[Dict[str, Any]] = []
+    started = time.time()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for vendor in vendors:
+            for size in sizes:
+                for latency in latencies:
+                    sim = Simulator(vendor, size, latency, args.jitter_ms, args.bandwidth_bps, "Serial" in protocols, tmpdir)
+                    try:
+                        for protocol in protocols:
+                            case = {"vendor": vendor, "protocol": protocol, "config_lines": size,
+                                    "latency_ms": latency, "port": sim.ports[protocol], "fast": args.fast}
+                            runs = [_run_child(case, args.timeout) for _ in range(max(1, args.repeat))]
+                            result = dict(case, key=_case_key(case), **_median_result(runs))
+                            result.pop("port", None)
+                            results.append(result)
+                            status = "OK" if result.get("ok") else f"ERROR ({result.get('error', '')})"
+                            print(f"[BENCH] {result['key']:<36} {result['wall_s']:>8.3f}s "
+                                  f"rt={result.get('round_trips', '-')} bytes={result.get('bytes', '-')} "
+                                  f"rss={result.get('peak_rss_kb', '-')}KiB {status}", flush=True)
+                    finally:
+                        sim.close()
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "fast": args.fast,
+            "jitter_ms": args.jitter_ms,
+            "bandwidth_bps": args.bandwidth_bps,
+            "elapsed_s": round(time.time() - started, 2),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"[BENCH] Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"[BENCH] Comparación con {args.baseline} (umbral {args.threshold * 100:.0f}%):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"[BENCH] {len(regressions)} caso(s) más lentos que la línea base.")
+            sys.exit(1)
+        print("[BENCH] Sin regresiones.")
+
+
+if __name__ == "__main__":
+    main()
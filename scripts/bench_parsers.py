@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Micro-benchmark de los parsers de ``modules/router_analyzer/parsers.py``.
+
+Mide cada función ``parse_*`` del módulo con salidas sintéticas
+(``synthetic_outputs.py``): configuraciones Cisco/Huawei con N interfaces,
+M VRFs y K vecinos BGP y tablas de 'show'/'display' de ``--rows`` filas.
+Las secciones filtradas ('| sec ospf', '| include ip route-static'...) se
+derivan de la configuración con los mismos filtros locales que usa el
+análisis. La caché de parseo se evita llamando a la función original
+(``__wrapped__``) y el índice de configuración se vacía antes de cada
+ejecución, así cada repetición parsea (e indexa) de verdad.
+
+Métricas por parser:
+- best_s / median_s: mejor tiempo y mediana de ``--repeat`` ejecuciones
+- lines_per_s: líneas de entrada por segundo (con el mejor tiempo)
+- items: elementos devueltos (filas de la lista o, en dicts, suma de sus listas)
+- peak_kib: memoria pico asignada durante un parseo (tracemalloc)
+- blocks: bloques de memoria que siguen vivos tras el parseo (el resultado)
+
+Uso:
+    python scripts/bench_parsers.py
+    python scripts/bench_parsers.py --interfaces 20000 --vrfs 200 --bgp-neighbors 5000 --rows 50000
+    python scripts/bench_parsers.py --only bgp --repeat 10 --output parsers.json
+
+Un parser nuevo sin entrada sintética se avisa y el proceso termina con
+código 1: añade su generador en ``build_inputs``.
+"""
+
+import argparse
+import gc
+import inspect
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic_outputs as synth  # noqa: E402
+from modules.router_analyzer import parsers  # noqa: E402
+from modules.router_analyzer import vendor_commands as vc  # noqa: E402
+from modules.router_analyzer.config_filters import apply_config_filter  # noqa: E402
+from modules.router_analyzer.config_index import clear_index_cache  # noqa: E402
+
+
+def _filtered(config: str, command: str) -> str:
+    """Salida de ``command`` ('show running-config | sec ospf') derivada de ``config``."""
+    pipe_filter = command.split("|", 1)[1].strip()
+    out = apply_config_filter(config, pipe_filter)
+    if out is None:
+        raise SystemExit(f"Filtro no soportado localmente: {command!r}")
+    return out
+
+
+def build_inputs(args: argparse.Namespace) -> Dict[str, str]:
+    """Entrada sintética de cada parser, tal como le llega desde el análisis."""
+    sizes = {"interfaces": args.interfaces, "vrfs": args.vrfs,
+             "bgp_neighbors": args.bgp_neighbors, "static_routes": args.static_routes}
+    cisco_cfg = synth.cisco_running_config(**sizes)
+    huawei_cfg = synth.huawei_running_config(**sizes)
+    return {
+        "parse_huawei_ip_interface_brief": synth.huawei_ip_interface_brief(args.rows),
+        "parse_huawei_version": synth.huawei_version(),
+        "parse_huawei_static_routes": _filtered(huawei_cfg, vc.STATIC_ROUTES["huawei"]),
+        "parse_huawei_ospf_config": _filtered(huawei_cfg, vc.OSPF_CONFIG_SECTION["huawei"]),
+        "parse_huawei_bgp_config": _filtered(huawei_cfg, vc.BGP_CONFIG_SECTION["huawei"]),
+        "parse_huawei_bgp_peer": synth.huawei_bgp_peer(args.rows),
+        "parse_huawei_ospf_peer": synth.huawei_ospf_peer(args.rows),
+        "parse_cisco_ip_interface_brief": synth.cisco_ip_interface_brief(args.rows),
+        "parse_cisco_interface_section": _filtered(cisco_cfg, vc.INTERFACE_CONFIG_SECTION["cisco"]),
+        "parse_cisco_version": synth.cisco_version(),
+        "parse_cisco_static_routes": _filtered(cisco_cfg, vc.STATIC_ROUTES["cisco"]),
+        "parse_cisco_ospf_config": _filtered(cisco_cfg, vc.OSPF_CONFIG_SECTION["cisco"]),
+        "parse_cisco_bgp_config": _filtered(cisco_cfg, vc.BGP_CONFIG_SECTION["cisco"]),
+        "parse_cisco_ospf_neighbor": synth.cisco_ospf_neighbor(args.rows),
+        "parse_cisco_bgp_summary": synth.cisco_bgp_summary(args.rows),
+        "parse_juniper_interfaces_terse": synth.juniper_interfaces_terse(args.rows),
+        "parse_juniper_version": synth.juniper_version(),
+    }
+
+
+def discover_parsers() -> Dict[str, Callable[[str], Any]]:
+    """Funciones ``parse_*`` públicas del módulo, sin la caché de parseo."""
+    found: Dict[str, Callable[[str], Any]] = {}
+    for name, fn in inspect.getmembers(parsers, inspect.isfunction):
+        if name.startswith("parse_") and fn.__module__ == parsers.__name__:
+            found[name] = getattr(fn, "__wrapped__", fn)
+    return found
+
+
+def _count_items(result: Any) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        # Configuración: suma de sus listas ('processes', 'neighbors'...); versión: campos reconocidos
+        lists = [len(v) for v in result.values() if isinstance(v, list)]
+        return sum(lists) if lists else sum(1 for v in result.values() if v not in ("", "N/A"))
+    return 0
+
+
+def measure(fn: Callable[[str], Any], text: str, repeat: int) -> Dict[str, Any]:
+    times: List[float] = []
+    result: Any = None
+    for _ in range(repeat):
+        result = None
+        clear_index_cache()
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn(text)
+        times.append(time.perf_counter() - t0)
+    items = _count_items(result)
+    result = None
+
+    # Memoria en una ejecución aparte: tracemalloc ralentiza mucho el parseo
+    clear_index_cache()
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = fn(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    clear_index_cache()
+    gc.collect()
+    blocks = sys.getallocatedblocks() - blocks_before
+    result = None
+
+    lines = text.count("\n") + 1
+    best = min(times)
+    return {
+        "lines": lines,
+        "chars": len(text),
+        "items": items,
+        "best_s": round(best, 6),
+        "median_s": round(statistics.median(times), 6),
+        "lines_per_s": round(lines / best) if best > 0 else 0,
+        "peak_kib": round(peak / 1024, 1),
+        "blocks": blocks,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Micro-benchmark de los parsers con salidas sintéticas")
+    ap.add_argument("--interfaces", type=int, default=5000, help="Interfaces de las configuraciones")
+    ap.add_argument("--vrfs", type=int, default=100, help="VRFs de las configuraciones")
+    ap.add_argument("--bgp-neighbors", type=int, default=2000, help="Vecinos BGP de las configuraciones")
+    ap.add_argument("--static-routes", type=int, default=5000, help="Rutas estáticas de las configuraciones")
+    ap.add_argument("--rows", type=int, default=50000, help="Filas de las tablas de estado")
+    ap.add_argument("--repeat", type=int, default=5, help="Repeticiones por parser")
+    ap.add_argument("--only", default="", help="Expresión regular: solo parsers cuyo nombre coincida")
+    ap.add_argument("--output", default="", help="Guardar los resultados en este JSON")
+    args = ap.parse_args()
+
+    found = discover_parsers()
+    inputs = build_inputs(args)
+    missing = sorted(set(found) - set(inputs))
+    for name in missing:
+        print(f"AVISO: {name} no tiene entrada sintética (añádela en build_inputs)")
+
+    selected = [name for name in sorted(found) if name in inputs and re.search(args.only, name)]
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'parser':<34} {'líneas':>8} {'items':>7} {'mejor':>9} {'mediana':>9} "
+          f"{'líneas/s':>11} {'pico KiB':>10} {'bloques':>8}")
+    for name in selected:
+        r = measure(found[name], inputs[name], max(1, args.repeat))
+        results[name] = r
+        print(f"{name:<34} {r['lines']:>8} {r['items']:>7} {r['best_s'] * 1000:>7.1f}ms "
+              f"{r['median_s'] * 1000:>7.1f}ms {r['lines_per_s']:>11,} {r['peak_kib']:>10,.1f} {r['blocks']:>8}")
+
+    if args.output:
+        report = {
+            "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "params": {k: getattr(args, k) for k in ("interfaces", "vrfs", "bgp_neighbors",
+                                                     "static_routes", "rows", "repeat")},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Resultados en {args.output}")
+    if missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+"""Simulador local de routers (Cisco IOS, Huawei VRP, Junos) para pruebas offline.
+
+Sirve la personalidad de un fabricante por SSH (paramiko), Telnet y consola
+serie (par pty, solo POSIX), con login, modo enable de Cisco, paginación
+('--More--', '---- More ----', '---(more)---') hasta recibir el comando de
+deshabilitarla, filtros '| include' / '| section' y enlace configurable
+(latencia, jitter y ancho de banda). Las salidas por defecto son mínimas; con
+``--transcripts`` se reproducen salidas grabadas de equipos reales.
+
+Uso:
+    python scripts/device_simulator.py --vendor cisco --ssh-port 2201 --telnet-port 2301 \\
+        --serial-link /tmp/ttyR1 --latency-ms 40 --jitter-ms 10 --bandwidth-bps 115200
+
+    python main.py --cli --hostname 127.0.0.1 --port 2201 --username admin --password admin
+
+Formato de ``--transcripts`` (JSON): ``{"comando": "salida", ...}`` o
+``{"vendor": ..., "hostname": ..., "commands": {"comando": "salida", ...}}``.
+La salida grabada de la configuración ('show running-config',
+'display current-configuration'...) sustituye a la configuración sintética.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import threading
+import time
+from typing import Dict, Any, List, Optional, Callable
+
+try:
+    import paramiko  # type: ignore
+except Exception:
+    paramiko = None  # type: ignore
+
+
+def _synthetic_running_config(vendor: str, lines: int) -> str:
+    """Configuración sintética de unas ``lines`` líneas (interfaces + OSPF/BGP/rutas)."""
+    out: List[str] = []
+    count = 0
+
+    def _add(text: str) -> None:
+        nonlocal count
+        out.append(text)
+        count += text.count("\n") + 1
+
+    if vendor == "huawei":
+        _add("#\nsysname HUAWEI\n#")
+        i = 0
+        while count < lines - 18:
+            _add(f"interface GigabitEthernet0/0/{i}\n ip address 10.{(i >> 8) & 255}.{i & 255}.1 255.255.255.0\n#")
+            i += 1
+        _add("ospf 1 router-id 1.1.1.1\n area 0.0.0.0\n  network 10.0.0.0 0.0.0.255\n#")
+        _add("bgp 65000\n router-id 1.1.1.1\n peer 10.0.0.2 as-number 65001\n #\n ipv4-family unicast\n  undo synchronization\n  network 10.0.0.0 255.255.255.0\n  peer 10.0.0.2 enable\n #\n ipv4-family vpnv4 vpn-instance CLI\n  peer 10.9.0.2 as-number 65009\n#")
+        _add("ip route-static 0.0.0.0 0.0.0.0 10.0.0.254\n#\nreturn")
+    elif vendor == "juniper":
+        _add("system {\n    host-name mx;\n}\ninterfaces {")
+        i = 0
+        while count < lines - 1:
+            _add(f"    ge-0/0/{i} {{\n        unit 0 {{\n            family inet {{\n                address 10.{(i >> 8) & 255}.{i & 255}.1/24;\n            }}\n        }}\n    }}")
+            i += 1
+        _add("}")
+    else:
+        _add("!\nhostname R1\n!")
+        i = 0
+        while count < lines - 20:
+            _add(f"interface GigabitEthernet0/{i}\n ip address 10.{(i >> 8) & 255}.{i & 255}.1 255.255.255.0\n!")
+            i += 1
+        _add("router ospf 1\n router-id 1.1.1.1\n network 10.0.0.0 0.0.0.255 area 0\n!")
+        _add("router bgp 65000\n bgp router-id 1.1.1.1\n neighbor 10.0.0.2 remote-as 65001\n !\n address-family ipv4\n  network 10.0.0.0 mask 255.255.255.0\n  neighbor 10.0.0.2 activate\n exit-address-family\n !\n address-family ipv4 vrf CLI\n  neighbor 10.9.0.2 remote-as 65009\n exit-address-family\n!")
+        _add("ip route 0.0.0.0 0.0.0.0 10.0.0.254\n!\nend")
+    return "\n".join(out)
+
+
+PERSONALITIES: Dict[str, Dict[str, Any]] = {
+    "cisco": {
+        "ssh_version": "SSH-2.0-Cisco-1.25",
+        "hostname": "R1",
+        "user_prompt": "{h}>",
+        "enable_prompt": "{h}#",
+        "needs_enable": True,
+        "login_user": "Username: ",
+        "login_pass": "Password: ",
+        "more": " --More-- ",
+        "paging_cmd": "terminal length 0",
+        "comment": "!",
+        "error": "% Invalid input detected at '^' marker.",
+        "commands": {
+            "show version": "Cisco IOS Software, C2900 Software (C2900-UNIVERSALK9-M), Version 15.2(2)E\nR1 uptime is 32 minutes\nCisco 2911 (revision 1.0) processor with 524288K/131072K bytes of memory.\n512 Kbytes of flash",
+            "show ip interface brief": "Interface              IP-Address      OK? Method Status                Protocol\nGigabitEthernet0/0     10.0.0.1        YES manual up                    up\nGigabitEthernet0/1     unassigned      YES unset  administratively down down\nLoopback0              1.1.1.1         YES manual up                    up",
+            "show ip ospf neighbor": "Neighbor ID     Pri   State           Dead Time   Address         Interface\n2.2.2.2           1   FULL/DR         00:00:33    10.0.0.2        GigabitEthernet0/0",
+            "show ip bgp summary": "BGP router identifier 1.1.1.1, local AS number 65000\nNeighbor        V           AS MsgRcvd MsgSent   TblVer  InQ OutQ Up/Down  State/PfxRcd\n10.0.0.2        4        65001     120     118       12    0    0 01:40:12        5",
+        },
+    },
+    "huawei": {
+        "ssh_version": "SSH-2.0-HUAWEI-1.5",
+        "hostname": "HUAWEI",
+        "user_prompt": "<{h}>",
+        "enable_prompt": "<{h}>",
+        "needs_enable": False,
+        "login_user": "Username:",
+        "login_pass": "Password:",
+        "more": "  ---- More ----",
+        "paging_cmd": "screen-length 0 temporary",
+        "comment": "#",
+        "error": "Error: Unrecognized command found at '^' position.",
+        "commands": {
+            "display version": "Huawei Versatile Routing Platform Software\nVRP (R) software, Version 5.160 (AR2200 V200R009C00SPC500)\nHuawei AR2220 Router uptime is 0 week, 1 day, 2 hours, 3 minutes\nBoard Type : AR2220\nSDRAM Memory Size : 512 M bytes",
+            "display ip interface brief": "Interface                         IP Address/Mask      Physical   Protocol\nGigabitEthernet0/0/0              10.0.0.1/24          up         up\nLoopBack0                         1.1.1.1/32           up         up(s)",
+            "display ospf peer": "OSPF Process 1 with Router ID 1.1.1.1\n Neighbors\n Area 0.0.0.0 interface 10.0.0.1(GigabitEthernet0/0/0)'s neighbors\n Router ID: 2.2.2.2          Address: 10.0.0.2\n   State: Full  Mode:Nbr is  Master  Priority: 1\n   Dead timer due in 35  sec",
+            "display bgp peer": " BGP local router ID : 1.1.1.1\n Local AS number : 65000\n  Peer            V          AS  MsgRcvd  MsgSent  OutQ  Up/Down       State  PrefRcv\n  10.0.0.2        4       65001      120      118     0 01:40:12 Established        5",
+        },
+    },
+    "juniper": {
+        "ssh_version": "SSH-2.0-OpenSSH_7.5",
+        "hostname": "mx",
+        "user_prompt": "lab@{h}>",
+        "enable_prompt": "lab@{h}>",
+        "needs_enable": False,
+        "login_user": "login: ",
+        "login_pass": "Password:",
+        "more": "---(more)---",
+        "paging_cmd": "set cli screen-length 0",
+        "comment": "#",
+        "error": "error: unknown command",
+        "commands": {
+            "show version": "Hostname: mx\nModel: mx480\nJunos: 19.4R1.10\nJUNOS Software Release [19.4R1.10]",
+            "show interfaces terse": "Interface               Admin Link Proto    Local                 Remote\nge-0/0/0                up    up\nge-0/0/0.0              up    up   inet     10.0.0.1/24",
+        },
+    },
+}
+
+
+# Comandos que devuelven la configuración completa (sintética o grabada)
+_RUNNING_CONFIG_COMMANDS = ("show running-config", "display current-configuration", "show configuration", "show run")
+
+
+def load_transcripts(paths: List[str]) -> Dict[str, Any]:
+    """Lee los archivos de ``--transcripts`` y los fusiona (el último gana).
+
+    Devuelve ``{"vendor", "hostname", "commands"}``; vendor/hostname vacíos si
+    ningún archivo los indica.
+    """
+    merged: Dict[str, Any] = {"vendor": "", "hostname": "", "commands": {}}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: se esperaba un objeto JSON")
+        commands = data.get("commands") if isinstance(data.get("commands"), dict) else data
+        for cmd, out in commands.items():
+            if isinstance(out, str):
+                merged["commands"][" ".join(cmd.split())] = out
+        for key in ("vendor", "hostname"):
+            if isinstance(data.get(key), str) and data[key]:
+                merged[key] = data[key].lower() if key == "vendor" else data[key]
+    return merged
+
+
+class LinkProfile:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, bandwidth_bps: float = 0.0):
+        self.latency = max(0.0, latency_ms) / 1000.0
+        self.jitter = max(0.0, jitter_ms) / 1000.0
+        self.bandwidth = max(0.0, bandwidth_bps)
+
+    def delay(self) -> None:
+        d = self.latency + (random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if d > 0:
+            time.sleep(d)
+
+    def throttle(self, nbytes: int) -> None:
+        if self.bandwidth > 0 and nbytes:
+            time.sleep((nbytes * 8.0) / self.bandwidth)
+
+
+class DeviceSession:
+    """Intérprete de CLI de un equipo simulado sobre un flujo de bytes."""
+
+    PAGE_LINES = 24
+
+    def __init__(self, vendor: str, write: Callable[[bytes], None], read: Callable[[], bytes],
+                 link: LinkProfile, username: str = "", password: str = "", running_config: str = "",
+                 transcripts: Optional[Dict[str, str]] = None, ask_login: bool = False, eol: bytes = b"\r\n",
+                 wake: bool = False, enable_password: str = "", hostname: str = "", page_lines: int = 0):
+        self.vendor = vendor
+        self.p = PERSONALITIES[vendor]
+        self._write_raw = write
+        self._read_raw = read
+        self.link = link
+        self.username = username
+        self.password = password
+        self.enable_password = enable_password or password
+        self.hostname = hostname or self.p["hostname"]
+        self.page_lines = page_lines or self.PAGE_LINES
+        self.ask_login = ask_login
+        self.enabled = not self.p["needs_enable"]
+        self.paging = True
+        self.running_config = running_config or _synthetic_running_config(vendor, 60)
+        self.commands = dict(self.p["commands"])
+        self.commands.update(transcripts or {})
+        self._pending = b""
+        self.eol = eol
+        self.wake = wake
+        self.closed = False
+
+    # --- E/S ---
+    def write(self, text: str) -> None:
+        data = text.replace("\r\n", "\n").replace("\n", "\r\n").encode("utf-8")
+        step = 64 if self.link.bandwidth else 4096
+        for i in range(0, len(data), step):
+            chunk = data[i:i + step]
+            self.link.throttle(len(chunk))
+            self._write_raw(chunk)
+
+    def _readline(self, echo: bool = True) -> Optional[str]:
+        while True:
+            m = re.search(rb"[\r\n]", self._pending)
+            if m:
+                line = self._pending[:m.start()]
+                rest = self._pending[m.end():]
+                if m.group(0) == b"\r" and rest[:1] in (b"\n", b"\x00"):
+                    rest = rest[1:]
+                self._pending = rest
+                text = line.decode("utf-8", "ignore")
+                if echo:
+                    self.write(text + "\n")
+                return text
+            data = self._read_raw()
+            if not data:
+                self.closed = True
+                return None
+            self._pending += data
+
+    def _read_key(self) -> Optional[bytes]:
+        if not self._pending:
+            data = self._read_raw()
+            if not data:
+                self.closed = True
+                return None
+            self._pending += data
+        key, self._pending = self._pending[:1], self._pending[1:]
+        return key
+
+    def prompt(self) -> str:
+        fmt = self.p["enable_prompt"] if self.enabled else self.p["user_prompt"]
+        return fmt.format(h=self.hostname)
+
+    # --- Sesión ---
+    def login(self) -> bool:
+        if not self.ask_login:
+            return True
+        for _ in range(3):
+            self.write(self.p["login_user"])
+            user = self._readline()
+            if user is None:
+                return False
+            self.write(self.p["login_pass"])
+            pw = self._readline(echo=False)
+            if pw is None:
+                return False
+            self.write("\n")
+            if user.strip() == self.username and pw.strip() == self.password:
+                return True
+            self.write("% Authentication failed\n")
+        return False
+
+    def serve(self) -> None:
+        if self.wake:
+            # Consola serie: el equipo no habla hasta recibir un retorno de carro
+            if self._readline(echo=False) is None:
+                return
+        if not self.login():
+            return
+        self.write("\n" + self.prompt())
+        while not self.closed:
+            line = self._readline()
+            if line is None:
+                break
+            cmd = line.strip()
+            if not cmd:
+                self.write(self.prompt())
+                continue
+            if cmd in ("exit", "quit", "logout"):
+                break
+            self.link.delay()
+            out = self.execute(cmd)
+            if out is None:
+                break
+            if out:
+                self._page(out.rstrip("\n") + "\n")
+            self.write(self.prompt())
+
+    def _page(self, text: str) -> None:
+        lines = text.splitlines(True)
+        if not self.paging:
+            self.write(text)
+            return
+        i = 0
+        while i < len(lines):
+            self.write("".join(lines[i:i + self.page_lines]))
+            i += self.page_lines
+            if i < len(lines):
+                self.write(self.p["more"])
+                key = self._read_key()
+                if key is None:
+                    return
+                self.write("\b" * len(self.p["more"]) + " " * len(self.p["more"]) + "\b" * len(self.p["more"]))
+                if key in (b"q", b"Q"):
+                    return
+
+    def execute(self, cmd: str) -> Optional[str]:
+        if cmd.startswith(self.p["comment"]):
+            return ""
+        low = cmd.lower()
+        if low == self.p["paging_cmd"]:
+            self.paging = False
+            return ""
+        if self.p["needs_enable"] and low in ("enable", "en"):
+            if not self.enabled:
+                self.write("Password: ")
+                pw = self._readline(echo=False)
+                if pw is None:
+                    return None
+                self.write("\n")
+                if pw.strip() == self.enable_password:
+                    self.enabled = True
+                else:
+                    return "% Access denied"
+            return ""
+        # Salida grabada del comando completo (con filtro incluido) o filtro local
+        recorded = self.commands.get(" ".join(cmd.split()))
+        if recorded is not None:
+            return recorded
+        base, _, flt = cmd.partition("|")
+        base = " ".join(base.split())
+        flt = flt.strip()
+        text = self._lookup(base)
+        if text is None:
+            return "          ^\n" + self.p["error"]
+        if flt:
+            text = self._filter(text, flt)
+        return text
+
+    def _lookup(self, base: str) -> Optional[str]:
+        if base in self.commands:
+            return self.commands[base]
+        if base in _RUNNING_CONFIG_COMMANDS:
+            return self.running_config
+        if base in ("show ip bgp sum",):
+            return self.commands.get("show ip bgp summary", "")
+        return None
+
+    @staticmethod
+    def _filter(text: str, flt: str) -> str:
+        parts = flt.split(None, 1)
+        if len(parts) < 2:
+            return text
+        op, arg = parts[0].lower(), parts[1]
+        for prefix in ("include ", "inc "):
+            if arg.lower().startswith(prefix):
+                arg = arg[len(prefix):]
+        arg = arg.strip("'\"")
+        lines = text.splitlines()
+        if op in ("include", "inc", "i", "match"):
+            return "\n".join(l for l in lines if re.search(arg, l))
+        if op in ("section", "sec"):
+            out: List[str] = []
+            block: List[str] = []
+
+            def _flush() -> None:
+                if block and any(re.search(arg, b) for b in block):
+                    out.extend(block)
+
+            for l in lines:
+                if l and not l[0].isspace():
+                    _flush()
+                    block = [l]
+                elif l.strip():
+                    block.append(l)
+            _flush()
+            return "\n".join(out)
+        return text
+
+
+# ----------------------- Transportes -----------------------
+
+def _new_session(args: argparse.Namespace, write: Callable[[bytes], None], read: Callable[[], bytes],
+                 link: LinkProfile, **kwargs: Any) -> DeviceSession:
+    return DeviceSession(args.vendor, write, read, link, args.username, args.password,
+                         running_config=args.running_config_text, transcripts=args.transcript_commands,
+                         enable_password=args.enable_password, hostname=args.hostname,
+                         page_lines=args.page_lines, **kwargs)
+
+
+def _serve_telnet(sock: socket.socket, args: argparse.Namespace, link: LinkProfile) -> None:
+    def _read() -> bytes:
+        while True:
+            try:
+                data = sock.recv(4096)
+            except Exception:
+                return b""
+            if not data:
+                return b""
+            # Eliminar negociaciones IAC del cliente
+            out = bytearray()
+            i = 0
+            while i < len(data):
+                b = data[i]
+                if b == 255 and i + 1 < len(data):
+                    cmd = data[i + 1]
+                    if cmd in (251, 252, 253, 254):
+                        i += 3
+                        continue
+                    if cmd == 250:
+                        end = data.find(b"\xff\xf0", i)
+                        i = (end + 2) if end >= 0 else len(data)
+                        continue
+                    i += 2
+                    continue
+                out.append(b)
+                i += 1
+            if out:
+                return bytes(out)
+
+    def _write(data: bytes) -> None:
+        try:
+            sock.sendall(data)
+        except Exception:
+            pass
+
+    sess = _new_session(args, _write, _read, link, ask_login=bool(args.username))
+    try:
+        sess.serve()
+    finally:
+        try:
+            sock.close()
+        except Exception:
+            pass
+
+
+class _SSHServer(paramiko.ServerInterface if paramiko else object):  # type: ignore
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.event = threading.Event()
+        self.exec_cmd: Optional[str] = None
+        self.shell_ids: set = set()
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED if kind == "session" else paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_auth_password(self, username, password):
+        if (not self.args.username) or (username == self.args.username and password == self.args.password):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_shell_request(self, channel):
+        self.shell_ids.add(channel.get_id())
+        self.event.set()
+        return True
+
+    def check_channel_pty_request(self, *a, **k):
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        if self.args.no_exec:
+            return False
+        cmd = command.decode("utf-8", "ignore") if isinstance(command, bytes) else str(command)
+        threading.Thread(target=_serve_exec, args=(channel, cmd, self.args), daemon=True).start()
+        return True
+
+
+def _serve_exec(chan: Any, cmd: str, args: argparse.Namespace) -> None:
+    # Esperar a que paramiko confirme la petición exec antes de responder
+    time.sleep(0.05)
+    link = LinkProfile(args.latency_ms, args.jitter_ms, args.bandwidth_bps)
+    sess = _new_session(args, lambda b: chan.sendall(b), lambda: b"", link)
+    sess.enabled = True
+    sess.paging = False
+    link.delay()
+    out = sess.execute(cmd.strip()) or ""
+    try:
+        sess.write(out.rstrip("\n") + "\n")
+        chan.send_exit_status(0)
+    except Exception:
+        pass
+    try:
+        chan.close()
+    except Exception:
+        pass
+
+
+_HOST_KEY = None
+
+
+def _serve_ssh(sock: socket.socket, args: argparse.Namespace, link: LinkProfile) -> None:
+    t = paramiko.Transport(sock)
+    t.local_version = PERSONALITIES[args.vendor]["ssh_version"]
+    t.add_server_key(_HOST_KEY)
+    server = _SSHServer(args)
+    try:
+        t.start_server(server=server)
+    except Exception:
+        return
+    # Los canales exec se atienden en su propio hilo; servir el primer shell
+    chan = None
+    deadline = time.time() + 30
+    while chan is None and time.time() < deadline:
+        c = t.accept(1)
+        if c is None:
+            if not t.is_active():
+                return
+            continue
+        end = time.time() + 1.0
+        while time.time() < end and c.get_id() not in server.shell_ids and not c.closed:
+            time.sleep(0.01)
+        if c.get_id() in server.shell_ids:
+            chan = c
+    if chan is None:
+        return
+
+    def _read() -> bytes:
+        try:
+            return chan.recv(4096)
+        except Exception:
+            return b""
+
+    def _write(data: bytes) -> None:
+        try:
+            chan.sendall(data)
+        except Exception:
+            pass
+
+    sess = _new_session(args, _write, _read, link)
+    try:
+        sess.serve()
+    finally:
+        try:
+            chan.close()
+            t.close()
+        except Exception:
+            pass
+
+
+def _serve_serial(path: str, args: argparse.Namespace, link: LinkProfile) -> None:
+    import pty
+    import tty
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    if os.path.lexists(path):
+        os.remove(path)
+    os.symlink(os.ttyname(slave), path)
+
+    def _read() -> bytes:
+        try:
+            return os.read(master, 4096)
+        except OSError:
+            return b""
+
+    def _write(data: bytes) -> None:
+        try:
+            os.write(master, data)
+        except OSError:
+            pass
+
+    def _loop() -> None:
+        while True:
+            sess = _new_session(args, _write, _read, link, ask_login=bool(args.username), wake=True)
+            sess.serve()
+            if sess.closed:
+                time.sleep(0.2)
+
+    threading.Thread(target=_loop, daemon=True).start()
+
+
+def _listen(host: str, port: int, handler: Callable[[socket.socket], None]) -> socket.socket:
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    srv.bind((host, port))
+    srv.listen(64)
+
+    def _loop() -> None:
+        while True:
+            try:
+                conn, _ = srv.accept()
+            except Exception:
+                return
+            threading.Thread(target=handler, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=_loop, daemon=True).start()
+    return srv
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Simulador de routers (Cisco IOS, Huawei VRP, Junos)")
+    ap.add_argument("--vendor", choices=sorted(PERSONALITIES), default="",
+                    help="Personalidad del equipo (por defecto la del transcript, o cisco)")
+    ap.add_argument("--host", default="127.0.0.1", help="Dirección de escucha SSH/Telnet")
+    ap.add_argument("--ssh-port", type=int, default=0)
+    ap.add_argument("--telnet-port", type=int, default=0)
+    ap.add_argument("--serial-link", default="", help="Crear consola serie (pty) y enlazarla en esta ruta")
+    ap.add_argument("--username", default="admin", help="Usuario ('' = sin login en Telnet/serie)")
+    ap.add_argument("--password", default="admin")
+    ap.add_argument("--enable-password", dest="enable_password", default="", help="Clave de enable (Cisco); por defecto --password")
+    ap.add_argument("--hostname", default="", help="Nombre del equipo en el prompt")
+    ap.add_argument("--transcripts", action="append", default=[], help="JSON de salidas grabadas (repetible)")
+    ap.add_argument("--running-config", dest="running_config", default="", help="Archivo con la configuración a servir")
+    ap.add_argument("--config-lines", type=int, default=60, help="Líneas de la configuración sintética")
+    ap.add_argument("--page-lines", type=int, default=DeviceSession.PAGE_LINES, help="Líneas por página antes de '--More--'")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="Retardo antes de responder cada comando")
+    ap.add_argument("--jitter-ms", type=float, default=0.0, help="Variación aleatoria (+/-) del retardo")
+    ap.add_argument("--bandwidth-bps", type=float, default=0.0, help="Ancho de banda de la salida (0 = sin límite)")
+    ap.add_argument("--no-exec", action="store_true", help="Rechazar canales exec SSH (solo shell)")
+    args = ap.parse_args()
+    recorded = load_transcripts(args.transcripts)
+    args.vendor = args.vendor or (recorded["vendor"] if recorded["vendor"] in PERSONALITIES else "cisco")
+    args.hostname = args.hostname or recorded["hostname"]
+    args.transcript_commands = recorded["commands"]
+    if args.running_config:
+        with open(args.running_config, "r", encoding="utf-8") as f:
+            args.running_config_text = f.read()
+    else:
+        args.running_config_text = _synthetic_running_config(args.vendor, args.config_lines)
+    if args.ssh_port and paramiko is None:
+        ap.error("--ssh-port requiere paramiko")
+    if args.serial_link and os.name != "posix":
+        ap.error("--serial-link requiere un sistema POSIX (pty)")
+    link = LinkProfile(args.latency_ms, args.jitter_ms, args.bandwidth_bps)
+    if args.ssh_port:
+        # Clave de host generada antes de anunciar 'ready' (no en la primera conexión)
+        global _HOST_KEY
+        _HOST_KEY = paramiko.RSAKey.generate(2048)
+        _listen(args.host, args.ssh_port, lambda s: _serve_ssh(s, args, link))
+    if args.telnet_port:
+        _listen(args.host, args.telnet_port, lambda s: _serve_telnet(s, args, link))
+    if args.serial_link:
+        _serve_serial(args.serial_link, args, link)
+    print("ready", flush=True)
+    while True:
+        time.sleep(3600)
+
+
+if __name__ == "__main__":
+    main()
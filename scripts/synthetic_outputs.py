@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""Salidas sintéticas realistas de Cisco IOS, Huawei VRP y Junos.
+
+Generan configuraciones completas (interfaces, VRFs, OSPF, BGP con vecinos
+globales y por VRF, rutas estáticas) y tablas de 'show'/'display' de
+cualquier tamaño para medir los parsers y alimentar el simulador sin
+equipos reales. Son deterministas: los mismos parámetros dan el mismo texto.
+
+Uso:
+    python scripts/synthetic_outputs.py cisco_running_config --interfaces 2000 --vrfs 50 --bgp-neighbors 500
+    python scripts/synthetic_outputs.py huawei_bgp_peer --rows 50000 > bgp_peer.txt
+
+Las configuraciones sirven tal cual para ``device_simulator.py --running-config``.
+"""
+
+import argparse
+import inspect
+import sys
+from typing import Callable, Dict, List
+
+
+def _ip(first: int, n: int, last: int = -1) -> str:
+    """Dirección ``first.x.y.z`` a partir de un índice (``last`` fija el último octeto)."""
+    if last >= 0:
+        return f"{first}.{(n >> 8) & 255}.{n & 255}.{last}"
+    return f"{first}.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+def _vrf_name(n: int) -> str:
+    return f"VRF{n:04d}"
+
+
+def _vrf_of(n: int, vrfs: int) -> int:
+    """Reparto de interfaces/vecinos: 0 = global, 1..vrfs = VRF."""
+    return n % (vrfs + 1) if vrfs else 0
+
+
+def _cisco_ifname(n: int) -> str:
+    return f"GigabitEthernet{n // 48}/{n % 48}"
+
+
+def _huawei_ifname(n: int) -> str:
+    return f"GigabitEthernet{n // 2304}/{(n // 48) % 48}/{n % 48}"
+
+
+def _pad(value: str, width: int) -> str:
+    return value + " " * max(1, width - len(value))
+
+
+# ---------------- Configuraciones -----------------
+
+def cisco_running_config(interfaces: int = 1000, vrfs: int = 10, bgp_neighbors: int = 100,
+                         static_routes: int = 100) -> str:
+    """'show running-config' de IOS con ``interfaces`` interfaces repartidas en ``vrfs`` VRFs."""
+    out: List[str] = ["Building configuration...", "", "Current configuration : 0 bytes", "!",
+                      "version 15.2", "service timestamps debug datetime msec", "hostname R1", "!"]
+    for v in range(1, vrfs + 1):
+        out += [f"ip vrf {_vrf_name(v)}", f" rd 65000:{v}", f" route-target export 65000:{v}",
+                f" route-target import 65000:{v}", "!"]
+    out += ["interface Loopback0", " ip address 1.1.1.1 255.255.255.255", "!"]
+    for i in range(interfaces):
+        out += [f"interface {_cisco_ifname(i)}", f" description Enlace {i} hacia CPE"]
+        vrf = _vrf_of(i, vrfs)
+        if vrf:
+            out.append(f" ip vrf forwarding {_vrf_name(vrf)}")
+        if i % 17 == 16:
+            out += [" no ip address", " shutdown"]
+        else:
+            out += [f" ip address {_ip(10, i, 1)} 255.255.255.252", " duplex auto", " speed auto"]
+        out.append("!")
+    out += ["router ospf 1", " router-id 1.1.1.1", " log-adjacency-changes"]
+    for i in range(0, interfaces, max(1, vrfs + 1)):
+        out.append(f" network {_ip(10, i, 0)} 0.0.0.3 area {i % 4}")
+    out += ["!", "router bgp 65000", " bgp router-id 1.1.1.1", " bgp log-neighbor-changes"]
+    per_vrf: Dict[int, List[int]] = {}
+    for n in range(bgp_neighbors):
+        per_vrf.setdefault(_vrf_of(n, vrfs), []).append(n)
+    for n in per_vrf.get(0, []):
+        out += [f" neighbor {_ip(172, n + 1)} remote-as {65001 + n % 1000}",
+                f" neighbor {_ip(172, n + 1)} description Peer {n}"]
+    out += [" !", " address-family ipv4", "  network 1.1.1.1 mask 255.255.255.255",
+            "  redistribute connected"]
+    out += [f"  neighbor {_ip(172, n + 1)} activate" for n in per_vrf.get(0, [])]
+    out += [" exit-address-family"]
+    for v in range(1, vrfs + 1):
+        out += [" !", f" address-family ipv4 vrf {_vrf_name(v)}", "  redistribute connected",
+                f"  network {_ip(192, v, 0)} mask 255.255.255.0"]
+        for n in per_vrf.get(v, []):
+            out += [f"  neighbor {_ip(172, n + 1)} remote-as {65001 + n % 1000}",
+                    f"  neighbor {_ip(172, n + 1)} activate"]
+        out.append(" exit-address-family")
+    out += ["!", "ip route 0.0.0.0 0.0.0.0 10.0.0.254"]
+    for r in range(static_routes):
+        vrf = _vrf_of(r, vrfs)
+        prefix = f"vrf {_vrf_name(vrf)} " if vrf else ""
+        out.append(f"ip route {prefix}{_ip(100, r, 0)} 255.255.255.0 {_ip(10, r, 2)}" + (" 200" if r % 5 == 0 else ""))
+    out += ["!", "line vty 0 4", " login local", " transport input ssh telnet", "!", "end"]
+    return "\n".join(out) + "\n"
+
+
+def huawei_running_config(interfaces: int = 1000, vrfs: int = 10, bgp_neighbors: int = 100,
+                          static_routes: int = 100) -> str:
+    """'display current-configuration' de VRP con el mismo reparto que la de Cisco."""
+    out: List[str] = ["!Software Version V200R009C00SPC500", "#", "sysname HUAWEI", "#"]
+    for v in range(1, vrfs + 1):
+        out += [f"ip vpn-instance {_vrf_name(v)}", " ipv4-family", f"  route-distinguisher 65000:{v}",
+                f"  vpn-target 65000:{v} export-extcommunity", f"  vpn-target 65000:{v} import-extcommunity", "#"]
+    out += ["interface LoopBack0", " ip address 1.1.1.1 255.255.255.255", "#"]
+    for i in range(interfaces):
+        out += [f"interface {_huawei_ifname(i)}", f" description Enlace {i} hacia CPE"]
+        vrf = _vrf_of(i, vrfs)
+        if vrf:
+            out.append(f" ip binding vpn-instance {_vrf_name(vrf)}")
+        if i % 17 == 16:
+            out.append(" shutdown")
+        else:
+            out.append(f" ip address {_ip(10, i, 1)} 255.255.255.252")
+        out.append("#")
+    out += ["ospf 1 router-id 1.1.1.1"]
+    for area in range(4):
+        out.append(f" area 0.0.0.{area}")
+        for i in range(area * (vrfs + 1), interfaces, 4 * (vrfs + 1)):
+            out.append(f"  network {_ip(10, i, 0)} 0.0.0.3")
+    out += ["#", "bgp 65000", " router-id 1.1.1.1"]
+    per_vrf: Dict[int, List[int]] = {}
+    for n in range(bgp_neighbors):
+        per_vrf.setdefault(_vrf_of(n, vrfs), []).append(n)
+    for n in per_vrf.get(0, []):
+        out += [f" peer {_ip(172, n + 1)} as-number {65001 + n % 1000}",
+                f" peer {_ip(172, n + 1)} description Peer {n}"]
+    out += [" #", " ipv4-family unicast", "  undo synchronization", "  network 1.1.1.1 255.255.255.255",
+            "  import-route ospf 1"]
+    out += [f"  peer {_ip(172, n + 1)} enable" for n in per_vrf.get(0, [])]
+    for v in range(1, vrfs + 1):
+        out += [" #", f" ipv4-family vpnv4 vpn-instance {_vrf_name(v)}", "  import-route direct",
+                f"  network {_ip(192, v, 0)} 255.255.255.0"]
+        out += [f"  peer {_ip(172, n + 1)} as-number {65001 + n % 1000}" for n in per_vrf.get(v, [])]
+    out += ["#", "ip route-static 0.0.0.0 0.0.0.0 10.0.0.254"]
+    for r in range(static_routes):
+        vrf = _vrf_of(r, vrfs)
+        prefix = f"vpn-instance {_vrf_name(vrf)} " if vrf else ""
+        out.append(f"ip route-static {prefix}{_ip(100, r, 0)} 24 {_ip(10, r, 2)}"
+                   + (" preference 200" if r % 5 == 0 else ""))
+    out += ["#", "user-interface vty 0 4", " authentication-mode aaa", " protocol inbound all", "#", "return"]
+    return "\n".join(out) + "\n"
+
+
+# ---------------- Tablas de estado -----------------
+
+def cisco_ip_interface_brief(rows: int = 50000) -> str:
+    out = ["Interface                  IP-Address      OK? Method Status                Protocol"]
+    for i in range(rows):
+        down = i % 17 == 16
+        ip = "unassigned" if down else _ip(10, i, 1)
+        status = "administratively down down    " if down else "up                    up      "
+        out.append(f"{_pad(_cisco_ifname(i), 27)}{_pad(ip, 16)}YES {'unset ' if down else 'manual'} {status}")
+    return "\n".join(out) + "\n"
+
+
+def huawei_ip_interface_brief(rows: int = 50000) -> str:
+    out = ["*down: administratively down", "^down: standby", "(l): loopback", "(s): spoofing",
+           f"The number of interface that is UP in Physical is {rows - rows // 17}",
+           f"The number of interface that is DOWN in Physical is {rows // 17}", "",
+           "Interface                         IP Address/Mask      Physical   Protocol  "]
+    for i in range(rows):
+        down = i % 17 == 16
+        ip = "unassigned" if down else f"{_ip(10, i, 1)}/30"
+        state = "*down      down" if down else "up         up"
+        out.append(f"{_pad(_huawei_ifname(i), 34)}{_pad(ip, 21)}{state}")
+    return "\n".join(out) + "\n"
+
+
+def juniper_interfaces_terse(rows: int = 50000) -> str:
+    """'show interfaces terse': una fila física y una lógica (unit 0) por interfaz."""
+    out = ["Interface               Admin Link Proto    Local                 Remote"]
+    for i in range(rows // 2):
+        name = f"ge-{i // 480}/{(i // 48) % 10}/{i % 48}"
+        link = "down" if i % 17 == 16 else "up"
+        out.append(f"{_pad(name, 24)}up    {link}")
+        out.append(f"{_pad(name + '.0', 24)}up    {_pad(link, 5)}inet     {_ip(10, i, 1)}/30")
+    return "\n".join(out) + "\n"
+
+
+def cisco_bgp_summary(rows: int = 50000) -> str:
+    out = ["BGP router identifier 1.1.1.1, local AS number 65000",
+           "BGP table version is 120, main routing table version 120",
+           f"{rows} network entries using {rows * 144} bytes of memory", "",
+           "Neighbor        V           AS MsgRcvd MsgSent   TblVer  InQ OutQ Up/Down  State/PfxRcd"]
+    for n in range(rows):
+        state = "Idle" if n % 23 == 22 else str(n % 500)
+        out.append(f"{_pad(_ip(172, n + 1), 16)}4 {65001 + n % 1000:>12} {120 + n % 7:>7} {118 + n % 5:>7} "
+                   f"{120:>8} {0:>4} {0:>4} 01:40:12 {state:>12}")
+    return "\n".join(out) + "\n"
+
+
+def huawei_bgp_peer(rows: int = 50000) -> str:
+    out = ["", " BGP local router ID : 1.1.1.1", " Local AS number : 65000",
+           f" Total number of peers : {rows}          Peers in established state : {rows - rows // 23}", "",
+           "  Peer            V          AS  MsgRcvd  MsgSent  OutQ  Up/Down       State  PrefRcv", ""]
+    for n in range(rows):
+        state = "Idle" if n % 23 == 22 else "Established"
+        out.append(f"  {_pad(_ip(172, n + 1), 16)}4 {65001 + n % 1000:>11} {120 + n % 7:>8} {118 + n % 5:>8} "
+                   f"{0:>5} 01:40:12 {state:>11} {n % 500:>8}")
+    return "\n".join(out) + "\n"
+
+
+def cisco_ospf_neighbor(rows: int = 50000) -> str:
+    out = ["", "Neighbor ID     Pri   State           Dead Time   Address         Interface"]
+    for n in range(rows):
+        state = "FULL/DR" if n % 3 else "FULL/BDR"
+        out.append(f"{_pad(_ip(2, n + 1), 16)}{1:<6}{_pad(state, 16)}00:00:{30 + n % 10}    "
+                   f"{_pad(_ip(10, n, 2), 16)}{_cisco_ifname(n)}")
+    return "\n".join(out) + "\n"
+
+
+def huawei_ospf_peer(rows: int = 50000) -> str:
+    """'display ospf peer' (detalle): un bloque de interfaz y vecino por fila."""
+    out = ["", "          OSPF Process 1 with Router ID 1.1.1.1", "                  Neighbors ", ""]
+    for n in range(rows):
+        out += [f" Area 0.0.0.{n % 4} interface {_ip(10, n, 1)}({_huawei_ifname(n)})'s neighbors",
+                f" Router ID: {_ip(2, n + 1)}          Address: {_ip(10, n, 2)}        ",
+                "   State: Full  Mode:Nbr is  Master  Priority: 1",
+                f"   DR: {_ip(10, n, 1)}  BDR: {_ip(10, n, 2)}  MTU: 0    ",
+                f"   Dead timer due in {30 + n % 10}  sec ",
+                "   Retrans timer interval: 5 ",
+                "   Neighbor is up for 00:05:00     ",
+                "   Authentication Sequence: [ 0 ] ", ""]
+    return "\n".join(out) + "\n"
+
+
+# ---------------- Versión -----------------
+
+def cisco_version() -> str:
+    return (
+        "Cisco IOS Software, C2900 Software (C2900-UNIVERSALK9-M), Version 15.2(4)M7, RELEASE SOFTWARE (fc2)\n"
+        "Technical Support: http://www.cisco.com/techsupport\n"
+        "Copyright (c) 1986-2014 by Cisco Systems, Inc.\n"
+        "\n"
+        "ROM: System Bootstrap, Version 15.0(1r)M15, RELEASE SOFTWARE (fc1)\n"
+        "\n"
+        "R1 uptime is 12 weeks, 3 days, 4 hours, 21 minutes\n"
+        "System returned to ROM by power-on\n"
+        "System image file is \"flash0:c2900-universalk9-mz.SPA.152-4.M7.bin\"\n"
+        "\n"
+        "Cisco CISCO2911/K9 (revision 1.0) with 487424K/36864K bytes of memory.\n"
+        "Processor board ID FTX1840ALBC\n"
+        "3 Gigabit Ethernet interfaces\n"
+        "1 terminal line\n"
+        "DRAM configuration is 64 bits wide with parity enabled.\n"
+        "255K bytes of non-volatile configuration memory.\n"
+        "250880K bytes of ATA System CompactFlash 0 (Read/Write)\n"
+        "\n"
+        "Configuration register is 0x2102\n"
+    )
+
+
+def huawei_version() -> str:
+    return (
+        "Huawei Versatile Routing Platform Software\n"
+        "VRP (R) software, Version 5.160 (AR2200 V200R009C00SPC500)\n"
+        "Copyright (C) 2011-2018 HUAWEI TECH CO., LTD\n"
+        "Huawei AR2220 Router uptime is 12 weeks, 3 days, 4 hours, 21 minutes\n"
+        "BKP 0 version information:\n"
+        "1. PCB      Version  : AR01BAK2A VER.B\n"
+        "2. If Supporting PoE : No\n"
+        "3. Board    Type     : AR2220\n"
+        "4. MPU Slot  Quantity : 1\n"
+        "5. LPU Slot  Quantity : 6\n"
+        "\n"
+        "MPU 0(Master) : uptime is 12 weeks, 3 days, 4 hours, 20 minutes\n"
+        "SDRAM Memory Size    : 2048   M bytes\n"
+        "Flash 0 Memory Size  : 512    M bytes\n"
+        "MPU version information : \n"
+        "1. PCB      Version  : AR01SRU2A VER.A\n"
+        "2. MAB      Version  : 0\n"
+        "3. Board    Type     : AR2220\n"
+        "4. CPLD0    Version  : 0\n"
+        "5. BootROM  Version  : 0\n"
+    )
+
+
+def juniper_version() -> str:
+    return (
+        "Hostname: mx\n"
+        "Model: mx480\n"
+        "Junos: 19.4R1.10\n"
+        "JUNOS OS Kernel 64-bit  [20191115.14c2ad5_builder_stable_11]\n"
+        "JUNOS OS libs [20191115.14c2ad5_builder_stable_11]\n"
+        "JUNOS OS runtime [20191115.14c2ad5_builder_stable_11]\n"
+        "JUNOS Software Release [19.4R1.10]\n"
+    )
+
+
+def generators() -> Dict[str, Callable[..., str]]:
+    """Generadores públicos del módulo por nombre."""
+    module = sys.modules[__name__]
+    return {name: fn for name, fn in inspect.getmembers(module, inspect.isfunction)
+            if not name.startswith("_") and fn.__module__ == __name__
+            and name not in ("generators", "main")}
+
+
+def main() -> None:
+    gens = generators()
+    ap = argparse.ArgumentParser(description="Genera salidas sintéticas de routers")
+    ap.add_argument("generator", choices=sorted(gens))
+    ap.add_argument("--interfaces", type=int, default=1000)
+    ap.add_argument("--vrfs", type=int, default=10)
+    ap.add_argument("--bgp-neighbors", type=int, default=100)
+    ap.add_argument("--static-routes", type=int, default=100)
+    ap.add_argument("--rows", type=int, default=50000)
+    args = ap.parse_args()
+
+    fn = gens[args.generator]
+    params = inspect.signature(fn).parameters
+    kwargs = {name: getattr(args, name) for name in params if hasattr(args, name)}
+    sys.stdout.write(fn(**kwargs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import sys
+import os
+
+# Add the parent directory to sys.path to allow module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.router_analyzer.bgp_table import BgpNeighborTable
+from modules.router_analyzer.parsers import parse_cisco_bgp_summary
+
+table = BgpNeighborTable()
+
+# ---- Configuración: misma IP en la global y en una VRF son vecinos distintos ----
+table.add_config([{'ip': '10.0.0.2', 'remote_as': '65001'},
+                  {'ip': '10.0.0.3', 'remote_as': '65002'}])
+table.add_config([{'ip': '10.0.0.2', 'remote_as': '65100'}], vrf='CLIENTE')
+assert len(table) == 3
+assert ('', '10.0.0.2') in table and ('CLIENTE', '10.0.0.2') in table
+assert table.get('10.0.0.2')['remote_as'] == '65001'
+assert table.get('10.0.0.2', 'CLIENTE')['remote_as'] == '65100'
+assert table.vrfs() == ['', 'CLIENTE']
+
+# ---- Resumen operativo: se fusiona con la fila configurada (sin duplicar) ----
+summary = (
+    'Neighbor        V           AS MsgRcvd MsgSent   TblVer  InQ OutQ Up/Down  State/PfxRcd\n'
+    '10.0.0.2        4        65001    1200    1180       57    0    0 2d03h           42\n'
+    '10.0.0.4        4        65003       0       0        1    0    0 never    Idle\n'
+)
+table.add_peers(parse_cisco_bgp_summary(summary))
+assert len(table) == 4
+row = table.get('10.0.0.2')
+print('merged:', row)
+assert row['configured'] and row['state'] == 'Established' and row['pref_rcv'] == '42'
+assert row['msg_rcvd'] == '1200'
+# Vecino visto solo en el resumen: no configurado
+assert not table.get('10.0.0.4')['configured'] and table.get('10.0.0.4')['state'] == 'Idle'
+# La VRF no se ve afectada por el resumen global
+assert 'state' not in table.get('10.0.0.2', 'CLIENTE')
+
+# ---- Los valores vacíos no pisan los existentes ----
+table.merge('10.0.0.2', remote_as='', state='')
+assert table.get('10.0.0.2')['remote_as'] == '65001' and table.get('10.0.0.2')['state'] == 'Established'
+# ... pero un campo nuevo se crea aunque esté vacío
+table.merge('10.0.0.2', description='')
+assert table.get('10.0.0.2')['description'] == ''
+
+# ---- Índice por AS: se reindexa cuando cambia el AS remoto ----
+assert [r['ip'] for r in table.by_as('65001')] == ['10.0.0.2']
+assert [(r['vrf'], r['ip']) for r in table.by_as('65100')] == [('CLIENTE', '10.0.0.2')]
+table.merge('10.0.0.2', remote_as='65009')
+assert table.by_as('65001') == []
+assert [r['ip'] for r in table.by_as('65009')] == ['10.0.0.2']
+assert table.by_as(65009) == table.by_as('65009')
+assert '65001' not in table.as_index()
+assert sorted(table.as_index()) == ['65002', '65003', '65009', '65100']
+
+# ---- Índice por VRF y orden de alta ----
+assert [r['ip'] for r in table.by_vrf()] == ['10.0.0.2', '10.0.0.3', '10.0.0.4']
+assert [r['ip'] for r in table.by_vrf('CLIENTE')] == ['10.0.0.2']
+assert table.by_vrf('OTRA') == []
+assert {vrf: len(rows) for vrf, rows in table.vrf_index().items()} == {'': 3, 'CLIENTE': 1}
+assert [r['ip'] for r in table.to_list()] == ['10.0.0.2', '10.0.0.3', '10.0.0.2', '10.0.0.4']
+
+# ---- Escala: miles de vecinos en cientos de VRFs ----
+big = BgpNeighborTable()
+for v in range(300):
+    big.add_config([{'ip': f'172.16.{v}.{i}', 'remote_as': str(65000 + i)} for i in range(1, 21)], vrf=f'VRF{v}')
+    big.add_peers([{'ip': f'172.16.{v}.{i}', 'as': str(65000 + i), 'state': 'Established'} for i in range(1, 21)], vrf=f'VRF{v}')
+assert len(big) == 6000 and len(big.vrfs()) == 300
+assert len(big.by_as('65001')) == 300
+assert all(r['configured'] and r['state'] == 'Established' for r in big)
+
+print('bgp_table: OK')
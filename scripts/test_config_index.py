@@ -0,0 +1,116 @@
+import sys
+import os
+
+# Add the parent directory to sys.path to allow module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.router_analyzer.config_index import ConfigIndex, build_index, clear_index_cache
+
+# ---- Cisco: bloques separados por '!' y 'exit-address-family' ----
+cisco = (
+    'hostname PE1\n'
+    '!\n'
+    'interface GigabitEthernet0/1\n'
+    ' description Enlace a P1\n'
+    ' ip address 10.0.0.1 255.255.255.252\n'
+    '!\n'
+    'interface GigabitEthernet0/1.100\n'
+    ' encapsulation dot1Q 100\n'
+    '!\n'
+    'router bgp 65000\n'
+    ' neighbor 10.0.0.2 remote-as 65001\n'
+    ' !\n'
+    ' address-family ipv4 vrf CLIENTE\n'
+    '  neighbor 172.16.0.2 remote-as 65100\n'
+    ' exit-address-family\n'
+    ' neighbor 10.0.0.3 remote-as 65000\n'
+    '!\n'
+    'ip route 0.0.0.0 0.0.0.0 10.0.0.2\n'
+    'end\n'
+)
+idx = ConfigIndex(cisco)
+print('top-level:', [s.text for s in idx.top_level()])
+assert [s.text for s in idx.top_level()] == [
+    'hostname PE1', 'interface GigabitEthernet0/1', 'interface GigabitEthernet0/1.100',
+    'router bgp 65000', 'ip route 0.0.0.0 0.0.0.0 10.0.0.2', 'end']
+
+gi = idx.find('interface GigabitEthernet0/1')
+assert [s.text for s in gi] == ['interface GigabitEthernet0/1'], gi
+# '!' cierra el bloque: la subinterfaz no es hija de Gi0/1
+assert gi[0].body() == ' description Enlace a P1\n ip address 10.0.0.1 255.255.255.252'
+assert [c.text for c in gi[0].children] == ['description Enlace a P1', 'ip address 10.0.0.1 255.255.255.252']
+# Búsqueda sin distinguir mayúsculas ni espacios
+assert [s.line for s in idx.find('INTERFACE  gigabitethernet0/1.100')] == [6]
+assert len(idx.find('interface')) == 2
+
+bgp = idx.first('router bgp')
+assert bgp is not None and bgp.words == ['router', 'bgp', '65000']
+assert idx.find('router bgp 65000')[0].line == bgp.line
+assert idx.find('router bgp 65001') == []
+# ' !' dentro del bloque y 'exit-address-family' cierran solo su nivel
+af = bgp.find('address-family ipv4 vrf')[0]
+assert af.parent.line == bgp.line
+assert [s.text for s in af.find('neighbor')] == ['neighbor 172.16.0.2 remote-as 65100']
+assert [s.text for s in bgp.children] == [
+    'neighbor 10.0.0.2 remote-as 65001', 'address-family ipv4 vrf CLIENTE', 'neighbor 10.0.0.3 remote-as 65000']
+# find() de un bloque se limita a sus descendientes
+assert len(idx.find('neighbor')) == 3 and len(bgp.find('neighbor')) == 3
+assert len(gi[0].find('neighbor')) == 0
+
+# ---- Huawei: bloques separados por '#' y cerrados con 'quit' ----
+huawei = (
+    '#\n'
+    'sysname PE2\n'
+    '#\n'
+    'ip vpn-instance CLIENTE\n'
+    ' ipv4-family\n'
+    '  route-distinguisher 65000:1\n'
+    '#\n'
+    'interface GigabitEthernet0/0/1\n'
+    ' ip binding vpn-instance CLIENTE\n'
+    ' ip address 192.168.1.1 255.255.255.0\n'
+    '#\n'
+    'bgp 65000\n'
+    ' peer 10.0.0.2 as-number 65001\n'
+    ' ipv4-family vpn-instance CLIENTE\n'
+    '  peer 172.16.0.2 as-number 65100\n'
+    ' quit\n'
+    ' peer 10.0.0.3 as-number 65000\n'
+    '#\n'
+    'ip route-static 0.0.0.0 0.0.0.0 10.0.0.2\n'
+    'ip route-static vpn-instance CLIENTE 10.1.0.0 16 172.16.0.2\n'
+    '#\n'
+    'return\n'
+)
+idx = ConfigIndex(huawei)
+print('top-level:', [s.text for s in idx.top_level()])
+assert [s.text for s in idx.top_level()] == [
+    'sysname PE2', 'ip vpn-instance CLIENTE', 'interface GigabitEthernet0/0/1', 'bgp 65000',
+    'ip route-static 0.0.0.0 0.0.0.0 10.0.0.2', 'ip route-static vpn-instance CLIENTE 10.1.0.0 16 172.16.0.2',
+    'return']
+vpn = idx.first('ip vpn-instance CLIENTE')
+assert vpn is not None and vpn.body() == ' ipv4-family\n  route-distinguisher 65000:1'
+assert idx.first('ip vpn-instance') is not None and idx.first('ip vpn-instance OTRO') is None
+bgp = idx.first('bgp')
+assert [s.text for s in bgp.children] == [
+    'peer 10.0.0.2 as-number 65001', 'ipv4-family vpn-instance CLIENTE', 'peer 10.0.0.3 as-number 65000']
+fam = bgp.find('ipv4-family vpn-instance CLIENTE')[0]
+assert [s.text for s in fam.children] == ['peer 172.16.0.2 as-number 65100']
+# Claves de dos palabras (prefijo) y de más palabras (filtradas)
+assert len(idx.find('ip route-static')) == 2
+assert [s.line for s in idx.find('ip route-static vpn-instance')] == [19]
+assert [s.line for s in idx.find('ip route-static vpn-instance cliente')] == [19]
+
+# ---- Búsquedas por interfaz en una configuración grande (sin coste cuadrático) ----
+big = '\n'.join(f'interface GigabitEthernet0/{i}\n description enlace {i}\n!' for i in range(5000))
+idx = ConfigIndex(big)
+for i in range(0, 5000, 7):
+    found = idx.find(f'interface GigabitEthernet0/{i}')
+    assert len(found) == 1 and found[0].body() == f' description enlace {i}', i
+
+# ---- build_index reutiliza el índice del mismo texto ----
+clear_index_cache()
+assert build_index(cisco) is build_index(cisco)
+assert build_index(huawei) is not build_index(cisco)
+
+print('config_index: OK')
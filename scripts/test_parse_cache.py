@@ -0,0 +1,89 @@
+import sys
+import os
+
+# Add the parent directory to sys.path to allow module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.router_analyzer import parse_cache
+from modules.router_analyzer.parse_cache import cached_parser, clear_parse_cache, parse_cache_stats
+from modules.router_analyzer.parsers import parse_cisco_ip_interface_brief, parse_cisco_bgp_config
+
+ip_brief = (
+    'Interface              IP-Address      OK? Method Status                Protocol\n'
+    + ''.join(f'GigabitEthernet0/{i:<8} 10.0.{i}.1       YES manual up                    up\n' for i in range(12))
+)
+assert len(ip_brief) >= parse_cache.MIN_TEXT_LEN
+
+# ---- Acierto: resultado igual, pero copia independiente ----
+clear_parse_cache()
+first = parse_cisco_ip_interface_brief(ip_brief)
+second = parse_cisco_ip_interface_brief(ip_brief)
+print('stats:', parse_cache_stats())
+assert parse_cache_stats()['hits'] == 1 and parse_cache_stats()['misses'] == 1
+assert [dict(i) for i in first] == [dict(i) for i in second]
+assert first is not second and first[0] is not second[0]
+
+# Modificar lo devuelto (como la ventana de interfaces) no altera el caché
+second[0]['status'] = 'down'
+second[0]['duplex'] = 'full'
+second.append(second[0])
+third = parse_cisco_ip_interface_brief(ip_brief)
+assert len(third) == 12 and third[0]['status'] == 'up' and 'duplex' not in third[0]
+# Ni tampoco lo devuelto en la primera llamada (antes de guardarse)
+first[1]['ip_address'] = '0.0.0.0'
+assert parse_cisco_ip_interface_brief(ip_brief)[1]['ip_address'] == '10.0.1.1'
+
+# ---- Resultados anidados (dicts con listas de dicts) ----
+bgp_cfg = (
+    'router bgp 65000\n'
+    ' bgp router-id 10.255.0.1\n'
+    + ''.join(f' neighbor 10.0.{i}.2 remote-as {65001 + i}\n' for i in range(10))
+)
+assert len(bgp_cfg) >= parse_cache.MIN_TEXT_LEN
+clear_parse_cache()
+a = parse_cisco_bgp_config(bgp_cfg)
+b = parse_cisco_bgp_config(bgp_cfg)
+assert parse_cache_stats()['hits'] == 1
+assert a == b
+for key, value in b.items():
+    if isinstance(value, list) and value:
+        value.clear()
+    elif isinstance(value, dict):
+        value['x'] = 1
+assert parse_cisco_bgp_config(bgp_cfg) == a
+
+# ---- Textos cortos y llamadas con argumentos extra: sin caché ----
+calls = []
+
+
+@cached_parser
+def _parse_lines(text, upper=False):
+    calls.append(text)
+    return [{'line': line.upper() if upper else line} for line in text.splitlines()]
+
+
+clear_parse_cache()
+_parse_lines('corto')
+_parse_lines('corto')
+assert len(calls) == 2 and parse_cache_stats()['entries'] == 0
+long_text = 'x' * parse_cache.MIN_TEXT_LEN
+_parse_lines(long_text, upper=True)
+_parse_lines(long_text, upper=True)
+assert len(calls) == 4
+_parse_lines(long_text)
+_parse_lines(long_text)
+assert len(calls) == 5 and parse_cache_stats()['entries'] == 1
+# El parser original sigue accesible sin caché
+assert _parse_lines.__wrapped__('a\nb') == [{'line': 'a'}, {'line': 'b'}]
+
+# ---- Límite de entradas: se descartan las más antiguas ----
+clear_parse_cache()
+for i in range(parse_cache.MAX_ENTRIES + 10):
+    _parse_lines(f'{i:06d}' + long_text)
+assert parse_cache_stats()['entries'] == parse_cache.MAX_ENTRIES
+before = len(calls)
+_parse_lines('000000' + long_text)
+assert len(calls) == before + 1
+clear_parse_cache()
+
+print('parse_cache: OK')
@@ -0,0 +1,83 @@
+import sys
+import os
+import copy
+import json
+import pickle
+
+# Add the parent directory to sys.path to allow module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.router_analyzer.records import Interface, StaticRoute, BgpPeer, json_default
+from modules.router_analyzer.parsers import parse_cisco_ip_interface_brief, parse_cisco_static_routes
+
+# ---- Interfaz de diccionario: solo existen las claves asignadas ----
+iface = Interface(name='Gi0/0', ip_address='10.0.0.1', status='up')
+assert list(iface) == ['name', 'ip_address', 'status'] == iface.keys()
+assert len(iface) == 3 and 'vrf' not in iface and 'name' in iface
+assert iface['name'] == 'Gi0/0' and iface.name == 'Gi0/0'
+assert iface.get('vrf') is None and iface.get('vrf', '') == ''
+try:
+    iface['vrf']
+    raise AssertionError('vrf no asignado')
+except KeyError:
+    pass
+try:
+    iface.vrf
+    raise AssertionError('vrf no asignado')
+except AttributeError:
+    pass
+
+# Campos y claves ajenas (p. ej. 'duplex' de la ventana de interfaces)
+iface['vrf'] = 'CLIENTE'
+iface['duplex'] = 'full'
+iface.description = 'Enlace'
+assert iface.keys() == ['name', 'ip_address', 'status', 'description', 'vrf', 'duplex']
+assert iface.setdefault('mask', '255.255.255.0') == '255.255.255.0'
+assert iface.setdefault('mask', 'x') == '255.255.255.0'
+assert iface.pop('duplex') == 'full' and 'duplex' not in iface
+assert iface.pop('duplex', None) is None
+del iface['mask']
+assert 'mask' not in iface
+iface.update({'status': 'down'}, type='GigabitEthernet')
+assert iface['status'] == 'down' and iface['type'] == 'GigabitEthernet'
+
+# ---- Comparación, copia y conversión con dicts ----
+as_dict = {'name': 'Gi0/0', 'ip_address': '10.0.0.1', 'status': 'down', 'description': 'Enlace',
+           'vrf': 'CLIENTE', 'type': 'GigabitEthernet'}
+assert iface == as_dict and dict(iface) == as_dict and {**iface} == as_dict
+assert iface.to_dict() == as_dict and iface != Interface(name='Gi0/0')
+clone = iface.copy()
+clone['status'] = 'up'
+clone['extra'] = 1
+assert iface['status'] == 'down' and 'extra' not in iface
+assert copy.copy(iface) == iface and copy.deepcopy(iface) == iface
+restored = pickle.loads(pickle.dumps(iface))
+assert type(restored) is Interface and restored == iface
+
+# Sin dict por instancia
+assert not hasattr(iface, '__dict__')
+
+# ---- JSON: los registros no son dicts; json_default los convierte ----
+routes = parse_cisco_static_routes('ip route 0.0.0.0 0.0.0.0 10.0.0.2\nip route 10.1.0.0 255.255.0.0 10.0.0.3 200\n')
+assert routes and all(isinstance(r, StaticRoute) for r in routes)
+try:
+    json.dumps(routes)
+    raise AssertionError('json.dumps sin default debería fallar')
+except TypeError:
+    pass
+payload = {'interfaces': [iface], 'static_routes': routes, 'peer': BgpPeer(ip='10.0.0.2', state='Idle')}
+loaded = json.loads(json.dumps(payload, default=json_default))
+assert loaded['interfaces'] == [as_dict]
+assert loaded['static_routes'] == [r.to_dict() for r in routes]
+assert loaded['peer'] == {'ip': '10.0.0.2', 'state': 'Idle'}
+
+# ---- Los parsers devuelven registros con la misma forma que los dicts anteriores ----
+ifaces = parse_cisco_ip_interface_brief(
+    'Interface              IP-Address      OK? Method Status                Protocol\n'
+    'Loopback0              10.255.0.1      YES manual up                    up\n'
+)
+assert isinstance(ifaces[0], Interface)
+assert ifaces[0] == {'name': 'Loopback0', 'type': 'Loopback', 'ip_address': '10.255.0.1', 'mask': '',
+                     'status': 'up', 'description': ''}
+
+print('records: OK')
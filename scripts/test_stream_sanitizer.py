@@ -0,0 +1,59 @@
+import sys
+import os
+
+# Add the parent directory to sys.path to allow module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.router_analyzer.stream_sanitizer import StreamSanitizer, sanitize_text
+
+# Salida con colores ANSI, paginación borrada con backspaces (Cisco y
+# Huawei), formato Juniper y texto UTF-8 multibyte
+raw = (
+    'show interfaces description\r\n'
+    '\x1b[1mInterface\x1b[0m      Status         Description\r\n'
+    'Gi0/0          up             Enlace a núcleo – sede\r\n'
+    ' --More-- \x08\x08\x08\x08\x08\x08\x08\x08\x08\x08          \x08\x08\x08\x08\x08\x08\x08\x08\x08\x08'
+    'Gi0/1          admin down     Reservado «B»\r\n'
+    '  ---- More ----\x1b[42D                                          \x1b[42D'
+    'Gi0/2          down           Sin descripción\r\n'
+    '---(more 45%)---\r                                        \r'
+    'Gi0/3          up             ÜBERTRAGUNG\r\n'
+    'Router#'
+)
+data = raw.encode('utf-8')
+
+expected = sanitize_text(raw)
+print(expected)
+assert '\x1b' not in expected and '\x08' not in expected
+assert 'More' not in expected and 'more' not in expected
+assert 'Enlace a núcleo – sede' in expected and '«B»' in expected
+assert 'Gi0/3          up             ÜBERTRAGUNG' in expected
+assert expected.rstrip().endswith('Router#')
+
+# ---- Fragmentos: el resultado no depende de dónde se corte el flujo ----
+for size in range(1, len(data) + 1):
+    san = StreamSanitizer()
+    for pos in range(0, len(data), size):
+        san.feed(data[pos:pos + size])
+    whole = san.flush()
+    assert whole == expected, (size, whole)
+
+# ---- Cortes en cada byte de a dos fragmentos (ANSI, UTF-8 y 'More' partidos) ----
+for cut in range(1, len(data)):
+    san = StreamSanitizer()
+    san.feed(data[:cut])
+    san.feed(data[cut:])
+    assert san.flush() == expected, cut
+
+# ---- Texto ya decodificado (telnetlib3 entrega str) ----
+san = StreamSanitizer()
+for pos in range(0, len(raw), 7):
+    san.feed(raw[pos:pos + 7])
+assert san.flush() == expected
+
+# ---- Aviso de paginación aunque el indicador quede retenido ----
+san = StreamSanitizer()
+san.feed(b'line 1\r\n --More-- ')
+assert san.more_seen
+
+print('stream_sanitizer: OK')
@@ -0,0 +1,56 @@
+import sys
+import os
+
+# Add the parent directory to sys.path to allow module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.router_analyzer.table_parser import TableParser
+from modules.router_analyzer.parsers import parse_cisco_ip_interface_brief, parse_cisco_bgp_summary
+
+# ---- Reparto por posición: valores de dos palabras ----
+ip_brief = (
+    'Interface              IP-Address      OK? Method Status                Protocol\n'
+    'GigabitEthernet0/0     10.0.0.1        YES manual up                    up\n'
+    'GigabitEthernet0/1     unassigned      YES unset  administratively down down\n'
+    'Loopback0              10.255.0.1      YES manual up                    up\n'
+)
+table = TableParser(
+    {"Interface": "name", "IP-Address": "ip_address", "OK?": "ok", "Method": "method",
+     "Status": "status", "Protocol": "protocol"},
+    required=("name", "ip_address", "status"),
+    accept=lambda row: True,
+)
+rows = list(table.rows(ip_brief))
+print('rows:', rows)
+assert len(rows) == 3
+assert rows[1]['status'] == 'administratively down', rows[1]
+assert rows[1]['protocol'] == 'down', rows[1]
+assert rows[1]['method'] == 'unset', rows[1]
+
+ifaces = parse_cisco_ip_interface_brief(ip_brief)
+print('interfaces:', [(i['name'], i['ip_address'], i['status']) for i in ifaces])
+assert [i['status'] for i in ifaces] == ['up', 'down', 'up']
+assert ifaces[1]['ip_address'] == ''
+
+# ---- Estado BGP con espacio ('Idle (Admin)') en la última columna ----
+bgp_summary = (
+    'BGP router identifier 10.255.0.1, local AS number 65000\n'
+    'Neighbor        V           AS MsgRcvd MsgSent   TblVer  InQ OutQ Up/Down  State/PfxRcd\n'
+    '10.0.0.2        4        65001    1200    1180       57    0    0 2d03h           42\n'
+    '10.0.0.3        4        65002       0       0        1    0    0 never    Idle (Admin)\n'
+    '10.0.0.4        4        65003       0       0        1    0    0 00:01:10 Active\n'
+)
+peers = parse_cisco_bgp_summary(bgp_summary)
+print('peers:', [(p['ip'], p['as'], p['state'], p['pref_rcv']) for p in peers])
+assert [p['ip'] for p in peers] == ['10.0.0.2', '10.0.0.3', '10.0.0.4']
+assert (peers[0]['state'], peers[0]['pref_rcv']) == ('Established', '42')
+assert peers[1]['state'] == 'Idle (Admin)', peers[1]
+assert peers[1]['updown'] == 'never' and peers[1]['as'] == '65002'
+assert peers[2]['state'] == 'Active'
+
+# ---- Sin cabecera: se usan las expresiones de respaldo ----
+headless = '10.0.0.5        4        65005     10      12        3    0    0 00:05:00        7\n'
+peers = parse_cisco_bgp_summary(headless)
+assert len(peers) == 1 and peers[0]['pref_rcv'] == '7', peers
+
+print('table_parser: OK')
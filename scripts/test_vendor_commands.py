@@ -0,0 +1,72 @@
+import sys
+import os
+
+# Add the parent directory to sys.path to allow module imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.router_analyzer.config_filters import can_filter_locally
+from modules.router_analyzer.vendor_commands import (
+    COST_CLASSES,
+    DISABLE_PAGING,
+    INTERFACES_BRIEF,
+    OSPF_CONFIG_SECTION,
+    RUNNING_CONFIG,
+    STATIC_ROUTES,
+    VERSION_COMMAND,
+    command_spec,
+    command_specs,
+)
+
+# ---- Cada comando de las tablas por fabricante está registrado ----
+for kind, table in (("version", VERSION_COMMAND), ("interfaces", INTERFACES_BRIEF),
+                    ("running", RUNNING_CONFIG), ("static_routes", STATIC_ROUTES),
+                    ("ospf_cfg", OSPF_CONFIG_SECTION)):
+    for vendor, cmd in table.items():
+        specs = command_specs(kind, vendor)
+        assert [s.command for s in specs] == [cmd], (kind, vendor, specs)
+        # La búsqueda por texto ignora mayúsculas y espacios repetidos
+        assert command_spec("  " + cmd.upper().replace(" ", "  ")).kind == kind, cmd
+
+# ---- Clases de coste y paginación ----
+for vendor, cmd in RUNNING_CONFIG.items():
+    spec = command_spec(cmd)
+    assert spec.cost == "heavy" and spec.paging and spec.read_only, spec
+for vendor, cmd in VERSION_COMMAND.items():
+    spec = command_spec(cmd)
+    assert spec.cost == "light" and not spec.paging, spec
+for vendor, cmds in DISABLE_PAGING.items():
+    for cmd in cmds:
+        spec = command_spec(cmd)
+        assert spec.kind == "paging" and not spec.read_only and not spec.paging, spec
+
+# ---- Secciones de la configuración: comando completo + filtro local ----
+spec = command_spec(OSPF_CONFIG_SECTION["cisco"])
+assert (spec.source, spec.pipe_filter) == ("show running-config", "sec ospf"), spec
+spec = command_spec(STATIC_ROUTES["huawei"])
+assert (spec.source, spec.pipe_filter) == ("display current-configuration", "include ip route-static"), spec
+assert spec.cost == "heavy" and can_filter_locally(spec.pipe_filter)
+# Juniper encadena filtros ('display set | match'): no se deriva localmente
+spec = command_spec(STATIC_ROUTES["juniper"])
+assert spec.source == "show configuration" and not can_filter_locally(spec.pipe_filter), spec
+
+# ---- Comandos no registrados: clasificados por su texto ----
+spec = command_spec("dis current-configuration")
+assert spec.cost == "heavy" and spec.size == "large", spec
+spec = command_spec("show running-config | include hostname")
+assert spec.cost == "heavy" and spec.size == "medium", spec
+assert not command_spec("show running-config | redirect flash:cfg.txt").read_only
+assert not command_spec("configure terminal").read_only
+assert command_spec("show clock").cost == "light"
+
+# ---- Tiempos: el modo rápido nunca espera más que el normal ----
+for cost in COST_CLASSES:
+    spec = command_spec("show clock") if cost == "light" else command_spec("show running-config")
+    if spec.cost != cost:
+        continue
+    fast_idle, fast_hard = spec.timeouts(True)
+    idle, hard = spec.timeouts(False)
+    assert fast_idle <= idle and fast_hard <= hard, (cost, spec.timeouts(True), spec.timeouts(False))
+    # A 9600 baudios el tope serie es mayor que a 115200
+    assert spec.serial_timeouts(False, 9600)[1] >= spec.serial_timeouts(False, 115200)[1]
+
+print('vendor_commands: OK')